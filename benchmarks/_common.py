@@ -0,0 +1,77 @@
+"""Helpers shared by the benchmark scripts (run them from the repo root: python benchmarks/bench_<name>.py)."""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import argumento  # noqa: F401
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def make_config(n_leaves: int, fanout: int = 10, leaf=lambda i: i) -> dict:
+    """Synthetic nested config with n_leaves leaves, each node has up to `fanout` children."""
+    if n_leaves <= fanout:
+        return {f'key_{i}': leaf(i) for i in range(n_leaves)}
+    child_size = -(-n_leaves // fanout)
+    cfg = {}
+    for i, start in enumerate(range(0, n_leaves, child_size)):
+        sub = make_config(min(child_size, n_leaves - start), fanout,
+                          lambda j, start=start: leaf(start + j))
+        cfg[f'node_{i}'] = sub
+    return cfg
+
+
+def make_env_config(n_leaves: int, density: float, n_vars: int, fanout: int = 10):
+    """Config with `density` share of '${BENCH_VAR_<i>:int|0}' leaves (over n_vars distinct variables)."""
+    every = max(1, round(1 / density)) if density else None
+
+    def leaf(i):
+        if every and i % every == 0:
+            return f'${{BENCH_VAR_{i % n_vars}:int|0}}' if i % 2 else f'prefix/${{BENCH_VAR_{i % n_vars}}}/suffix'
+        return f'plain string {i}' if i % 3 else i
+    return make_config(n_leaves, fanout, leaf=leaf)
+
+
+def leaf_paths(cfg: dict, prefix: str = ''):
+    for k, v in cfg.items():
+        path = f'{prefix}{k}'
+        if isinstance(v, dict):
+            yield from leaf_paths(v, path + '.')
+        else:
+            yield path
+
+
+def timeit(fn, repeat: int = 5, number: int = 1) -> float:
+    """Best wall time of `repeat` runs of `number` fn() calls, seconds per call."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def traced_memory(fn):
+    """(result of fn(), bytes allocated by it and still alive)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def report(title: str, rows, columns):
+    print(title)
+    print('  ' + ' | '.join(f'{c:>16}' for c in columns))
+    for row in rows:
+        print('  ' + ' | '.join(f'{c:>16.6g}' if isinstance(c, float) else f'{c!s:>16}' for c in row))
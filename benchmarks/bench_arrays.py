@@ -0,0 +1,42 @@
+"""Numeric vectors in configs: '?:list[float]' vs '?:ndarray[float32]' args, yaml lists vs '@npy:' references."""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import yaml
+
+from _common import report, timeit
+
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in opts.sizes:
+            values = np.random.default_rng(0).random(size, dtype=np.float32)
+            arg = ','.join(map(str, values.tolist()))
+            cfg_file = os.path.join(tmp_dir, f'args_{size}.yaml')
+            with open(cfg_file, 'w') as f:
+                f.write('as_list: "?:list[float]"\nas_ndarray: "?:ndarray[float32]"\n')
+            parser = create_parser(cfg_file, overrides='argv')
+            for key in ('as_list', 'as_ndarray'):
+                rows.append((size, f'--{key}', timeit(lambda: parser.parse([f'--{key}', arg, '--as_ndarray', '0']))))
+
+            np.save(os.path.join(tmp_dir, f'table_{size}.npy'), values)
+            for name, value in (('yaml list', values.tolist()), ('@npy', f'@npy:table_{size}.npy')):
+                cfg_file = os.path.join(tmp_dir, f'cfg_{size}_{name[0]}.yaml')
+                with open(cfg_file, 'w') as f:
+                    yaml.safe_dump({'table': value, 'as_ndarray': 0}, f)
+                parser = create_parser(cfg_file, overrides='argv')
+                rows.append((size, f'{name} sum()', timeit(lambda: np.sum(parser.parse([]).table), repeat=3)))
+    report('seconds per parse', rows, ['items', 'mode', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Parsing many config files: sequential create_parser().parse() loop vs parse_many() with growing worker counts."""
+import argparse
+import os
+import tempfile
+import time
+
+import yaml
+
+from _common import make_config, report
+
+import argumento
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--files', type=int, default=2000)
+    arg_parser.add_argument('--leaves', type=int, default=200, help='leaves per config file')
+    arg_parser.add_argument('--workers', type=int, nargs='+',
+                            default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    arg_parser.add_argument('--chunksize', type=int, default=16, help="chunksize of the 'process' executor")
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i in range(opts.files):
+            path = os.path.join(tmp_dir, f'cfg_{i}.yaml')
+            with open(path, 'w') as f:
+                yaml.safe_dump(make_config(opts.leaves, leaf=lambda j, i=i: i * j), f)
+            paths.append(path)
+
+        def run(name, workers, fn):
+            start = time.perf_counter()
+            n_ok = sum(1 for result in fn() if result is not None)
+            elapsed = time.perf_counter() - start
+            assert n_ok == opts.files
+            rows.append((name, workers, elapsed, opts.files / elapsed))
+
+        run('sequential', 1, lambda: (create_parser(path, overrides='argv').parse([]) for path in paths))
+        for executor in ('thread', 'process'):
+            chunksize = opts.chunksize if executor == 'process' else 1
+            for workers in opts.workers:
+                run(executor, workers, lambda: (r.config for r in argumento.parse_many(
+                    paths, workers=workers, executor=executor, chunksize=chunksize, overrides='argv')))
+    report(f'{opts.files} yaml files x {opts.leaves} leaves, {os.cpu_count()} cores', rows,
+           ['mode', 'workers', 'seconds', 'files/s'])
+
+
+if __name__ == '__main__':
+    main()
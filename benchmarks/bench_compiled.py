@@ -0,0 +1,51 @@
+"""Applying many override vectors to one config: parse() per job vs CompiledConfig.apply()."""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from _common import make_config, leaf_paths, report
+
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[100, 10000])
+    arg_parser.add_argument('--jobs', type=int, default=200)
+    arg_parser.add_argument('--overrides', type=int, default=10, help='overrides per job')
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_leaves in opts.leaves:
+            cfg = make_config(n_leaves)
+            cfg_file = os.path.join(tmp_dir, f'cfg_{n_leaves}.json')
+            with open(cfg_file, 'w') as f:
+                json.dump(cfg, f)
+            paths = list(leaf_paths(cfg))
+            jobs = [[arg for k in range(opts.overrides)
+                     for arg in (f'--{paths[(job * opts.overrides + k) % len(paths)]}', str(job))]
+                    for job in range(opts.jobs)]
+
+            def parse_per_job():
+                for job_args in jobs:
+                    create_parser(cfg_file, overrides='argv').parse(job_args)
+
+            def compiled_apply():
+                compiled = create_parser(cfg_file).compile()
+                for job_args in jobs:
+                    compiled.apply(job_args)
+
+            for fn in (parse_per_job, compiled_apply):
+                start = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - start
+                rows.append((n_leaves, fn.__name__, opts.jobs / elapsed, opts.jobs * opts.overrides / elapsed))
+    report(f'{opts.jobs} jobs x {opts.overrides} overrides', rows,
+           ['leaves', 'mode', 'jobs/s', 'overrides/s'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Config hashing: json.dumps(sort_keys=True) + sha256 vs NamespaceDict.config_hash(), after a change and for diffs."""
+import argparse
+import hashlib
+import json
+
+from _common import leaf_paths, make_config, report, timeit
+
+from argumento.namespace_dict import FrozenNamespaceDict, NamespaceDict, config_diff
+
+
+def json_hash(cfg: dict) -> str:
+    return hashlib.sha256(json.dumps(cfg, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[1000, 10000, 100000])
+    opts = arg_parser.parse_args()
+
+    rows = []
+    for n_leaves in opts.leaves:
+        raw = make_config(n_leaves, leaf=lambda i: f'value_{i}' if i % 2 else i * 0.5)
+        paths = list(leaf_paths(raw))
+        cfg = NamespaceDict(raw)
+        counter = iter(range(10 ** 9))
+
+        def change_and_hash(hash_fn):
+            cfg[paths[next(counter) * 7919 % len(paths)]] = next(counter)
+            return hash_fn(cfg)
+
+        def cold_hash():
+            return NamespaceDict(raw).config_hash()
+        frozen = FrozenNamespaceDict(raw)
+        variant = frozen.evolve({paths[0]: -1, paths[-1]: -2})
+        frozen.config_hash()
+        rows += [
+            (n_leaves, 'json + sha256', timeit(lambda: json_hash(cfg), repeat=3)),
+            (n_leaves, 'config_hash, cold', timeit(cold_hash, repeat=3) - timeit(lambda: NamespaceDict(raw), repeat=3)),
+            (n_leaves, 'set 1 key + json + sha256', timeit(lambda: change_and_hash(json_hash), repeat=3)),
+            (n_leaves, 'set 1 key + config_hash', timeit(lambda: change_and_hash(NamespaceDict.config_hash),
+                                                         repeat=5, number=100)),
+            (n_leaves, 'config_diff of evolved', timeit(lambda: config_diff(frozen, variant), repeat=5, number=100)),
+        ]
+        assert config_diff(frozen, variant) == {paths[0], paths[-1]}
+    report('config hashing', rows, ['leaves', 'operation', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Config daemon: parse() through the daemon vs local parsing (plain and cached), in-process and per new process."""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import yaml
+
+from _common import make_config, report, timeit
+
+from argumento import create_parser
+from argumento.cache import ConfigCache
+from argumento.daemon import ConfigDaemon
+
+PROCESS_CODE = """
+import sys
+from argumento import create_parser
+path, mode = sys.argv[1:]
+kwargs = {'daemon': '%s'} if mode == 'daemon' else {'cache': True} if mode == 'cached' else {}
+create_parser(path, overrides='argv', **kwargs).parse([])
+"""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--processes', type=int, default=5, help='process starts per measurement')
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix='argm') as tmp_dir:
+        socket_path = os.path.join(tmp_dir, 'd.sock')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        env = dict(os.environ, ARGUMENTO_CACHE_DIR=cache_dir, PYTHONPATH=os.pathsep.join(sys.path))
+        cache = ConfigCache(cache_dir)
+        with ConfigDaemon(socket_path):
+            for n_leaves in opts.leaves:
+                path = os.path.join(tmp_dir, f'config_{n_leaves}.yaml')
+                with open(path, 'w') as f:
+                    yaml.safe_dump(make_config(n_leaves), f)
+                in_process = {
+                    'local': lambda: create_parser(path, overrides='argv').parse([]),
+                    'cached': lambda: create_parser(path, overrides='argv', cache=cache).parse([]),
+                    'daemon': lambda: create_parser(path, daemon=socket_path).parse([]),
+                }
+                for mode, fn in in_process.items():
+                    fn()
+                    rows.append((n_leaves, mode, 'in-process', timeit(fn, repeat=3)))
+                code = PROCESS_CODE % socket_path
+                for mode in in_process:
+                    def run_process():
+                        subprocess.run([sys.executable, '-c', code, path, mode], env=env, check=True)
+                    run_process()
+                    rows.append((n_leaves, mode, 'new process', timeit(run_process, repeat=3, number=opts.processes)))
+    report('config daemon', rows, ['leaves', 'mode', 'call', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""EnvResolver.resolve_envs on synthetic configs: current resolver vs the previous recursive, non-memoized one."""
+import argparse
+import copy
+import os
+from collections import abc
+
+from _common import make_env_config, timeit, report
+
+from argumento.parsers import EnvResolver
+
+
+class LegacyEnvResolver(EnvResolver):
+    """Recursive traversal, finditer + literal_eval for every string, no memoization."""
+    def _legacy_iter(self, nested):
+        for key, value in nested.items():
+            if isinstance(value, abc.Mapping):
+                yield from self._legacy_iter(value)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, abc.Mapping):
+                        yield from self._legacy_iter(item)
+                    else:
+                        yield value, i, item
+            else:
+                yield nested, key, value
+
+    def _legacy_parse_string(self, string):
+        all_matches = list(self.pattern.finditer(string))
+        if len(all_matches) == 1 and string.strip() == all_matches[0].group(0):
+            return self._resolve_match(all_matches[0])
+        return self.pattern.sub(lambda match: str(self._resolve_match(match)), string)
+
+    def resolve_envs(self, config, used_envs=None):
+        for container, key, value in self._legacy_iter(config):
+            if isinstance(value, str):
+                container[key] = self._legacy_parse_string(value)
+        return config
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[1000, 100000])
+    arg_parser.add_argument('--densities', type=float, nargs='+', default=[0.0, 0.1, 1.0])
+    arg_parser.add_argument('--vars', type=int, default=100, help='number of distinct ENV variables')
+    opts = arg_parser.parse_args()
+
+    for i in range(opts.vars):
+        os.environ[f'BENCH_VAR_{i}'] = str(i)
+
+    rows = []
+    for n_leaves in opts.leaves:
+        for density in opts.densities:
+            cfg = make_env_config(n_leaves, density, opts.vars)
+            for resolver in (LegacyEnvResolver(), EnvResolver()):
+                configs = iter([copy.deepcopy(cfg) for _ in range(3)])
+                elapsed = timeit(lambda: resolver.resolve_envs(next(configs)), repeat=3)
+                rows.append((n_leaves, density, type(resolver).__name__, elapsed * 1e3))
+    report('EnvResolver.resolve_envs', rows, ['leaves', 'env density', 'resolver', 'time, ms'])
+
+
+if __name__ == '__main__':
+    main()
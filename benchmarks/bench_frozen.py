@@ -0,0 +1,51 @@
+"""Per-request derived configs: deepcopy + setting overrides vs FrozenNamespaceDict.evolve()."""
+import argparse
+import copy
+
+from _common import leaf_paths, make_config, report, timeit, traced_memory
+
+from argumento.namespace_dict import FrozenNamespaceDict, NamespaceDict
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, default=10000)
+    arg_parser.add_argument('--variants', type=int, default=10000)
+    arg_parser.add_argument('--overrides', type=int, default=3, help='overrides per variant')
+    arg_parser.add_argument('--deepcopy-variants', type=int, default=200, help='deepcopy is measured on fewer variants')
+    opts = arg_parser.parse_args()
+
+    cfg = make_config(opts.leaves)
+    paths = list(leaf_paths(cfg))
+    changes = [{paths[(i * opts.overrides + k) * 7 % len(paths)]: -i for k in range(opts.overrides)}
+               for i in range(opts.variants)]
+    base = NamespaceDict(cfg)
+    frozen = FrozenNamespaceDict(cfg)
+
+    def deepcopy_set():
+        variants = []
+        for variant_changes in changes[:opts.deepcopy_variants]:
+            variant = copy.deepcopy(base)
+            for k, v in variant_changes.items():
+                variant[k] = v
+            variants.append(variant)
+        return variants
+
+    def evolve():
+        return [frozen.evolve(variant_changes) for variant_changes in changes]
+
+    _, base_memory = traced_memory(lambda: FrozenNamespaceDict(cfg))
+    rows = [('base config', '', '', base_memory / 2 ** 20)]
+    for fn, n in ((deepcopy_set, min(opts.deepcopy_variants, opts.variants)), (evolve, opts.variants)):
+        seconds = timeit(fn, repeat=1)
+        _, memory = traced_memory(fn)
+        rows.append((fn.__name__, seconds / n * 1e6, memory / n / 2 ** 10, memory / n * opts.variants / 2 ** 20))
+    variants = evolve()
+    seconds = timeit(lambda: [hash(v) for v in variants], repeat=1)
+    rows.append(('first hash', seconds / opts.variants * 1e6, '', ''))
+    report(f'{opts.variants} variants x {opts.overrides} overrides of a {opts.leaves} leaves config', rows,
+           ['mode', 'us/variant', 'KB/variant', f'MB/{opts.variants}'])
+
+
+if __name__ == '__main__':
+    main()
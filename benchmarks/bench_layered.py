@@ -0,0 +1,65 @@
+"""Layered configs: parse() per layer and a manual deep merge vs create_parser([layers]), with the layer cache."""
+import argparse
+import json
+import os
+import tempfile
+
+import toml
+import yaml
+
+from _common import make_config, report, timeit
+
+from argumento import create_parser
+from argumento.cache import ConfigCache
+from argumento.namespace_dict import NamespaceDict
+
+
+def deep_merge(target: dict, source: dict):
+    for k, v in source.items():
+        if isinstance(v, dict) and isinstance(target.get(k), dict):
+            deep_merge(target[k], v)
+        else:
+            target[k] = v
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[100000, 10000, 1000, 100],
+                            help='leaves of the base, env, region and host layers')
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for i, (n_leaves, fmt) in enumerate(zip(opts.leaves, ('yaml', 'toml', 'json', 'yaml'))):
+            path = os.path.join(tmp_dir, f'layer_{i}.{fmt}')
+            cfg = make_config(n_leaves, leaf=lambda j: f'layer_{i}_{j}')
+            with open(path, 'w') as f:
+                {'yaml': yaml.safe_dump, 'toml': toml.dump, 'json': json.dump}[fmt](cfg, f)
+            files.append(path)
+
+        def manual_merge():
+            merged = {}
+            for path in files:
+                deep_merge(merged, create_parser(path, overrides='argv').parse([]))
+            return NamespaceDict(merged)
+
+        cache = ConfigCache(os.path.join(tmp_dir, 'cache'))
+        cases = [
+            ('manual merge', manual_merge),
+            ('layered', lambda: create_parser(files, overrides='argv').parse([])),
+            ('layered, 1 worker', lambda: create_parser(files, overrides='argv', workers=1).parse([])),
+            ('layered, cached', lambda: create_parser(files, overrides='argv', cache=cache).parse([])),
+        ]
+        for name, fn in cases:
+            rows.append((name, timeit(fn, repeat=3)))
+
+        def host_changed():
+            os.utime(files[-1])
+            create_parser(files, overrides='argv', cache=cache).parse([])
+        rows.append(('cached, host changed', timeit(host_changed, repeat=3)))
+    report(f'layers of {opts.leaves} leaves', rows, ['mode', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Memory and throughput of NamespaceDict vs the previous implementation that mirrored values in __dict__."""
+import argparse
+
+from _common import make_config, timeit, traced_memory, report
+
+from argumento.namespace_dict import NamespaceDict
+
+
+class LegacyNamespaceDict(dict):
+    def __init__(self, *args, **kwargs):
+        super(LegacyNamespaceDict, self).__init__(*args, **kwargs)
+        for arg in args:
+            if isinstance(arg, dict):
+                for k, v in arg.items():
+                    self[k] = v
+        if kwargs:
+            for k, v in kwargs.items():
+                self[k] = v
+
+    def __getattr__(self, attr):
+        return self.get(attr)
+
+    def __getitem__(self, item):
+        idx_dot = item.find('.')
+        if idx_dot >= 0:
+            nested_map = self.get(item[:idx_dot])
+            return nested_map.get(item[idx_dot + 1:])
+        else:
+            return self.get(item)
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict):
+            value = LegacyNamespaceDict(value)
+        idx_dot = key.find('.')
+        if idx_dot >= 0:
+            attr = key[:idx_dot]
+            nested_map = self.get(attr)
+            if nested_map is None:
+                nested_map = LegacyNamespaceDict()
+            nested_map.__setitem__(key[idx_dot + 1:], value)
+            super(LegacyNamespaceDict, self).__setitem__(attr, nested_map)
+            self.__dict__.update({attr: nested_map})
+        else:
+            super(LegacyNamespaceDict, self).__setitem__(key, value)
+            self.__dict__.update({key: value})
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--fanout', type=int, default=10)
+    opts = arg_parser.parse_args()
+
+    rows = []
+    for n_leaves in opts.leaves:
+        cfg = make_config(n_leaves, opts.fanout)
+        # the previous implementation supports dotted lookups one level deep only
+        two_level_keys = [f'{k}.{k2}' for k, v in cfg.items() if isinstance(v, dict) for k2 in v] or list(cfg)
+        for cls in (LegacyNamespaceDict, NamespaceDict):
+            ns_dict, mem = traced_memory(lambda: cls(cfg))
+            build = timeit(lambda: cls(cfg), repeat=3)
+            flat = {f'{k}.{k2}': v2 for k, v in cfg.items() for k2, v2 in v.items()} \
+                if all(isinstance(v, dict) for v in cfg.values()) else cfg
+            set_dotted = timeit(lambda: cls(flat), repeat=3)
+            first = next(iter(cfg))
+            get_attr = timeit(lambda: getattr(ns_dict, first), number=100000) * 1e9
+            dotted_key = two_level_keys[len(two_level_keys) // 2]
+            ns_dict[dotted_key]  # flat index is built on first dotted lookup
+            get_dotted = timeit(lambda: ns_dict[dotted_key], number=100000) * 1e9
+            rows.append((n_leaves, cls.__name__, mem / 1024, build * 1e3, set_dotted * 1e3, get_attr, get_dotted))
+    report('NamespaceDict', rows, ['leaves', 'class', 'memory, KiB', 'build, ms', 'dotted set, ms', 'getattr, ns',
+                                   'dotted get, ns'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Command line overrides: argparse parser per config key vs single pass over argv (OverrideTable)."""
+import argparse
+
+from _common import make_config, leaf_paths, timeit, report
+
+from argumento.namespace_dict import NamespaceDict
+from argumento.overrides import OverrideTable
+from argumento.parsers import ParserBase
+
+
+def argparse_overrides(cfg, cmd_args):
+    parsed_args, _ = ParserBase._cmd_args_from_cfg_keys(cfg).parse_known_args(cmd_args)
+    return NamespaceDict(vars(parsed_args))
+
+
+def argv_overrides(cfg, cmd_args):
+    return OverrideTable.from_config(cfg).parse_args(cmd_args)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[100, 10000, 100000])
+    arg_parser.add_argument('--overrides', type=int, nargs='+', default=[0, 10])
+    opts = arg_parser.parse_args()
+
+    rows = []
+    for n_leaves in opts.leaves:
+        cfg = make_config(n_leaves)
+        paths = list(leaf_paths(cfg))
+        for n_overrides in opts.overrides:
+            step = max(1, len(paths) // max(1, n_overrides))
+            cmd_args = [arg for path in paths[::step][:n_overrides] for arg in (f'--{path}', '1')]
+            for fn in (argparse_overrides, argv_overrides):
+                elapsed = timeit(lambda: fn(cfg, cmd_args), repeat=3)
+                rows.append((n_leaves, n_overrides, fn.__name__, elapsed * 1e3))
+    report('Overrides', rows, ['leaves', 'overrides', 'mode', 'time, ms'])
+
+
+if __name__ == '__main__':
+    main()
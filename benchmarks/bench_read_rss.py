@@ -0,0 +1,82 @@
+"""
+Peak RSS of reading a large config (embedded lookup tables) per loader backend:
+  legacy - read as str, encode back to bytes, load (how configs were read before)
+  read   - read bytes, pass them to the loader
+  large  - the backend's large file mode: mmap passed to the loader, or the file streamed to it
+Each measurement runs in a fresh process, the peak RSS before reading is subtracted.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from _common import report
+
+from argumento.parsers import ParserJson, ParserYaml
+
+PARSERS = {'json': ParserJson, 'yaml': ParserYaml}
+MODES = ('legacy', 'read', 'large')
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def child(fmt: str, backend: str, mode: str, path: str):
+    parser = PARSERS[fmt](path, backend=backend)
+    base = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        with open(path, 'r') as f:
+            text = f.read()
+        cfg = parser._loads(text.encode('utf-8'))
+        del text
+    else:
+        parser.large_file_threshold = 1 << 62 if mode == 'read' else 0
+        cfg = parser._read_config()
+    elapsed = time.perf_counter() - start
+    assert cfg['tables']
+    print(json.dumps({'rss': _peak_rss_mb() - base, 'seconds': elapsed}))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--mb', type=int, default=100, help='config file size, MB')
+    arg_parser.add_argument('--formats', nargs='+', default=list(PARSERS), choices=list(PARSERS))
+    arg_parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    opts = arg_parser.parse_args()
+    if opts.child:
+        child(*opts.child)
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # long strings dominate the file size, as in configs with embedded tables/blobs
+        cfg = {'model': {'lr': 0.1}, 'tables': {'lookup': ['x' * 1000] * (opts.mb * 1000)}}
+        for fmt in opts.formats:
+            path = os.path.join(tmp_dir, f'cfg.{fmt}')
+            with open(path, 'w') as f:
+                if fmt == 'json':
+                    json.dump(cfg, f)
+                else:
+                    yaml.safe_dump(cfg, f, width=2000)
+            size_mb = os.path.getsize(path) / 2 ** 20
+            parser_type = PARSERS[fmt]
+            for backend in parser_type.available_backends():
+                for mode in MODES:
+                    out = subprocess.run([sys.executable, __file__, '--child', fmt, backend, mode, path],
+                                         check=True, stdout=subprocess.PIPE).stdout
+                    result = json.loads(out)
+                    mode_name = parser_type.large_file_modes.get(backend, 'read') if mode == 'large' else mode
+                    rows.append((f'{fmt} {size_mb:.0f} MB', backend, mode_name, result['rss'], result['seconds']))
+    report('peak RSS of reading a large config', rows, ['file', 'backend', 'mode', 'peak RSS, MB', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
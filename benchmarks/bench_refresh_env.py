@@ -0,0 +1,44 @@
+"""Re-resolving ENV placeholders after an ENV change: parse() again vs refresh_env() of the changed variables."""
+import argparse
+import json
+import os
+import tempfile
+
+from _common import make_env_config, report, timeit
+
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[10000, 100000])
+    arg_parser.add_argument('--density', type=float, default=0.1, help='share of leaves with ENV placeholders')
+    arg_parser.add_argument('--vars', type=int, default=100, help='distinct ENV variables')
+    arg_parser.add_argument('--changed', type=int, nargs='+', default=[1, 10])
+    opts = arg_parser.parse_args()
+
+    for i in range(opts.vars):
+        os.environ[f'BENCH_VAR_{i}'] = str(i)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_leaves in opts.leaves:
+            cfg_file = os.path.join(tmp_dir, f'cfg_{n_leaves}.json')
+            with open(cfg_file, 'w') as f:
+                json.dump(make_env_config(n_leaves, opts.density, opts.vars), f)
+            parser = create_parser(cfg_file, overrides='argv', track_envs=True)
+            rows.append((n_leaves, 'parse', '', timeit(lambda: parser.parse([]), repeat=3)))
+            config = parser.parse([])
+            for n_changed in opts.changed:
+                changed = sorted(parser.env_index.leaves)[:n_changed]
+                n_leaves_changed = len({id(leaf) for name in changed for leaf in parser.env_index.leaves[name]})
+
+                def refresh():
+                    for name in changed:
+                        os.environ[name] = str(int(os.environ[name]) + 1)
+                    parser.refresh_env(config, changed)
+                rows.append((n_leaves, f'refresh {n_changed} vars', n_leaves_changed, timeit(refresh, repeat=3)))
+    report(f'ENV density {opts.density}, {opts.vars} variables', rows, ['leaves', 'mode', 'changed leaves', 'seconds'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Reading a small section of a large config: parse() vs parse(select=[...])."""
+import argparse
+import json
+import os
+import tempfile
+
+import yaml
+
+from _common import make_config, report, timeit, traced_memory
+
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, default=100000)
+    arg_parser.add_argument('--select', nargs='+', default=['node_0.node_0'], help='about 1%% of the default config')
+    arg_parser.add_argument('--backends', nargs='+', default=['libyaml', 'orjson'])
+    opts = arg_parser.parse_args()
+
+    cfg = make_config(opts.leaves, leaf=lambda i: f'value_{i}')
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = {}
+        for fmt in ('yaml', 'json'):
+            files[fmt] = os.path.join(tmp_dir, f'cfg.{fmt}')
+            with open(files[fmt], 'w') as f:
+                yaml.safe_dump(cfg, f) if fmt == 'yaml' else json.dump(cfg, f)
+
+        for backend in opts.backends:
+            parser = create_parser(files['json' if backend == 'orjson' else 'yaml'], backend=backend, overrides='argv')
+            for name, select in (('full', None), ('select', opts.select)):
+                seconds = timeit(lambda: parser.parse([], select=select), repeat=3)
+                _, memory = traced_memory(lambda: parser.parse([], select=select))
+                rows.append((backend, name, seconds, memory / 2 ** 20))
+    report(f'{opts.leaves} leaves, select={opts.select}', rows, ['backend', 'mode', 'seconds', 'memory, MB'])
+
+
+if __name__ == '__main__':
+    main()
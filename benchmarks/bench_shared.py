@@ -0,0 +1,48 @@
+"""Handing a parsed config to worker processes: re-parsing vs unpickling a copy vs attaching a shared snapshot."""
+import argparse
+import json
+import os
+import pickle
+import tempfile
+
+from _common import make_config, report, timeit, traced_memory
+
+from argumento import create_parser
+from argumento.shared import attach, publish
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, nargs='+', default=[1000, 100000])
+    arg_parser.add_argument('--key', default='node_0.node_0', help='section read by the worker after attaching')
+    opts = arg_parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_leaves in opts.leaves:
+            cfg_file = os.path.join(tmp_dir, f'cfg_{n_leaves}.json')
+            with open(cfg_file, 'w') as f:
+                json.dump(make_config(n_leaves, leaf=lambda i: f'value_{i}'), f)
+            parser = create_parser(cfg_file, overrides='argv')
+            config = parser.parse([])
+            pickled = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+            with publish(config) as shared:
+                def read_section(view):
+                    return view[opts.key]['key_0']
+
+                cases = [
+                    ('parse', lambda: parser.parse([])),
+                    ('unpickle', lambda: pickle.loads(pickled)),
+                    ('attach', lambda: attach(shared.name)),
+                    ('attach+section', lambda: read_section(attach(shared.name))),
+                ]
+                for name, fn in cases:
+                    seconds = timeit(fn, repeat=5, number=1 if name in ('parse', 'unpickle') else 100)
+                    _, memory = traced_memory(fn)
+                    rows.append((n_leaves, name, seconds * 1e6, memory / 2 ** 10))
+                rows.append((n_leaves, 'snapshot size', '', shared.size / 2 ** 10))
+    report('per worker', rows, ['leaves', 'mode', 'us', 'memory, KB'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Hyperparameter sweep over a config: parse() per combination (a shell loop) vs ParserBase.sweep()."""
+import argparse
+import itertools
+import json
+import os
+import tempfile
+
+from _common import leaf_paths, make_config, report, timeit, traced_memory
+
+from argumento import create_parser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--leaves', type=int, default=10000)
+    arg_parser.add_argument('--axes', type=int, nargs='+', default=[10, 10, 10], help='values per swept key')
+    opts = arg_parser.parse_args()
+
+    cfg = make_config(opts.leaves)
+    paths = list(leaf_paths(cfg))
+    keys = paths[::len(paths) // len(opts.axes)][:len(opts.axes)]
+    axes = [[str(v) for v in range(n)] for n in opts.axes]
+    n_variants = 1
+    for values in axes:
+        n_variants *= len(values)
+    sweep_args = [arg for key, values in zip(keys, axes) for arg in ('--sweep', f'{key}={",".join(values)}')]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cfg_file = os.path.join(tmp_dir, 'cfg.json')
+        with open(cfg_file, 'w') as f:
+            json.dump(cfg, f)
+        parser = create_parser(cfg_file, overrides='argv')
+
+        def parse_per_variant():
+            return [parser.parse([arg for key, value in zip(keys, combination) for arg in (f'--{key}', value)])
+                    for combination in itertools.product(*axes)]
+
+        def sweep():
+            return list(parser.sweep(sweep_args))
+
+        rows = []
+        for fn in (sweep, parse_per_variant):
+            seconds = timeit(fn, repeat=1)
+            _, memory = traced_memory(fn)
+            rows.append((fn.__name__, seconds, seconds / n_variants * 1e6, memory / 2 ** 20))
+    report(f'{n_variants} variants of a {opts.leaves} leaves config (all variants kept)', rows,
+           ['mode', 'seconds', 'us/variant', 'memory, MB'])
+
+
+if __name__ == '__main__':
+    main()
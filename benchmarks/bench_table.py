@@ -0,0 +1,75 @@
+"""Columnar export of many configs: flattening each config into a row dict in a loop vs config_table()."""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import yaml
+
+from _common import make_config, report, timeit, traced_memory
+
+import argumento
+from argumento.namespace_dict import NamespaceDict
+from argumento.table import config_table
+
+VOCABULARY = ['adam', 'sgd', 'rmsprop', 'adamw']
+
+
+def make_run_config(i: int, n_leaves: int) -> dict:
+    return make_config(n_leaves, leaf=lambda j: (i * j * 0.5, i + j, VOCABULARY[(i + j) % 4], (i + j) % 2 == 0)[j % 4])
+
+
+def rows_loop(configs) -> dict:
+    """Flat row dict per config, then a column per key."""
+    rows = []
+    for config in configs:
+        row = {}
+        stack = [('', config)]
+        while stack:
+            prefix, node = stack.pop()
+            for k, v in node.items():
+                if isinstance(v, dict):
+                    stack.append((f'{prefix}{k}.', v))
+                else:
+                    row[f'{prefix}{k}'] = v
+        rows.append(row)
+    keys = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+    return {key: np.array([row.get(key) for row in rows]) for key in keys}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--configs', type=int, default=100000)
+    arg_parser.add_argument('--leaves', type=int, default=50, help='leaves per config')
+    arg_parser.add_argument('--files', type=int, default=2000, help='configs read from files')
+    opts = arg_parser.parse_args()
+
+    configs = [NamespaceDict(make_run_config(i, opts.leaves)) for i in range(opts.configs)]
+    rows = []
+    for name, fn in (('row dicts loop', lambda: rows_loop(configs)), ('config_table', lambda: config_table(configs))):
+        seconds = timeit(fn, repeat=3)
+        _, memory = traced_memory(fn)
+        rows.append((f'{opts.configs} parsed configs', name, seconds, opts.configs / seconds, memory / 2 ** 20))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i in range(opts.files):
+            path = os.path.join(tmp_dir, f'run_{i}.yaml')
+            with open(path, 'w') as f:
+                yaml.safe_dump(make_run_config(i, opts.leaves), f)
+            paths.append(path)
+
+        def parse_and_loop():
+            return rows_loop(r.config for r in argumento.parse_many(paths, ordered=True, overrides='argv'))
+
+        for name, fn in (('parse_many + row dicts loop', parse_and_loop),
+                         ('config_table', lambda: config_table(paths, overrides='argv'))):
+            seconds = timeit(fn, repeat=3)
+            rows.append((f'{opts.files} yaml files', name, seconds, opts.files / seconds, ''))
+    report(f'configs of {opts.leaves} leaves to columns', rows, ['input', 'mode', 'seconds', 'configs/s', 'MB'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark suite: end to end parse() of all registered formats and the subsystems (EnvResolver, argparse
+construction, NamespaceDict get/set) on synthetic configs.
+
+Each axis (config size, nesting depth, ENV placeholder density, command line override count) is varied
+one at a time around a base point. Results are written as JSON, a previous run may be used as a baseline:
+
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 1.2  # exit code 1 on regressions
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from _common import leaf_paths, make_env_config, report
+
+import argumento
+from argumento.namespace_dict import NamespaceDict
+from argumento.parsers import ParserBase
+
+PROFILES = {
+    'quick': {'leaves': [10, 1000, 10000], 'base_leaves': 1000},
+    'full': {'leaves': [10, 1000, 10000, 100000, 1000000], 'base_leaves': 10000},
+}
+FANOUTS = [1000, 10, 3]  # depth grows as fanout decreases
+ENV_DENSITIES = [0.0, 0.1, 1.0]
+OVERRIDE_COUNTS = [0, 10, 100]
+N_ENV_VARS = 100
+FORMATS = ['yaml', 'toml', 'json']
+SUBSYSTEMS = ['env_resolver', 'cmd_args', 'namespace_get', 'namespace_set']
+
+
+def scenarios(profile: dict):
+    """Parameter sets: each axis varied around the base point."""
+    base = {'leaves': profile['base_leaves'], 'fanout': 10, 'env_density': 0.0, 'overrides': 0}
+    seen = set()
+    for axis, values in (('leaves', profile['leaves']), ('fanout', FANOUTS), ('env_density', ENV_DENSITIES),
+                         ('overrides', OVERRIDE_COUNTS)):
+        for value in values:
+            params = dict(base, **{axis: value})
+            key = tuple(sorted(params.items()))
+            if key not in seen:
+                seen.add(key)
+                yield params
+
+
+def measure(fn, setup=None, min_time: float = 0.2, max_repeat: int = 5) -> dict:
+    """Best time of fn(setup()) over up to max_repeat runs, fewer runs if they take more than min_time in total."""
+    times = []
+    while len(times) < max_repeat and (not times or sum(times) < min_time):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return {'seconds': min(times), 'repeat': len(times)}
+
+
+def write_config(cfg: dict, fmt: str, path: str):
+    with open(path, 'w') as f:
+        if fmt == 'yaml':
+            import yaml
+            yaml.safe_dump(cfg, f, sort_keys=False)
+        elif fmt == 'toml':
+            import toml
+            toml.dump(cfg, f)
+        else:
+            json.dump(cfg, f)
+
+
+def writable_formats() -> list:
+    """FORMATS configs can be written in: toml needs the toml package (tomllib of python 3.11+ only reads)."""
+    try:
+        import toml  # noqa: F401
+    except ImportError:
+        return [fmt for fmt in FORMATS if fmt != 'toml']
+    return list(FORMATS)
+
+
+def override_args(paths: list, n: int) -> list:
+    """--key value args for n leaves spread over the config. Values are strings, which all leaf types take."""
+    step = max(1, len(paths) // max(n, 1))
+    return [arg for path in paths[::step][:n] for arg in (f'--{path}', '1')]
+
+
+def run(opts) -> list:
+    profile = PROFILES[opts.profile]
+    for i in range(N_ENV_VARS):
+        os.environ[f'BENCH_VAR_{i}'] = str(i)
+    results = []
+
+    def add(name, params, measurement):
+        results.append({'name': name, 'params': params, **measurement})
+        print(f'{name:>14} {json.dumps(params)}: {measurement["seconds"]:.6f}s', file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for params in scenarios(profile):
+            cfg = make_env_config(params['leaves'], params['env_density'], N_ENV_VARS, params['fanout'])
+            paths = list(leaf_paths(cfg))
+            args = override_args(paths, params['overrides'])
+
+            for fmt in opts.formats:
+                path = os.path.join(tmp_dir, f'cfg.{fmt}')
+                write_config(cfg, fmt, path)
+                for mode in opts.modes:
+                    parser = argumento.create_parser(path, overrides=mode)
+                    add('parse', dict(params, format=fmt, mode=mode), measure(lambda _: parser.parse(args)))
+
+            if 'env_resolver' in opts.subsystems:
+                resolver = ParserBase.env_resolver
+                add('env_resolver', params, measure(resolver.resolve_envs, setup=lambda: copy.deepcopy(cfg)))
+            if params['env_density'] or params['overrides']:
+                # the other subsystems do not depend on ENV placeholders and command line args
+                continue
+            if 'cmd_args' in opts.subsystems:
+                add('cmd_args', params, measure(lambda _: ParserBase._cmd_args_from_cfg_keys(cfg)))
+            ns_dict = NamespaceDict(cfg)
+            if 'namespace_get' in opts.subsystems:
+                add('namespace_get', params, measure(lambda _: [ns_dict[path] for path in paths]))
+            if 'namespace_set' in opts.subsystems:
+                add('namespace_set', params, measure(lambda d: [d.__setitem__(path, 1) for path in paths],
+                                                     setup=lambda: NamespaceDict(cfg)))
+    return results
+
+
+def _key(result: dict) -> tuple:
+    return result['name'], tuple(sorted(result['params'].items()))
+
+
+def compare(results: list, baseline: dict, threshold: float) -> bool:
+    """Prints current/baseline time ratios, returns True if no result is slower than threshold times the baseline."""
+    baseline_results = {_key(result): result for result in baseline['results']}
+    rows = []
+    ok = True
+    for result in results:
+        base = baseline_results.get(_key(result))
+        if base is None:
+            continue
+        ratio = result['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+        regression = ratio > threshold
+        ok = ok and not regression
+        params = ' '.join(f'{k}={v}' for k, v in sorted(result['params'].items()))
+        rows.append((result['name'], params, base['seconds'], result['seconds'], ratio,
+                     'REGRESSION' if regression else ''))
+    report(f'vs baseline ({baseline["meta"].get("python")}, argumento {baseline["meta"].get("argumento")})', rows,
+           ['benchmark', 'params', 'baseline, s', 'current, s', 'ratio', ''])
+    return ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--profile', choices=list(PROFILES), default='quick',
+                            help="'full' goes up to 1M leaves and takes a while")
+    arg_parser.add_argument('--formats', nargs='+', choices=FORMATS,
+                            help='all by default, toml is skipped if the toml package is not installed')
+    arg_parser.add_argument('--modes', nargs='+', choices=list(ParserBase.override_modes),
+                            default=list(ParserBase.override_modes))
+    arg_parser.add_argument('--subsystems', nargs='*', choices=SUBSYSTEMS, default=SUBSYSTEMS)
+    arg_parser.add_argument('--output', help='JSON file to write results to, stdout by default')
+    arg_parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+    arg_parser.add_argument('--threshold', type=float, default=1.25,
+                            help='current/baseline time ratio reported as a regression')
+    opts = arg_parser.parse_args()
+    formats = writable_formats()
+    if opts.formats is None:
+        opts.formats = formats
+        if 'toml' not in formats:
+            print('toml is not installed, skipping the toml format', file=sys.stderr)
+    elif not set(opts.formats) <= set(formats):
+        arg_parser.error('--formats toml needs the toml package: pip install toml')
+
+    results = run(opts)
+    output = {
+        'meta': {
+            'argumento': argumento.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'profile': opts.profile,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(output, f, indent=1)
+    elif not opts.baseline:
+        json.dump(output, sys.stdout, indent=1)
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, opts.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
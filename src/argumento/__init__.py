@@ -1,4 +1,15 @@
 from ._version import __version__
 
-from .parsers import create_parser, factory
+from .factory import create_parser, factory
 
+
+def __getattr__(name):
+    if name == 'parse_many':
+        from .batch import parse_many
+        return parse_many
+    # submodules are imported on first access, see PEP 562
+    if name in ('cache', 'parsers', 'namespace_dict', 'watch', 'batch', 'stats', 'aio', 'shared', 'arrays',
+                'sweep', 'layered', 'daemon', 'table'):
+        import importlib
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
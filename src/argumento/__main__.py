@@ -0,0 +1,47 @@
+"""
+Command line tools:
+
+    python -m argumento serve [--socket PATH] [--preload config.yaml ...]  # config daemon, see argumento.daemon
+"""
+import argparse
+import signal
+import sys
+from typing import List
+
+
+def serve(socket_path: str = None, preload: List[str] = ()):
+    from argumento.daemon import ConfigDaemon
+    daemon = ConfigDaemon(socket_path)
+    for config_file in preload:
+        daemon.preload([config_file])
+    daemon.bind()
+    # SIGTERM stops the daemon the way Ctrl+C does, removing the socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f'argumento config daemon: serving on {daemon.socket_path}', file=sys.stderr, flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog='python -m argumento')
+    commands = parser.add_subparsers(dest='command')
+    serve_parser = commands.add_parser('serve', help='serve pre-parsed configs to local processes over a Unix socket')
+    serve_parser.add_argument('--socket', default=None,
+                              help='socket path, $ARGUMENTO_SOCKET or argumento-<uid>.sock in $XDG_RUNTIME_DIR '
+                                   'by default')
+    serve_parser.add_argument('--preload', nargs='*', default=[], metavar='CONFIG',
+                              help='config files to load before serving')
+    args = parser.parse_args(argv)
+    if args.command != 'serve':
+        parser.print_help()
+        return 2
+    serve(args.socket, args.preload)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from argumento.factory import create_parser
+from argumento.namespace_dict import NamespaceDict
+from argumento.overrides import CompiledConfig
+
+
+class AsyncConfigLoader:
+    """
+    Loads configs for asyncio services: files are read, decoded and env-resolved in an executor,
+      concurrent loads of the same file share a single in-flight load, loaded configs are cached for ttl seconds.
+
+    Command line style overrides are applied to the cached config on each load() (see CompiledConfig.apply),
+      so each call gets its own config, callers may modify it freely. Applying them copies the config
+      (about 1us per leaf), configs with more than apply_threshold leaves are applied in the executor.
+    A loader should be used from a single event loop.
+    """
+    def __init__(self, executor: Optional[Executor] = None, ttl: Optional[float] = 60.0, max_entries: int = 1024,
+                 apply_threshold: Optional[int] = 1000, **parser_kwargs):
+        """
+        :param executor: executor to load configs in, the default executor of the event loop by default
+        :param ttl: seconds to keep loaded configs for, None to keep them until invalidate(), 0 to not cache them
+          (concurrent loads are still shared)
+        :param max_entries: max number of cached configs, the oldest are dropped first
+        :param apply_threshold: number of config leaves above which overrides are applied in the executor rather than
+          on the event loop, None to always apply them on the event loop
+        :param parser_kwargs: passed to create_parser(), e.g. cache=True or backend='pyyaml'
+        """
+        self.executor = executor
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.apply_threshold = apply_threshold
+        self.parser_kwargs = parser_kwargs
+        # key -> (expiry time of the event loop clock, (CompiledConfig, number of its leaves))
+        self._cache: Dict[tuple, Tuple[float, Tuple[CompiledConfig, int]]] = {}
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+
+    async def load(self, path: str, args: List[str] = (), select: List[str] = None) -> NamespaceDict:
+        """
+        Returns the config with command line style overrides applied, raises OverrideError on invalid args.
+        :param select: dotted keys of the config subtrees to read, see ParserBase.parse()
+        """
+        compiled, n_leaves = await self._compiled(path, select)
+        if self.apply_threshold is not None and n_leaves > self.apply_threshold:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, compiled.apply, args)
+        return compiled.apply(args)
+
+    async def load_many(self, paths: Iterable[str], args: List[str] = (), select: List[str] = None,
+                        return_exceptions: bool = False) -> list:
+        """Loads configs concurrently, returns them in the order of paths (exceptions too, if return_exceptions)."""
+        return await asyncio.gather(*(self.load(path, args, select) for path in paths),
+                                    return_exceptions=return_exceptions)
+
+    def invalidate(self, path: str = None):
+        """Drops cached config(s) of the path, or the whole cache."""
+        if path is None:
+            self._cache.clear()
+            return
+        path = os.path.abspath(path)
+        for key in [key for key in self._cache if key[0] == path]:
+            del self._cache[key]
+
+    async def _compiled(self, path: str, select: Optional[List[str]]) -> Tuple[CompiledConfig, int]:
+        loop = asyncio.get_running_loop()
+        key = (os.path.abspath(path), None if select is None else tuple(sorted(select)))
+        entry = self._cache.get(key)
+        if entry is not None:
+            expiry, compiled = entry
+            if expiry > loop.time():
+                return compiled
+            del self._cache[key]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = loop.run_in_executor(self.executor, self._compile, path, select)
+            self._in_flight[key] = future
+            future.add_done_callback(functools.partial(self._on_loaded, key, loop))
+        # a cancelled caller does not cancel the load shared with the other callers
+        return await asyncio.shield(future)
+
+    def _compile(self, path: str, select: Optional[List[str]]) -> Tuple[CompiledConfig, int]:
+        compiled = create_parser(path, **self.parser_kwargs).compile(select)
+        return compiled, compiled.n_leaves
+
+    def _on_loaded(self, key: tuple, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if future.cancelled() or future.exception() is not None or self.ttl == 0:
+            return
+        expiry = float('inf') if self.ttl is None else loop.time() + self.ttl
+        self._cache[key] = (expiry, future.result())
+        while len(self._cache) > self.max_entries:
+            del self._cache[next(iter(self._cache))]
+
+
+async def parse_async(parser, args: List[str] = None, select: List[str] = None,
+                      executor: Optional[Executor] = None) -> NamespaceDict:
+    """parser.parse(args, select) in the executor (the default executor of the event loop by default)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(parser.parse, args, select))
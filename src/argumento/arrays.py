@@ -0,0 +1,149 @@
+"""
+NumPy array params (numpy is an optional dependency, imported on first use):
+
+    class_weights: "?:ndarray[float32]"  # command line: --class_weights 0.1,0.5,2
+    lookup_table: "@npy:tables/lookup.npy"  # LazyArray, memory mapped on first access
+
+Relative .npy paths are resolved against the directory of the config file.
+"""
+import operator
+import os
+
+NPY_PREFIX = '@npy:'
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError('ndarray params need numpy: pip install argumento[numpy]') from e
+    return numpy
+
+
+class NdarrayCaster:
+    """Casts comma separated command line value to a 1-d ndarray of dtype, in a single vectorized conversion."""
+    def __init__(self, dtype: str):
+        np = _numpy()
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind not in 'biufc':
+            raise ValueError(f'Unsupported ndarray dtype: {dtype}, numeric dtypes are supported')
+        self.__name__ = f'ndarray[{self.dtype.name}]'
+
+    def __call__(self, s: str):
+        np = _numpy()
+        if self.dtype.kind == 'b':
+            from argumento.overrides import str2bool
+            return np.array([str2bool(item.strip()) for item in s.split(',')], dtype=self.dtype)
+        return np.array(s.split(','), dtype=self.dtype)
+
+    def __eq__(self, other):
+        return isinstance(other, NdarrayCaster) and other.dtype == self.dtype
+
+    def __hash__(self):
+        return hash((NdarrayCaster, self.dtype))
+
+    def __reduce__(self):
+        return NdarrayCaster, (self.dtype.name,)
+
+    def __repr__(self):
+        return f'NdarrayCaster({self.dtype.name})'
+
+
+class LazyArray:
+    """
+    Reference to a .npy file, memory mapped (read-only) on first access: np.asarray(ref), ref[1:3], ref.shape,
+      ref * 2 and numpy functions load it. load() returns the np.memmap itself.
+    References are compared, hashed and pickled by path, the data is not copied to other processes.
+    Passed from command line (--key path.npy), the value is a LazyArray of the path.
+    """
+    __slots__ = ('path', '_array')
+
+    def __init__(self, path: str):
+        self.path = os.fspath(path)
+        self._array = None
+
+    def load(self):
+        array = self._array
+        if array is None:
+            array = self._array = _numpy().load(self.path, mmap_mode='r')
+        return array
+
+    @property
+    def loaded(self) -> bool:
+        return self._array is not None
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.load()
+        return array if dtype is None else array.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(x.load() if isinstance(x, LazyArray) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        return func(*_load_args(args), **kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __getitem__(self, item):
+        return self.load()[item]
+
+    def __len__(self):
+        return len(self.load())
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __eq__(self, other):
+        return isinstance(other, LazyArray) and other.path == self.path
+
+    def __hash__(self):
+        return hash((LazyArray, self.path))
+
+    def __reduce__(self):
+        return LazyArray, (self.path,)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f'LazyArray({self.path!r})'
+
+
+def _load_args(args):
+    return tuple(_load_args(x) if isinstance(x, (list, tuple)) else x.load() if isinstance(x, LazyArray) else x
+                 for x in args)
+
+
+def _binary(op):
+    def method(self, other):
+        return op(self.load(), other)
+    return method
+
+
+def _reflected(op):
+    def method(self, other):
+        return op(other, self.load())
+    return method
+
+
+for _name in ('add', 'sub', 'mul', 'truediv', 'floordiv', 'mod', 'pow', 'matmul', 'and', 'or', 'xor',
+              'lshift', 'rshift'):
+    _op = getattr(operator, _name if _name not in ('and', 'or') else f'{_name}_')
+    setattr(LazyArray, f'__{_name}__', _binary(_op))
+    setattr(LazyArray, f'__r{_name}__', _reflected(_op))
+for _name in ('lt', 'le', 'gt', 'ge'):
+    setattr(LazyArray, f'__{_name}__', _binary(getattr(operator, _name)))
+for _name in ('neg', 'pos', 'abs', 'invert'):
+    setattr(LazyArray, f'__{_name}__', (lambda op: lambda self: op(self.load()))(getattr(operator, _name)))
+
+
+def resolve_npy_path(value: str, base_dir: str) -> str:
+    """'@npy:relative/path.npy' -> '@npy:<base_dir>/relative/path.npy'."""
+    path = os.path.expanduser(value[len(NPY_PREFIX):].strip())
+    if base_dir and not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    return NPY_PREFIX + path
@@ -0,0 +1,103 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from argumento.factory import create_parser
+from argumento.namespace_dict import NamespaceDict
+
+
+class ParseResult(NamedTuple):
+    """Result of parsing a single file by parse_many(): config, or the error which occurred."""
+    path: str
+    config: Optional[NamespaceDict]
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+executors = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+def parse_many(paths: Iterable[str], workers: int = None, executor: str = 'thread', ordered: bool = False,
+               args: List[str] = (), chunksize: int = 1, **parser_kwargs) -> Iterator[ParseResult]:
+    """
+    Parses many config files in parallel, yields ParseResult per file.
+
+    Each file is parsed with the parser registered for its extension (see create_parser), errors
+      (missing file, invalid content, missing required args, ...) are reported in ParseResult.error
+      and do not abort the batch.
+    :param workers: number of worker threads/processes, os.cpu_count() by default
+    :param executor: 'thread', or 'process' for CPU-bound parsing of many files
+      (formats registered after the worker processes start are not known to them)
+    :param ordered: yield results in the order of paths, in completion order by default
+    :param args: command line args applied to each config, no overrides by default
+    :param chunksize: number of files sent to a worker at once, values > 1 reduce 'process' executor overhead
+    :param parser_kwargs: passed to create_parser(), e.g. overrides='argv'
+    """
+    if executor not in executors:
+        raise ValueError(f'Invalid executor: "{executor}". Supported executors are: {list(executors)}.')
+    if chunksize < 1:
+        raise ValueError(f'chunksize must be >= 1, got {chunksize}')
+    workers = workers or os.cpu_count() or 1
+    return _parse_many(iter(paths), executors[executor], workers, ordered, list(args), chunksize, parser_kwargs)
+
+
+def _parse_many(paths: Iterator[str], executor_type, workers: int, ordered: bool, args: List[str], chunksize: int,
+                parser_kwargs: dict) -> Iterator[ParseResult]:
+    pool = executor_type(max_workers=workers)
+    # paths are submitted lazily, so that the number of pending futures (and results held) stays bounded
+    max_in_flight = 2 * workers
+    pending = deque()
+
+    def submit() -> bool:
+        chunk = list(islice(paths, chunksize))
+        if not chunk:
+            return False
+        pending.append((pool.submit(_parse_chunk, chunk, args, parser_kwargs), chunk))
+        return True
+
+    try:
+        while len(pending) < max_in_flight and submit():
+            pass
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done_futures, _ = wait([future for future, _ in pending], return_when=FIRST_COMPLETED)
+                done = [item for item in pending if item[0] in done_futures]
+                for item in done:
+                    pending.remove(item)
+            for future, chunk in done:
+                submit()
+                yield from _chunk_results(future, chunk)
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def _chunk_results(future, chunk: List[str]) -> List[ParseResult]:
+    try:
+        return future.result()
+    except Exception as e:
+        # the worker failed as a whole (e.g. the worker process died, unpicklable result)
+        return [ParseResult(path, None, e) for path in chunk]
+
+
+def _parse_chunk(paths: List[str], args: List[str], parser_kwargs: dict) -> List[ParseResult]:
+    results = []
+    for path in paths:
+        try:
+            config = create_parser(path, **parser_kwargs).parse(args)
+        except (Exception, SystemExit) as e:
+            results.append(ParseResult(path, None, e))
+        else:
+            results.append(ParseResult(path, config, None))
+    return results
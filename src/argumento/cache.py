@@ -0,0 +1,107 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Optional
+
+from argumento._version import __version__
+
+
+class ConfigCache:
+    """
+    On-disk LRU cache for loaded and env-resolved configs.
+
+    Entries are pickled and keyed by the library version, the parser class, the config file path
+      and its fingerprint (stat info by default, content hash with use_hash=True).
+    Least recently used entries are evicted once there are more than max_entries of them.
+    """
+    _suffix = '.pickle'
+
+    def __init__(self, cache_dir: str = None, max_entries: int = 128, use_hash: bool = False):
+        if cache_dir is None:
+            cache_dir = os.environ.get('ARGUMENTO_CACHE_DIR',
+                                       os.path.join(os.path.expanduser('~'), '.cache', 'argumento'))
+        if max_entries < 1:
+            raise ValueError(f'max_entries should be positive, got {max_entries}')
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.use_hash = use_hash
+
+    def fingerprint(self, filename: str) -> str:
+        """File state fingerprint, raises OSError if the file can not be accessed."""
+        if self.use_hash:
+            with open(filename, 'rb') as f:
+                return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        st = os.stat(filename)
+        return f'{st.st_mtime_ns}:{st.st_ctime_ns}:{st.st_size}:{st.st_ino}'
+
+    def make_key(self, filename: str, *parts) -> str:
+        """Cache key for a config file (and extra key parts), the key changes whenever the file does."""
+        filename = os.path.abspath(os.fspath(filename))
+        key_src = '\0'.join([__version__, *map(str, parts), filename, self.fingerprint(filename)])
+        return hashlib.sha256(key_src.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self._suffix)
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupted or written by an incompatible python - drop it
+            self._remove(path)
+            return None
+        try:
+            # bump mtime, it serves as the last access time for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(self._suffix):
+                    try:
+                        entries.append((entry.stat().st_mtime_ns, entry.path))
+                    except OSError:
+                        pass
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for _, path in self._entries():
+            self._remove(path)
@@ -0,0 +1,336 @@
+"""
+Local config daemon: keeps compiled configs in memory and serves them to the processes of the host over a Unix socket.
+
+    python -m argumento serve [--socket PATH] [--preload config.yaml ...]
+
+    args = create_parser('config.yaml', daemon=True).parse()  # parses locally if the daemon is not running
+
+Protocol: frames of a 4-byte big-endian length followed by the payload. Requests are marshal-encoded
+  (files, select, backend) tuples, responses are pickled {'compiled': CompiledConfig, 'envs': {name: value}}
+  or {'error': message} dicts. The socket is accessible to its owner only, clients check the owner before
+  unpickling responses.
+Config files are checked (stat) on each request, changed configs are read again. ENV variables are resolved
+  in the daemon environment: clients parse locally if the variables referenced by the config have other values.
+"""
+import marshal
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from argumento.factory import factory
+from argumento.namespace_dict import NamespaceDict
+from argumento.overrides import CompiledConfig
+from argumento.parsers import ParserBase
+from argumento.stats import phase
+
+_FRAME_HEADER = struct.Struct('>I')
+_MAX_REQUEST_SIZE = 1 << 20
+
+
+def default_socket_path() -> str:
+    """$ARGUMENTO_SOCKET, or argumento-<uid>.sock in $XDG_RUNTIME_DIR (or $TMPDIR, /tmp)."""
+    path = os.environ.get('ARGUMENTO_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    return os.path.join(runtime_dir, f'argumento-{os.getuid()}.sock')
+
+
+def _send_frame(sock: socket.socket, payload: bytes):
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> Optional[bytes]:
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_frame(sock: socket.socket, max_size: int = None) -> Optional[bytes]:
+    """Payload of the next frame, None if the connection is closed."""
+    header = _recv_exactly(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    size, = _FRAME_HEADER.unpack(header)
+    if max_size is not None and size > max_size:
+        raise ValueError(f'Frame of {size} bytes exceeds {max_size} bytes')
+    return _recv_exactly(sock, size) if size else b''
+
+
+def _stat_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino
+
+
+class ConfigDaemon:
+    """Serves compiled configs (see ParserBase.compile()) over a Unix socket, see the module docs."""
+    def __init__(self, socket_path: str = None):
+        self.socket_path = socket_path or default_socket_path()
+        # request key -> (stat signatures of the files, pickled response)
+        self._entries: Dict[tuple, Tuple[list, bytes]] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def response(self, request: bytes) -> bytes:
+        """Pickled response to a marshal-encoded request."""
+        try:
+            key = self._parse_request(request)
+            files = key[0]
+            signatures = [_stat_signature(path) for path in files]
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and entry[0] == signatures:
+                return entry[1]
+            payload = pickle.dumps(self._compile(*key), protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._entries[key] = (signatures, payload)
+            return payload
+        except Exception as e:
+            return pickle.dumps({'error': f'{type(e).__name__}: {e}'}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def preload(self, files: List[str], select: List[str] = None):
+        """Loads the config (layered, if there are many files) before the first request for it."""
+        self.response(marshal.dumps(([os.path.abspath(path) for path in files], select, None)))
+
+    @staticmethod
+    def _parse_request(request: bytes) -> tuple:
+        files, select, backend = marshal.loads(request)
+        if not isinstance(files, list) or not files or not all(isinstance(path, str) for path in files):
+            raise ValueError('files must be a non-empty list of paths')
+        if select is not None and not (isinstance(select, list) and all(isinstance(k, str) for k in select)):
+            raise ValueError('select must be a list of dotted keys')
+        if backend is not None and not isinstance(backend, str):
+            raise ValueError('backend must be a str')
+        return tuple(files), None if select is None else tuple(sorted(select)), backend
+
+    @staticmethod
+    def _compile(files: tuple, select: Optional[tuple], backend: Optional[str]) -> dict:
+        kwargs = {} if backend is None else {'backend': backend}
+        parser = factory.get_parser(files[0] if len(files) == 1 else list(files), track_envs=True, **kwargs)
+        compiled = parser.compile(None if select is None else list(select))
+        return {'compiled': compiled, 'envs': dict(parser.env_index.envs)}
+
+    def bind(self):
+        """Creates the socket (removing a stale one), raises RuntimeError if another daemon serves it."""
+        path = self.socket_path
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.remove(path)
+            else:
+                raise RuntimeError(f'Config daemon is already running on {path}')
+            finally:
+                probe.close()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.config_daemon = self
+        self._server.connections = set()
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+        self._server.serve_forever()
+
+    def start(self) -> 'ConfigDaemon':
+        """Serves in a background thread."""
+        self.bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, name='argumento-daemon', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stops serving and removes the socket."""
+        if self._server is None:
+            return
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        # connections are served by their own threads, which outlive the server
+        for connection in list(self._server.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._server = None
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    config_daemon: ConfigDaemon = None
+    connections: set = None
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.server.connections.add(self.request)
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+
+    def handle(self):
+        # a connection serves any number of requests
+        while True:
+            try:
+                request = _recv_frame(self.request, _MAX_REQUEST_SIZE)
+            except (OSError, ValueError):
+                return
+            if request is None:
+                return
+            try:
+                _send_frame(self.request, self.server.config_daemon.response(request))
+            except OSError:
+                return
+
+
+class DaemonClient:
+    """Connection to the config daemon, reused by all requests of the process (thread-safe)."""
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def fetch(self, files: List[str], select: List[str] = None, backend: str = None) -> Optional[CompiledConfig]:
+        """CompiledConfig served by the daemon, None if it is not running, failed to load the config or resolved
+        ENV variables differently."""
+        request = marshal.dumps((list(files), None if select is None else list(select), backend))
+        with self._lock:
+            payload = self._request(request)
+        if payload is None:
+            return None
+        response = pickle.loads(payload)
+        if 'error' in response:
+            return None
+        environ = os.environ
+        if any(environ.get(name) != value for name, value in response['envs'].items()):
+            return None
+        return response['compiled']
+
+    def _request(self, request: bytes) -> Optional[bytes]:
+        # a reused connection may have been closed by a daemon restart, it is reconnected once
+        for reused in (self._sock is not None, False):
+            if self._sock is None:
+                try:
+                    self._sock = self._connect()
+                except OSError:
+                    return None
+            try:
+                _send_frame(self._sock, request)
+                payload = _recv_frame(self._sock)
+            except OSError:
+                payload = None
+            if payload is not None:
+                return payload
+            self.close()
+            if not reused:
+                return None
+        return None
+
+    def _connect(self) -> socket.socket:
+        if os.stat(self.socket_path).st_uid != os.getuid():
+            raise PermissionError(f'Config daemon socket {self.socket_path} is owned by another user')
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+_clients: Dict[str, DaemonClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(socket_path: str = None) -> DaemonClient:
+    """Shared client of the socket (the default one by default)."""
+    socket_path = socket_path or default_socket_path()
+    with _clients_lock:
+        client = _clients.get(socket_path)
+        if client is None:
+            client = _clients[socket_path] = DaemonClient(socket_path)
+        return client
+
+
+class DaemonParser(ParserBase):
+    """
+    Parser of config file(s) served by the config daemon, create_parser(path, daemon=True):
+      parse() fetches the compiled config from the daemon and applies command line args to it
+      (the way overrides='argv' does), the config is parsed locally if the daemon is not available.
+    """
+    def __init__(self, config_file: Union[str, List[str]], socket_path: str = None, backend: str = None,
+                 **parser_kwargs):
+        """
+        :param config_file: config file, or layer files (see argumento.layered)
+        :param socket_path: daemon socket, see default_socket_path()
+        :param parser_kwargs: kwargs of the local parser (e.g. cache=True) used when the daemon is not available
+        """
+        files = [config_file] if isinstance(config_file, (str, os.PathLike)) else list(config_file)
+        super().__init__(os.fspath(files[0]), None, parser_kwargs.get('overrides', 'argparse'))
+        self.files = [os.path.abspath(path) for path in files]
+        self.socket_path = socket_path
+        self.backend = backend
+        self._parser_kwargs = dict(parser_kwargs, **({} if backend is None else {'backend': backend}))
+        self._local = None
+
+    def _local_parser(self) -> ParserBase:
+        if self._local is None:
+            files = self.files[0] if len(self.files) == 1 else self.files
+            self._local = factory.get_parser(files, **self._parser_kwargs)
+        return self._local
+
+    def _fetch(self, select: List[str] = None) -> Optional[CompiledConfig]:
+        with phase('daemon'):
+            return get_client(self.socket_path).fetch(self.files, select, self.backend)
+
+    def _read_config(self):
+        return self._local_parser()._read_config()
+
+    def _parse(self, args: List[str] = None, select: List[str] = None) -> NamespaceDict:
+        compiled = self._fetch(select)
+        if compiled is None:
+            return self._local_parser()._parse(args, select)
+        return compiled.apply(sys.argv[1:] if args is None else args, exit_on_error=True)
+
+    def compile(self, select: List[str] = None) -> CompiledConfig:
+        compiled = self._fetch(select)
+        if compiled is None:
+            compiled = self._local_parser().compile(select)
+        return compiled
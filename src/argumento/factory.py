@@ -0,0 +1,83 @@
+import importlib
+import os.path
+import warnings
+from typing import Union, List, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argumento.parsers import ParserBase
+
+
+class ParserFactory:
+    """
+    Registry of file format -> parser type.
+
+    Parser type may be registered lazily as a 'module:ClassName' string, the module is imported
+      the first time a file of that format is requested.
+    """
+    def __init__(self):
+        self._parsers = {}
+        self._parser_kwargs = {}
+
+    def _register_single_format(self, fmt: str, parser: Union[Type['ParserBase'], str], parser_kwargs: dict):
+        if fmt in self._parsers:
+            warnings.warn(f'Format {fmt} is already bound to {self._parsers[fmt]}. The value will be overwritten!')
+        self._parsers[fmt] = parser
+        self._parser_kwargs[fmt] = parser_kwargs
+
+    def register_format(self, fmt: Union[str, List[str]], parser_type: Union[Type['ParserBase'], str],
+                        **parser_kwargs):
+        """
+        Binds file format(s) to the parser type (class or lazy 'module:ClassName' reference).
+        parser_kwargs (e.g. backend='pyyaml') are passed to the parser on each get_parser() call.
+        """
+        if isinstance(fmt, str):
+            self._register_single_format(fmt, parser_type, parser_kwargs)
+        elif isinstance(fmt, list) and all(isinstance(x, str) for x in fmt):
+            for fmt_item in fmt:
+                self._register_single_format(fmt_item, parser_type, parser_kwargs)
+        else:
+            raise ValueError(f'Invalid format: {fmt}')
+
+    def _parser_type(self, ext: str) -> Type['ParserBase']:
+        parser_type = self._parsers.get(ext)
+        if not parser_type:
+            raise ValueError(f'Could not infer parser from file type. Unknown file format: "{ext}". '
+                             f'Supported formats are: {list(self._parsers.keys())}.')
+        if isinstance(parser_type, str):
+            parser_ref = parser_type
+            module_name, _, class_name = parser_ref.partition(':')
+            parser_type = getattr(importlib.import_module(module_name), class_name)
+            # resolve the lazy reference once for all formats bound to it
+            for fmt, parser in self._parsers.items():
+                if parser == parser_ref:
+                    self._parsers[fmt] = parser_type
+        return parser_type
+
+    def get_parser(self, filename: Union[str, List[str]], **kwargs) -> 'ParserBase':
+        """
+        Creates parser for the file, inferring its type from the file extension. kwargs go to the parser.
+        For a list of files, creates ParserLayered merging them (later files override earlier ones),
+          kwargs go to ParserLayered.
+        daemon=True (or the daemon socket path) creates DaemonParser fetching the config from the config daemon,
+          see argumento.daemon, other kwargs go to the local parser used when the daemon is not available.
+        """
+        daemon = kwargs.pop('daemon', None)
+        if daemon:
+            from argumento.daemon import DaemonParser
+            return DaemonParser(filename, None if daemon is True else daemon, **kwargs)
+        if isinstance(filename, (list, tuple)):
+            from argumento.layered import ParserLayered
+            return ParserLayered([self.get_parser(layer_file) for layer_file in filename], **kwargs)
+        ext = os.path.splitext(filename)[1]
+        if ext.startswith('.'):
+            ext = ext[1:]
+        parser_type = self._parser_type(ext)
+        return parser_type(filename, **{**self._parser_kwargs[ext], **kwargs})
+
+
+factory = ParserFactory()
+factory.register_format(['yml', 'yaml'], 'argumento.parsers:ParserYaml')
+factory.register_format('toml', 'argumento.parsers:ParserToml')
+factory.register_format('json', 'argumento.parsers:ParserJson')
+
+create_parser = factory.get_parser
@@ -0,0 +1,113 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from argumento.arrays import NPY_PREFIX, resolve_npy_path
+from argumento.parsers import ParserBase
+from argumento.stats import phase
+
+if TYPE_CHECKING:
+    from argumento.cache import ConfigCache
+
+
+class ParserLayered(ParserBase):
+    """
+    Config composed of layer files of any registered formats: create_parser(['base.yaml', 'prod.toml', 'host.json']).
+    Layers are read in parallel and deep-merged in one pass (later layers override earlier ones, dicts are merged,
+      lists and other values are replaced), then ENV variables are resolved and command line args are applied
+      to the merged config once.
+    Relative '@npy:' references are resolved against the directory of the layer they come from.
+    """
+    def __init__(self, layers: List[ParserBase], cache: Union['ConfigCache', bool, None] = None,
+                 overrides: str = 'argparse', track_envs: bool = False, workers: Optional[int] = None):
+        """
+        :param layers: parsers of the layer files, from the lowest priority to the highest one
+        :param cache: ConfigCache (or True for the default one) to store the decoded layers in, each layer
+          is cached separately: when a single layer file changes, only that file is read again
+        :param workers: max number of layers read at once, all of them by default
+        """
+        if not layers:
+            raise ValueError('At least one config layer is required')
+        super().__init__(layers[0].config_file, None, overrides, track_envs)
+        if cache is True:
+            from argumento.cache import ConfigCache
+            cache = ConfigCache()
+        self.layers = list(layers)
+        self.workers = workers
+        self._layer_cache = cache or None
+        # dotted key -> file of the layer which set it, for the leaves of the last loaded config
+        self.provenance: Dict[str, str] = {}
+
+    @property
+    def config_files(self) -> List[str]:
+        return [layer.config_file for layer in self.layers]
+
+    def _read_config(self) -> dict:
+        with phase('layers'):
+            layer_configs = self._read_layers()
+        with phase('merge'):
+            config, self.provenance = merge_layers(zip(self.config_files, layer_configs))
+        return config
+
+    def _read_layers(self) -> List[dict]:
+        workers = min(len(self.layers), self.workers or len(self.layers))
+        if workers <= 1:
+            return [self._read_layer(layer) for layer in self.layers]
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(self._read_layer, self.layers))
+
+    def _read_layer(self, layer: ParserBase) -> dict:
+        """Decoded (not env-resolved) layer config, going through the layer cache if there is one."""
+        cache = self._layer_cache
+        if cache is None:
+            return layer._read_config()
+        try:
+            key = cache.make_key(layer.config_file, type(layer).__qualname__, 'layer')
+        except OSError:
+            key = None
+        entry = cache.get(key) if key is not None else None
+        if entry is not None:
+            return entry['config']
+        config = layer._read_config()
+        if key is not None:
+            try:
+                cache.put(key, {'config': config})
+            except OSError as e:
+                warnings.warn(f'Could not write config cache entry to {cache.cache_dir}: {e}')
+        return config
+
+
+def merge_layers(layers: Iterable[Tuple[str, dict]]) -> Tuple[dict, Dict[str, str]]:
+    """
+    Deep-merges (layer name, config) pairs into a new config, later layers override earlier ones.
+    Returns the merged config and {dotted key: name of the layer which set it} of its leaves.
+    """
+    merged = {}
+    provenance = {}
+    for name, config in layers:
+        if not isinstance(config, dict):
+            continue
+        base_dir = os.path.dirname(os.path.abspath(name))
+        stack = [(config, merged, '')]
+        while stack:
+            source, target, prefix = stack.pop()
+            for k, v in source.items():
+                path = f'{prefix}{k}'
+                old = target.get(k)
+                if isinstance(v, dict):
+                    if not isinstance(old, dict):
+                        provenance.pop(path, None)
+                        old = target[k] = {}
+                    stack.append((v, old, path + '.'))
+                    continue
+                if isinstance(old, dict):
+                    # a subtree replaced by a value
+                    sub_prefix = path + '.'
+                    for sub_path in [p for p in provenance if p.startswith(sub_prefix)]:
+                        del provenance[sub_path]
+                if isinstance(v, str) and v.startswith(NPY_PREFIX) and '${' not in v:
+                    v = resolve_npy_path(v, base_dir)
+                target[k] = v
+                provenance[path] = name
+    return merged, provenance
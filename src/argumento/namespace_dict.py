@@ -1,48 +1,496 @@
+from collections import abc
+from typing import Set
+
+_MISSING = object()
+_dict_get = dict.get
+_dict_setitem = dict.__setitem__
+_dict_items = dict.items
+_object_getattribute = object.__getattribute__
+_object_setattr = object.__setattr__
+# names of the slots (mangled, so that they can not shadow config keys of the same name)
+_PARENT = '_NamespaceDict__parent'
+_KEY = '_NamespaceDict__key'
+_INDEX = '_NamespaceDict__index'
+_DIGEST = '_NamespaceDict__digest'
+_HASH = '_FrozenNamespaceDict__hash'
+
+
 class NamespaceDict(dict):
+    """
+    dict with attribute access (d.key) and dotted keys (d['key.nested_key.other_key']) to nested items.
+    Nested dicts are converted to NamespaceDict. Values are stored once, in the dict itself (it is its own __dict__).
+    A node referencing itself is a reference cycle: discarded configs are freed by the cyclic garbage collector
+      (gc), not as soon as their last reference is dropped.
+
+    Dotted lookups go through a flat index {'nested.path': value} built lazily on first dotted lookup,
+      the index is updated in place on writes (through the node itself or any of its nested NamespaceDicts).
+    Content hashes (config_hash()) are cached per node and reset on writes along the path to the root.
+    """
+    __slots__ = ('__dict__', '__parent', '__key', '__index', '__digest')
+
     def __init__(self, *args, **kwargs):
-        super(NamespaceDict, self).__init__(*args, **kwargs)
-        for arg in args:
-            if isinstance(arg, dict):
-                for k, v in arg.items():
-                    self[k] = v
-        if kwargs:
-            for k, v in kwargs.items():
-                self[k] = v
+        super(NamespaceDict, self).__init__()
+        # the instance __dict__ is the dict itself: attribute lookups of items are done by the interpreter,
+        #  and items take precedence over dict methods (d.items is the item if there is one)
+        _object_setattr(self, '__dict__', self)
+        _object_setattr(self, _PARENT, None)
+        _object_setattr(self, _KEY, None)
+        _object_setattr(self, _INDEX, None)
+        _object_setattr(self, _DIGEST, None)
+        if args or kwargs:
+            NamespaceDict.update(self, *args, **kwargs)
+
+    @classmethod
+    def _from_items(cls, items):
+        """Restores NamespaceDict from (key, value) pairs with values already converted (used by pickle/deepcopy)."""
+        ns_dict = cls()
+        for k, v in items:
+            if isinstance(v, NamespaceDict):
+                NamespaceDict._attach(v, ns_dict, k)
+            _dict_setitem(ns_dict, k, v)
+        return ns_dict
+
+    def __reduce__(self):
+        return type(self)._from_items, (list(_dict_items(self)),)
+
+    def __copy__(self):
+        return type(self)(self)
 
     def __getattr__(self, attr):
-        return self.get(attr)
+        return None
+
+    def __setattr__(self, attr, value):
+        self[attr] = value
+
+    def __delattr__(self, item):
+        del self[item]
 
     def __getitem__(self, item):
-        idx_dot = item.find('.')
-        if idx_dot >= 0:
-            curr_attr = item[:idx_dot]
-            nested_attr = item[idx_dot + 1:]
-            nested_map = self.get(curr_attr)
-            return nested_map.get(nested_attr)
-        else:
-            return self.get(item)
+        if isinstance(item, str) and '.' in item:
+            index = _object_getattribute(self, _INDEX)
+            if index is None:
+                index = NamespaceDict._build_index(self)
+            return index.get(item)
+        return _dict_get(self, item)
 
     def __setitem__(self, key, value):
+        if isinstance(key, str):
+            idx_dot = key.find('.')
+            if idx_dot >= 0:
+                attr = key[:idx_dot]
+                nested_key = key[idx_dot+1:]
+                nested_map = _dict_get(self, attr)
+                if nested_map is None:
+                    nested_map = NamespaceDict()
+                    NamespaceDict._set(self, attr, nested_map)
+                nested_map[nested_key] = value
+                return
         if isinstance(value, dict):
             value = NamespaceDict(value)
-        idx_dot = key.find('.')
-        if idx_dot >= 0:
-            attr = key[:idx_dot]
-            nested_key = key[idx_dot+1:]
-            nested_map = self.get(attr)
-            if nested_map is None:
-                nested_map = NamespaceDict()
-            nested_map.__setitem__(nested_key, value)
-            super(NamespaceDict, self).__setitem__(attr, nested_map)
-            self.__dict__.update({attr: nested_map})
-        else:
-            super(NamespaceDict, self).__setitem__(key, value)
-            self.__dict__.update({key: value})
-
-    def __delattr__(self, item):
-        self.__delitem__(item)
+        NamespaceDict._set(self, key, value)
 
     def __delitem__(self, key):
-        super(NamespaceDict, self).__delitem__(key)
-        del self.__dict__[key]
+        if isinstance(key, str) and key not in self:
+            idx_dot = key.rfind('.')
+            if idx_dot >= 0:
+                nested_map = self[key[:idx_dot]]
+                if not isinstance(nested_map, NamespaceDict):
+                    raise KeyError(key)
+                del nested_map[key[idx_dot + 1:]]
+                return
+        old_value = super(NamespaceDict, self).pop(key)
+        if isinstance(old_value, NamespaceDict):
+            NamespaceDict._attach(old_value, None, None)
+        NamespaceDict._on_change(self, key, old_value, _MISSING)
+
+    def update(self, *args, **kwargs):
+        if len(args) > 1:
+            raise TypeError(f'update expected at most 1 positional argument, got {len(args)}')
+        if args:
+            other = args[0]
+            if isinstance(other, dict):
+                items = _dict_items(other)
+            elif isinstance(other, abc.Mapping):
+                items = other.items()
+            else:
+                items = other
+            # fast path: nothing is indexed above this node yet, new items need no index updates
+            fast = _object_getattribute(self, _INDEX) is None and _object_getattribute(self, _PARENT) is None
+            if fast:
+                _object_setattr(self, _DIGEST, None)
+            for k, v in items:
+                if fast and type(k) is str and '.' not in k \
+                        and not isinstance(_dict_get(self, k), NamespaceDict):
+                    if isinstance(v, dict):
+                        v = NamespaceDict(v)
+                        NamespaceDict._attach(v, self, k)
+                    _dict_setitem(self, k, v)
+                else:
+                    self[k] = v
+        for k, v in kwargs.items():
+            self[k] = v
+
+    def __ior__(self, other):
+        NamespaceDict.update(self, other)
+        return self
+
+    def setdefault(self, key, default=None):
+        value = NamespaceDict._lookup(self, key)
+        if value is _MISSING:
+            self[key] = default
+            value = NamespaceDict._lookup(self, key)
+        return value
+
+    def pop(self, key, *default):
+        value = NamespaceDict._lookup(self, key)
+        if value is not _MISSING:
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def _lookup(self, key):
+        """self[key] (dotted keys are nested), _MISSING if there is no such key."""
+        if isinstance(key, str) and '.' in key:
+            index = _object_getattribute(self, _INDEX)
+            if index is None:
+                index = NamespaceDict._build_index(self)
+            return index.get(key, _MISSING)
+        return _dict_get(self, key, _MISSING)
+
+    def popitem(self):
+        key, value = super(NamespaceDict, self).popitem()
+        if isinstance(value, NamespaceDict):
+            NamespaceDict._attach(value, None, None)
+        NamespaceDict._on_change(self, key, value, _MISSING)
+        return key, value
+
+    def clear(self):
+        for value in dict.values(self):
+            if isinstance(value, NamespaceDict):
+                NamespaceDict._attach(value, None, None)
+        super(NamespaceDict, self).clear()
+        node = self
+        while node is not None:
+            _object_setattr(node, _INDEX, None)
+            _object_setattr(node, _DIGEST, None)
+            node = _object_getattribute(node, _PARENT)
+
+    def _attach(self, parent, key):
+        _object_setattr(self, _PARENT, parent)
+        _object_setattr(self, _KEY, key)
+
+    def _set(self, key, value):
+        """Sets already converted value, keeps parent links and flat indices up to date."""
+        old_value = _dict_get(self, key, _MISSING)
+        if isinstance(old_value, NamespaceDict) and old_value is not value:
+            NamespaceDict._attach(old_value, None, None)
+        if isinstance(value, NamespaceDict):
+            NamespaceDict._attach(value, self, key)
+        _dict_setitem(self, key, value)
+        NamespaceDict._on_change(self, key, old_value, value)
+
+    def _on_change(self, key, old_value, new_value):
+        """Updates flat indices of the node and its ancestors after self[key] changed from old_value to new_value."""
+        # a node without a hash has no hashed ancestors: hashing a node hashes all of its subtrees
+        node = self
+        while node is not None and _object_getattribute(node, _DIGEST) is not None:
+            _object_setattr(node, _DIGEST, None)
+            node = _object_getattribute(node, _PARENT)
+        node = self
+        path = key
+        while node is not None and isinstance(path, str):
+            index = _object_getattribute(node, _INDEX)
+            if index is not None:
+                if node is not self:
+                    # top level keys are not indexed
+                    index.pop(path, None)
+                    if new_value is not _MISSING:
+                        index[path] = new_value
+                if isinstance(old_value, NamespaceDict):
+                    for sub_path, _ in _iter_paths(old_value, path + '.'):
+                        index.pop(sub_path, None)
+                if isinstance(new_value, NamespaceDict):
+                    index.update(_iter_paths(new_value, path + '.'))
+            node_key = _object_getattribute(node, _KEY)
+            node = _object_getattribute(node, _PARENT)
+            path = f'{node_key}.{path}' if isinstance(node_key, str) else None
+
+    def config_hash(self) -> str:
+        """
+        Content hash (hex) of the config, stable across processes and independent of the key order.
+        Leaves are hashed with their types: 1, 1.0, True and '1' differ, lists and tuples do not.
+        Hashes are computed Merkle-style and cached per node, so after a write only the nodes on the path
+          to the changed key are hashed again. In-place changes of list values are not tracked, set them again.
+        """
+        return _node_digest(self).hex()
+
+    def _build_index(self) -> dict:
+        index = {}
+        for k, v in _dict_items(self):
+            if isinstance(v, NamespaceDict) and isinstance(k, str):
+                index.update(_iter_paths(v, k + '.'))
+        _object_setattr(self, _INDEX, index)
+        return index
+
+
+def _iter_paths(ns_dict: NamespaceDict, prefix: str):
+    """Yields (prefix + dotted path, value) for all nested items of ns_dict, without recursion."""
+    stack = [(prefix, ns_dict)]
+    while stack:
+        prefix, node = stack.pop()
+        for k, v in _dict_items(node):
+            if not isinstance(k, str):
+                continue
+            path = prefix + k
+            yield path, v
+            if isinstance(v, NamespaceDict):
+                stack.append((path + '.', v))
+
+
+_blake2b = None
+_REPR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+def _node_digest(node: NamespaceDict) -> bytes:
+    digest = _object_getattribute(node, _DIGEST)
+    if digest is None:
+        digest = _items_digest(_dict_items(node))
+        _object_setattr(node, _DIGEST, digest)
+    return digest
+
+
+def _items_digest(items) -> bytes:
+    repr_types = _REPR_TYPES
+    parts = [f'{k!r}:{v!r}' if type(v) in repr_types else f'{k!r}:{_leaf_repr(v)}' for k, v in items]
+    parts.sort()
+    return _digest('\n'.join(parts).encode('utf-8', 'surrogatepass'))
+
+
+def _digest(data: bytes) -> bytes:
+    global _blake2b
+    if _blake2b is None:
+        from hashlib import blake2b
+        _blake2b = blake2b
+    return _blake2b(data, digest_size=16).digest()
+
+
+def _leaf_repr(value) -> str:
+    """Type-aware, process independent representation of a value for hashing."""
+    value_type = type(value)
+    if value_type in _REPR_TYPES:
+        return repr(value)
+    if isinstance(value, NamespaceDict):
+        return 'D' + _node_digest(value).hex()
+    if value_type is list or value_type is tuple:
+        return '[' + ','.join([_leaf_repr(v) for v in value]) + ']'
+    if isinstance(value, dict):
+        return 'D' + _items_digest(_dict_items(value)).hex()
+    type_name = f'{value_type.__module__}.{value_type.__qualname__}'
+    if type_name in ('numpy.ndarray', 'numpy.memmap'):
+        import numpy as np
+        return f'A{value.dtype.str}{value.shape}:{_digest(np.ascontiguousarray(value).tobytes()).hex()}'
+    if type_name == 'argumento.arrays.LazyArray':
+        # references are equal by path, see LazyArray
+        return f'L{value.path!r}'
+    return f'O{type_name}:{value!r}'
+
+
+def config_diff(old: NamespaceDict, new: NamespaceDict) -> Set[str]:
+    """
+    Dotted keys of the leaves which differ between the configs (changed, added or removed), compared the way
+      config_hash() does. Subtrees with equal hashes are skipped: diffing a config against one derived from it
+      (e.g. with FrozenNamespaceDict.evolve()) costs the changed paths only.
+    """
+    changed = set()
+    stack = [(old, new, '')]
+    while stack:
+        old_node, new_node, prefix = stack.pop()
+        if _node_digest(old_node) == _node_digest(new_node):
+            continue
+        keys = list(old_node)
+        keys.extend(k for k in new_node if k not in old_node)
+        for k in keys:
+            path = f'{prefix}{k}'
+            old_value = _dict_get(old_node, k, _MISSING)
+            new_value = _dict_get(new_node, k, _MISSING)
+            old_is_node = isinstance(old_value, NamespaceDict)
+            new_is_node = isinstance(new_value, NamespaceDict)
+            if old_is_node and new_is_node:
+                stack.append((old_value, new_value, path + '.'))
+            elif old_is_node or new_is_node:
+                for value in (old_value, new_value):
+                    if isinstance(value, NamespaceDict):
+                        changed.update(p for p, v in _iter_paths(value, path + '.')
+                                       if not isinstance(v, NamespaceDict))
+                    if value is not _MISSING and not (isinstance(value, NamespaceDict) and value):
+                        changed.add(path)
+            elif old_value is _MISSING or new_value is _MISSING or _leaf_repr(old_value) != _leaf_repr(new_value):
+                changed.add(path)
+    return changed
+
+
+class FrozenNamespaceDict(NamespaceDict):
+    """
+    Immutable, hashable NamespaceDict. Derived configs are made with evolve(), which shares all unchanged subtrees
+      with the original and copies only the nodes on the paths to the changed keys.
+    Nested dicts are frozen too, lists are stored as tuples, ndarrays as read-only copies. The hash is computed
+      on first use and cached (hashes of shared subtrees are reused by derived configs).
+    """
+    __slots__ = ('__hash',)
+
+    def __new__(cls, *args, **kwargs):
+        return dict.__new__(cls)
+
+    def __init__(self, *args, **kwargs):
+        # dotted keys (e.g. of argparse dests) are nested the same way NamespaceDict does it
+        items = NamespaceDict(*args, **kwargs)
+        FrozenNamespaceDict._init(self, ((k, _freeze(v)) for k, v in _dict_items(items)))
+
+    def _init(self, items):
+        _object_setattr(self, '__dict__', self)
+        _object_setattr(self, _PARENT, None)
+        _object_setattr(self, _KEY, None)
+        _object_setattr(self, _INDEX, None)
+        _object_setattr(self, _DIGEST, None)
+        _object_setattr(self, _HASH, None)
+        dict.update(self, items)
+
+    @classmethod
+    def _from_frozen(cls, items) -> 'FrozenNamespaceDict':
+        """Makes FrozenNamespaceDict from (key, value) pairs with values already frozen."""
+        frozen = dict.__new__(cls)
+        FrozenNamespaceDict._init(frozen, items)
+        return frozen
+
+    def __getitem__(self, item):
+        if isinstance(item, str) and '.' in item:
+            node = self
+            for key in item.split('.'):
+                if not isinstance(node, dict):
+                    return None
+                node = _dict_get(node, key)
+            return node
+        return _dict_get(self, item)
+
+    def evolve(self, changes=(), **kwargs) -> 'FrozenNamespaceDict':
+        """
+        Returns a copy with the changes applied: frozen.evolve({'model.optimizer.lr': 0.01, 'seed': 1}).
+        :param changes: dict or (key, value) pairs, dotted keys change nested values (missing nodes are created)
+        """
+        tree = _Changes()
+        for key, value in _iter_changes(changes, kwargs):
+            node = tree
+            if isinstance(key, str) and '.' in key:
+                *parents, key = key.split('.')
+                for parent in parents:
+                    child = _dict_get(node, parent, _MISSING)
+                    if type(child) is not _Changes:
+                        # a value set earlier in the same call is changed further
+                        child = _Changes(child if isinstance(child, FrozenNamespaceDict) else None)
+                        _dict_setitem(node, parent, child)
+                    node = child
+            _dict_setitem(node, key, _freeze(value))
+        return FrozenNamespaceDict._evolve(self, tree)
+
+    def _evolve(self, tree: '_Changes') -> 'FrozenNamespaceDict':
+        items = dict(self)
+        for key, change in _dict_items(tree):
+            if type(change) is _Changes:
+                node = change.base
+                if node is None:
+                    node = items.get(key)
+                    if not isinstance(node, FrozenNamespaceDict):
+                        node = _EMPTY
+                change = FrozenNamespaceDict._evolve(node, change)
+            items[key] = change
+        return FrozenNamespaceDict._from_frozen(_dict_items(items))
+
+    def thaw(self) -> NamespaceDict:
+        """Modifiable deep copy (tuples are converted back to lists, ndarrays are copied)."""
+        return NamespaceDict((k, _thaw(v)) for k, v in _dict_items(self))
+
+    def __hash__(self):
+        h = _object_getattribute(self, _HASH)
+        if h is None:
+            try:
+                h = hash(frozenset(_dict_items(self)))
+            except TypeError:
+                # unhashable leaves (ndarrays) are hashed by content, the way config_hash() does it
+                h = hash(_node_digest(self))
+            _object_setattr(self, _HASH, h)
+        return h
+
+    def __eq__(self, other):
+        try:
+            return dict.__eq__(self, other)
+        except ValueError:
+            # == of ndarray leaves is elementwise: configs with them are compared by content
+            return isinstance(other, dict) and _leaf_repr(self) == _leaf_repr(other)
+
+    def __ne__(self, other):
+        equal = FrozenNamespaceDict.__eq__(self, other)
+        return equal if equal is NotImplemented else not equal
+
+    def __reduce__(self):
+        return type(self)._from_frozen, (list(_dict_items(self)),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is immutable, use evolve()')
+
+    __setattr__ = __delattr__ = __setitem__ = __delitem__ = _read_only
+    update = __ior__ = setdefault = pop = popitem = clear = _set = _read_only
+
+
+class _Changes(dict):
+    """Changes of a node in FrozenNamespaceDict.evolve(), base is the node they are applied to if it is new."""
+    __slots__ = ('base',)
+
+    def __init__(self, base: FrozenNamespaceDict = None):
+        super(_Changes, self).__init__()
+        self.base = base
+
+
+_EMPTY = FrozenNamespaceDict()
+
+
+def _iter_changes(changes, kwargs):
+    if isinstance(changes, abc.Mapping):
+        changes = changes.items()
+    yield from changes
+    yield from kwargs.items()
+
+
+def _freeze(value):
+    if isinstance(value, FrozenNamespaceDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenNamespaceDict._from_frozen([(k, _freeze(v)) for k, v in _dict_items(value)])
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if type(value).__module__ == 'numpy':
+        import numpy as np
+        if isinstance(value, np.ndarray) and value.flags.writeable:
+            # read-only copy: the frozen config does not change with the array it was made of
+            value = np.array(value)
+            value.flags.writeable = False
+    return value
+
 
+def _thaw(value):
+    if isinstance(value, FrozenNamespaceDict):
+        return value.thaw()
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    if type(value).__module__ == 'numpy':
+        import numpy as np
+        if isinstance(value, np.ndarray):
+            return np.array(value)
+    return value
@@ -0,0 +1,354 @@
+import builtins
+import copy
+import os
+import re
+import sys
+from collections import namedtuple
+from typing import List, Optional, TYPE_CHECKING
+
+from argumento.arrays import NPY_PREFIX
+from argumento.namespace_dict import NamespaceDict
+from argumento.stats import count as count_stat, phase
+
+if TYPE_CHECKING:
+    import argparse
+
+
+def str2bool(v):
+    if isinstance(v, bool):
+        return v
+    if v.lower() in ('yes', 'true', 't', 'y', '1'):
+        return True
+    elif v.lower() in ('no', 'false', 'f', 'n', '0'):
+        return False
+    else:
+        import argparse
+        raise argparse.ArgumentTypeError('Boolean value expected.')
+
+
+class ListCaster:
+    """Casts comma separated command line value to list of item_type (picklable, unlike a lambda)."""
+    def __init__(self, item_type):
+        self.item_type = item_type
+        self.__name__ = f'list[{item_type.__name__}]'
+
+    def __call__(self, s: str) -> list:
+        return [self.item_type(item) for item in s.split(',')]
+
+    def __eq__(self, other):
+        return isinstance(other, ListCaster) and other.item_type is self.item_type
+
+    def __hash__(self):
+        return hash((ListCaster, self.item_type))
+
+    def __repr__(self):
+        return f'ListCaster({self.item_type.__name__})'
+
+
+ArgSpec = namedtuple('ArgSpec', ['type', 'default', 'required'])
+
+
+def arg_spec(value) -> ArgSpec:
+    """Command line argument type, default value and whether it is required, for config leaf value."""
+    if isinstance(value, str):
+        v_no_space = value.replace(' ', '')
+        if v_no_space.startswith('?:'):
+            # required param, not set in the config file, needs top be set in command line
+            type_name = v_no_space[2:]
+            if type_name.startswith('ndarray[') and type_name.endswith(']'):
+                from argumento.arrays import NdarrayCaster
+                return ArgSpec(NdarrayCaster(type_name[8:-1]), None, True)
+            # only list[int], list[float] supported
+            # TODO: list[str]
+            if type_name.startswith('list[') and type_name.endswith(']'):
+                item_type_name = type_name[5:-1]
+                assert item_type_name in ['int', 'float']
+                return ArgSpec(ListCaster(getattr(builtins, item_type_name)), None, False)
+            return ArgSpec(getattr(builtins, type_name), None, True)
+        if value.startswith(NPY_PREFIX):
+            from argumento.arrays import LazyArray
+            return ArgSpec(LazyArray, LazyArray(value[len(NPY_PREFIX):]), False)
+        return ArgSpec(str, value, False)
+    elif isinstance(value, bool):
+        return ArgSpec(str2bool, value, False)
+    return ArgSpec(type(value), value, False)
+
+
+def key_schema(cfg_file_dict: dict) -> tuple:
+    """Command line options of the config with their types: configs with equal schemas take the same args."""
+    schema = []
+    stack = [(cfg_file_dict, None)]
+    while stack:
+        node, parent = stack.pop()
+        for k, v in node.items():
+            full_key_name = k if parent is None else f'{parent}.{k}'
+            if isinstance(v, dict):
+                stack.append((v, full_key_name))
+                continue
+            spec = arg_spec(v)
+            schema.append((full_key_name, spec.type, spec.required))
+    return tuple(schema)
+
+
+KeySpec = namedtuple('KeySpec', ['dest', 'type', 'required'])
+
+# the same as argparse: negative numbers are values, not options
+_negative_number = re.compile(r'^-\d+$|^-\d*\.\d+$')
+
+
+def _looks_like_option(arg: str) -> bool:
+    return len(arg) > 1 and arg[0] == '-' and not _negative_number.match(arg) and ' ' not in arg
+
+
+def option_dest(option: str) -> str:
+    """argparse dest of '--option-name' is 'option_name'."""
+    return option.lstrip('-').replace('-', '_')
+
+
+class OverrideTable:
+    """
+    Command line overrides of config values without argparse.
+
+    The table keeps config defaults as a nested dict (keyed the way argparse names destinations)
+      and specs of '?:type' params. Command line args are scanned once, each '--key.nested_key' is looked up
+      by walking the defaults, so applying overrides costs O(number of args), regardless of the config size.
+    Semantics follow the argparse based parsing: unknown args are ignored, required ('?:type') params
+      must be set, str2bool is used for bool params. Option abbreviations (--log for --login) are not supported.
+    """
+    def __init__(self, defaults: dict, placeholders: dict):
+        """
+        :param defaults: nested dict of config defaults, '?:type' params are None
+        :param placeholders: option string -> KeySpec of '?:type' params
+        """
+        self.defaults = defaults
+        self.placeholders = placeholders
+        self.required = [option for option, spec in placeholders.items() if spec.required]
+
+    @classmethod
+    def from_config(cls, cfg_file_dict: dict) -> 'OverrideTable':
+        defaults = {}
+        placeholders = {}
+        has_empty = False
+        stack = [(cfg_file_dict, defaults, None)]
+        while stack:
+            node, target, parent = stack.pop()
+            if not node:
+                has_empty = True
+            for k, v in node.items():
+                full_key_name = k if parent is None else f'{parent}.{k}'
+                dest_key = option_dest(str(k)) if parent is None else str(k).replace('-', '_')
+                key_target = target
+                if '.' in dest_key:
+                    # literal dotted key in the config file, nested in the parsed config
+                    *dest_path, dest_key = dest_key.split('.')
+                    key_target = _child(target, dest_path)
+                if isinstance(v, dict):
+                    child = key_target.get(dest_key)
+                    if not isinstance(child, dict):
+                        child = key_target[dest_key] = {}
+                    stack.append((v, child, full_key_name))
+                    continue
+                spec = arg_spec(v)
+                if isinstance(v, str) and spec.default is None:
+                    option = f'--{full_key_name}'
+                    placeholders[option] = KeySpec(option_dest(option), spec.type, spec.required)
+                key_target[dest_key] = spec.default
+        if has_empty:
+            _prune_empty(defaults)
+        return cls(defaults, placeholders)
+
+    def spec(self, option: str) -> Optional[KeySpec]:
+        """KeySpec of the option, None if there is no such config key."""
+        spec = self.placeholders.get(option)
+        if spec is not None:
+            return spec
+        dest = option_dest(option)
+        node = self.defaults
+        for key in dest.split('.'):
+            if not isinstance(node, dict):
+                return None
+            node = node.get(key, _MISSING)
+            if node is _MISSING:
+                return None
+        if isinstance(node, dict):
+            return None
+        return KeySpec(dest, arg_spec(node).type, False)
+
+    def to_argparse(self) -> 'argparse.ArgumentParser':
+        import argparse
+
+        cmd_parser = argparse.ArgumentParser()
+        stack = [(self.defaults, None)]
+        while stack:
+            node, parent = stack.pop()
+            for k, v in node.items():
+                full_key_name = k if parent is None else f'{parent}.{k}'
+                if isinstance(v, dict):
+                    stack.append((v, full_key_name))
+                    continue
+                option = f'--{full_key_name}'
+                spec = self.placeholders.get(option) or KeySpec(full_key_name, arg_spec(v).type, False)
+                kwargs = {'required': True} if spec.required else {'default': v}
+                cmd_parser.add_argument(option, type=spec.type, **kwargs)
+        return cmd_parser
+
+    def parse_overrides(self, args: List[str] = None, exit_on_error: bool = True) -> dict:
+        """
+        Parses command line args (sys.argv[1:] by default), returns {dest: value} of the overridden keys only.
+        :param exit_on_error: report errors the way argparse does (message to stderr, exit code 2),
+          raise OverrideError otherwise
+        """
+        try:
+            return self._parse_overrides(args, print_help=exit_on_error)
+        except OverrideError as e:
+            if not exit_on_error:
+                raise
+            prog = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else 'argumento'
+            sys.stderr.write(f'{prog}: error: {e}\n')
+            sys.exit(2)
+
+    def _parse_overrides(self, args: Optional[List[str]], print_help: bool) -> dict:
+        if args is None:
+            args = sys.argv[1:]
+        overrides = {}
+        i = 0
+        n_args = len(args)
+        while i < n_args:
+            arg = args[i]
+            i += 1
+            if arg == '--':
+                break
+            if print_help and arg in ('-h', '--help'):
+                # let argparse print help and exit
+                self.to_argparse().parse_known_args(args)
+            if not arg.startswith('--'):
+                continue
+            option, eq, value = arg.partition('=')
+            spec = self.spec(option)
+            if spec is None:
+                # unknown args are tolerated
+                continue
+            if not eq:
+                if i >= n_args or _looks_like_option(args[i]):
+                    raise OverrideError(f'argument {option}: expected one argument')
+                value = args[i]
+                i += 1
+            overrides[spec.dest] = self._cast(option, spec.type, value)
+
+        missing = [option for option in self.required if self.placeholders[option].dest not in overrides]
+        if missing:
+            raise OverrideError(f'the following arguments are required: {", ".join(missing)}')
+        return overrides
+
+    def parse_args(self, args: List[str] = None, exit_on_error: bool = True) -> NamespaceDict:
+        """Parses command line args (sys.argv[1:] by default), returns config defaults updated with overrides."""
+        with phase('parse_args'):
+            overrides = self.parse_overrides(args, exit_on_error)
+        count_stat('overrides', len(overrides))
+        with phase('namespace'):
+            ns_dict = NamespaceDict(self.defaults)
+            for dest, value in overrides.items():
+                ns_dict[dest] = value
+        return ns_dict
+
+    @staticmethod
+    def _cast(option: str, type_, value: str):
+        try:
+            return type_(value)
+        except Exception as e:
+            import argparse
+            if isinstance(e, argparse.ArgumentTypeError):
+                raise OverrideError(f'argument {option}: {e}') from e
+            if isinstance(e, (TypeError, ValueError)):
+                name = getattr(type_, '__name__', repr(type_))
+                raise OverrideError(f'argument {option}: invalid {name} value: {value!r}') from e
+            raise
+
+
+class CompiledConfig:
+    """
+    Config compiled once (loaded, env-resolved, with the override table built) for applying
+      many command line override vectors to it, see ParserBase.compile().
+
+    The object is immutable: safe to use from many threads at once, picklable for process pools.
+    """
+    __slots__ = ('_table', '_mutable_paths')
+
+    def __init__(self, table: OverrideTable):
+        object.__setattr__(self, '_table', table)
+        # leaves which are copied on each apply(), so that configs do not share them
+        object.__setattr__(self, '_mutable_paths', tuple(_mutable_leaf_paths(table.defaults)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return type(self), (self._table,)
+
+    @property
+    def required(self) -> List[str]:
+        """Options that must be set on each apply() call."""
+        return list(self._table.required)
+
+    @property
+    def n_leaves(self) -> int:
+        """Number of leaves of the config, apply() copies the config at about 1us per leaf."""
+        n_leaves = 0
+        stack = [self._table.defaults]
+        while stack:
+            for value in stack.pop().values():
+                if isinstance(value, dict):
+                    stack.append(value)
+                else:
+                    n_leaves += 1
+        return n_leaves
+
+    def apply(self, args: List[str] = (), exit_on_error: bool = False) -> NamespaceDict:
+        """
+        Returns the config updated with command line overrides (e.g. ['--key', 'value', '--other.key=1']).
+        :param exit_on_error: exit the way argparse does on invalid args, raise OverrideError by default
+        """
+        overrides = self._table.parse_overrides(list(args), exit_on_error)
+        ns_dict = NamespaceDict(self._table.defaults)
+        for path in self._mutable_paths:
+            node = ns_dict
+            for key in path[:-1]:
+                node = dict.__getitem__(node, key)
+            node[path[-1]] = copy.deepcopy(dict.__getitem__(node, path[-1]))
+        for dest, value in overrides.items():
+            ns_dict[dest] = value
+        return ns_dict
+
+
+class OverrideError(ValueError):
+    pass
+
+
+_MISSING = object()
+
+
+def _child(node: dict, path: List[str]) -> dict:
+    for key in path:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            child = node[key] = {}
+        node = child
+    return node
+
+
+def _prune_empty(node: dict) -> bool:
+    """Removes empty nested dicts (argparse has no arguments for them), returns True if node became empty."""
+    for k in [k for k, v in node.items() if isinstance(v, dict) and _prune_empty(v)]:
+        del node[k]
+    return not node
+
+
+def _mutable_leaf_paths(defaults: dict):
+    stack = [((), defaults)]
+    while stack:
+        path, node = stack.pop()
+        for k, v in node.items():
+            if isinstance(v, dict):
+                stack.append((path + (k,), v))
+            elif isinstance(v, (list, set, bytearray)):
+                yield path + (k,)
@@ -1,19 +1,29 @@
-import argparse
-import json
+import copy
 import os.path
 import os
 import re
 from abc import ABC, abstractmethod
-from ast import literal_eval
 from collections import abc
-from typing import Union, List, Type
+from typing import Dict, Iterable, Iterator, Optional, Set, Union, List, TYPE_CHECKING
 import warnings
 
-import toml
-import yaml
-import builtins
-
+from argumento.arrays import NPY_PREFIX, resolve_npy_path
+from argumento.factory import ParserFactory, factory, create_parser
 from argumento.namespace_dict import NamespaceDict
+from argumento.overrides import CompiledConfig, OverrideTable, arg_spec, key_schema, option_dest, str2bool
+from argumento.selection import select_subtrees, selection_tree
+from argumento.stats import ParseStats, count as count_stat, current as current_stats, phase, record as record_stats
+
+# argparse, ast, json, format libraries and the cache are imported on first use to keep `import argumento` cheap
+if TYPE_CHECKING:
+    import argparse
+    from concurrent.futures import Executor
+    from argumento.cache import ConfigCache
+    from argumento.sweep import Sweep
+
+_MISSING = object()
+# values which are not copied when shared by configs
+_IMMUTABLE_TYPES = frozenset([str, int, float, bool, type(None)])
 
 
 class ResolveWarning(UserWarning):
@@ -24,18 +34,11 @@ class CastingWarning(UserWarning):
     pass
 
 
-def str2bool(v):
-    if isinstance(v, bool):
-        return v
-    if v.lower() in ('yes', 'true', 't', 'y', '1'):
-        return True
-    elif v.lower() in ('no', 'false', 'f', 'n', '0'):
-        return False
-    else:
-        raise argparse.ArgumentTypeError('Boolean value expected.')
-
-
 class EnvResolver:
+    """
+    Resolves '${NAME:type|default}' placeholders in config string values.
+    Holds no per-call state, so a single instance is shared by all parsers (ParserBase.env_resolver).
+    """
     def __init__(self):
         self.default_value = ""
         self.pattern = re.compile(r'\$\{(\w+)(?::(\w+))?(?:\|([^}]*))?}')  # pattern: '${NAME:type|default}'
@@ -49,27 +52,53 @@ class EnvResolver:
 
     def _nested_dict_iter(self, nested: abc.Mapping):
         """
-        Recursively iterates over nested (optionally) dictionary,
-          traversing list-like and dict-like structures,
-          yields on leaf nodes (to be processed).
-        """
-        for key, value in nested.items():
-            if isinstance(value, abc.Mapping):
-                yield from self._nested_dict_iter(value)
-            elif isinstance(value, list):
-                for i, item in enumerate(value):
-                    if isinstance(item, abc.Mapping):
-                        yield from self._nested_dict_iter(item)
-                    else:
-                        yield value, i, item
+        Iterates over nested (optionally) dictionary without recursion,
+          traversing list-like and dict-like structures (lists of lists included),
+          yields (container, key, value) on leaf nodes (to be processed).
+        """
+        stack = [nested]
+        while stack:
+            container = stack.pop()
+            items = container.items() if isinstance(container, abc.Mapping) else enumerate(container)
+            for key, value in items:
+                if isinstance(value, (abc.Mapping, list)):
+                    stack.append(value)
+                else:
+                    yield container, key, value
+
+    def _nested_dict_iter_paths(self, nested: abc.Mapping):
+        """
+        _nested_dict_iter() yielding (path, container, key, value), path is the tuple of keys/indices to the leaf
+          in the parsed config: keys of nested dicts as argparse dests ('pass-word' -> 'pass_word'), literal dotted
+          keys split (see OverrideTable.from_config), keys of dicts in lists as they are.
+        """
+        # (path, container, container is a dict of config keys)
+        stack = [((), nested, True)]
+        while stack:
+            prefix, container, config_keys = stack.pop()
+            if isinstance(container, abc.Mapping):
+                items = container.items()
             else:
-                yield nested, key, value
+                items = enumerate(container)
+                config_keys = False
+            for key, value in items:
+                if config_keys:
+                    dest = option_dest(str(key)) if not prefix else str(key).replace('-', '_')
+                    path = prefix + tuple(dest.split('.'))
+                else:
+                    path = prefix + (key,)
+                if isinstance(value, (abc.Mapping, list)):
+                    stack.append((path, value, config_keys))
+                else:
+                    yield path, container, key, value
 
-    def _resolve_match(self, match):
+    def _resolve_match(self, match, used_envs: set = None):
         """Handles the replacement of a single match from the regex."""
         var_name = match.group(1)  # Environment variable name
         cast_type = match.group(2)  # Optional cast type (e.g., int, float, bool)
         default_value = match.group(3)
+        if used_envs is not None:
+            used_envs.add(var_name)
 
         env_value = os.environ.get(var_name, default_value if default_value is not None else self.default_value)
 
@@ -82,6 +111,9 @@ class EnvResolver:
 
     def _cast_value(self, value, cast_type, default_value):
         """Casts the value to the specified type, or evaluates literals if no cast_type is specified."""
+        import argparse
+        from ast import literal_eval
+
         try:
             evaluated_value = literal_eval(value)
         except (ValueError, SyntaxError):
@@ -113,47 +145,363 @@ class EnvResolver:
                               CastingWarning)
             return evaluated_value
 
-    def _parse_string(self, string: str):
+    def _resolve_memoized(self, match, memo: dict, used_envs: set = None):
+        """Resolves the match once per resolve_envs() call, the same placeholder is not looked up/cast twice."""
+        placeholder = match.group(0)
+        value = memo.get(placeholder, _MISSING)
+        if value is _MISSING:
+            value = memo[placeholder] = self._resolve_match(match, used_envs)
+        elif isinstance(value, (list, dict, set)):
+            # do not share mutable values between config items
+            value = copy.deepcopy(value)
+        return value
+
+    def _parse_string(self, string: str, memo: dict = None, used_envs: set = None):
         """Pattern-matches string with self.pattern, substitutes match groups with os.environ/default values."""
-        all_matches = list(self.pattern.finditer(string))
+        if memo is None:
+            memo = {}
+        resolved = memo.get(string, _MISSING)
+        if resolved is not _MISSING:
+            return copy.deepcopy(resolved) if isinstance(resolved, (list, dict, set)) else resolved
 
         # If there is exactly one match and no extra text, return the resolved type
-        if len(all_matches) == 1 and string.strip() == all_matches[0].group(0):
-            return self._resolve_match(all_matches[0])
-
-        # Otherwise, replace all matches and return the full string
-        return self.pattern.sub(lambda match: str(self._resolve_match(match)), string)
+        match = self.pattern.fullmatch(string.strip())
+        if match is not None:
+            resolved = self._resolve_memoized(match, memo, used_envs)
+        else:
+            # Otherwise, replace all matches and return the full string
+            resolved = self.pattern.sub(lambda m: str(self._resolve_memoized(m, memo, used_envs)), string)
+        memo[string] = resolved
+        return resolved
 
-    def resolve_envs(self, config: dict) -> dict:
-        """Entry point for config (dict) variables recursive env. search and resolve"""
-        for container, key, value in self._nested_dict_iter(config):
-            if isinstance(value, str):
-                container[key] = self._parse_string(value)
+    def resolve_envs(self, config: dict, used_envs: set = None, index: 'EnvIndex' = None,
+                     base_dir: str = None) -> dict:
+        """
+        Entry point for config (dict) variables env. search and resolve, config is modified in place.
+        :param used_envs: set to add names of the referenced ENV variables to
+        :param index: EnvIndex to record the resolved leaves in, see refresh_envs()
+        :param base_dir: directory to resolve relative '@npy:' file references against (see argumento.arrays)
+        """
+        memo = {}
+        stats = current_stats()
+        if index is not None:
+            leaves = self._nested_dict_iter_paths(config)
+            # (id of container, key) -> (template, variable names) of the resolved leaves: containers reached
+            #   by several paths (yaml aliases) are resolved once, the leaves are recorded for each path
+            templates = {}
+        else:
+            leaves = ((None, container, key, value) for container, key, value in self._nested_dict_iter(config))
+        for path, container, key, value in leaves:
+            if index is not None and templates:
+                template = templates.get((id(container), key))
+                if template is not None:
+                    index.add(path, template[0], value, template[1])
+                    continue
+            if not isinstance(value, str):
+                continue
+            # cheap prefilter, most of the values are not templates
+            if '${' in value:
+                container[key] = resolved = self._parse_string(value, memo, used_envs)
+                if stats is not None:
+                    stats.count('env_placeholders', len(self.pattern.findall(value)))
+                if index is not None:
+                    var_names = [m.group(1) for m in self.pattern.finditer(value)]
+                    templates[id(container), key] = (value, var_names)
+                    index.add(path, value, resolved, var_names)
+                if not isinstance(resolved, str):
+                    continue
+                value = resolved
+            if base_dir is not None and value.startswith(NPY_PREFIX):
+                container[key] = resolve_npy_path(value, base_dir)
         return config
 
+    def refresh_envs(self, config: dict, index: 'EnvIndex', changed_vars: Iterable[str] = None) -> Set[str]:
+        """
+        Re-resolves the leaves of an already resolved (and parsed) config which depend on the changed ENV variables,
+          in place. Takes time proportional to the number of the affected leaves, the config file is not read.
+        Leaves whose values differ from the recorded ones (e.g. set from command line) are kept.
+        :param index: EnvIndex recorded by resolve_envs() of the config
+        :param changed_vars: names of the changed variables, by default the variables whose values differ
+          from the recorded ones
+        :return: dotted paths of the changed leaves in the parsed config (list items as 'key.<index>')
+        """
+        if changed_vars is None:
+            changed_vars = index.changed_vars()
+        memo = {}
+        changed = set()
+        for leaf in index.refresh_leaves(changed_vars):
+            container = config
+            # (NamespaceDict, key, list) of the outermost list on the path, lists are changed in place
+            list_owner = None
+            for key in leaf.path[:-1]:
+                child = _get_child(container, key)
+                if list_owner is None and isinstance(child, list) and isinstance(container, NamespaceDict):
+                    list_owner = (container, key, child)
+                container = child
+            key = leaf.path[-1]
+            current = _get_child(container, key)
+            if current is _MISSING:
+                continue
+            if current != leaf.value:
+                # set from command line (kept), or already refreshed through a list shared with another path
+                #   (yaml aliases)
+                value = self._parse_string(leaf.template, memo)
+                if value == current and type(value) is type(current):
+                    leaf.value = copy.deepcopy(value) if isinstance(value, (list, dict, set)) else value
+                    changed.add('.'.join(map(str, leaf.path)))
+                continue
+            value = self._parse_string(leaf.template, memo)
+            leaf.value = copy.deepcopy(value) if isinstance(value, (list, dict, set)) else value
+            if value == current and type(value) is type(current):
+                continue
+            if isinstance(container, NamespaceDict):
+                NamespaceDict._set(container, key, NamespaceDict(value) if isinstance(value, dict) else value)
+            else:
+                container[key] = value
+            if list_owner is not None:
+                # set the list again: resets the cached hashes of the enclosing nodes (see config_hash())
+                NamespaceDict._set(*list_owner)
+            changed.add('.'.join(map(str, leaf.path)))
+        return changed
+
+
+def _get_child(container, key):
+    if isinstance(container, dict):
+        return dict.get(container, key, _MISSING)
+    if isinstance(container, list) and isinstance(key, int) and 0 <= key < len(container):
+        return container[key]
+    return _MISSING
+
+
+class EnvLeaf:
+    __slots__ = ('path', 'template', 'value')
+
+    def __init__(self, path: tuple, template: str, value):
+        self.path = path
+        self.template = template
+        self.value = value
+
+
+class EnvIndex:
+    """
+    ENV variable dependencies of a resolved config: the leaves (paths, templates and resolved values)
+      referencing each variable, and the variable values they were resolved with. See EnvResolver.refresh_envs().
+    """
+    def __init__(self):
+        self.leaves: Dict[str, List[EnvLeaf]] = {}
+        self.envs: Dict[str, Optional[str]] = {}
+
+    def add(self, path: tuple, template: str, value, var_names: List[str]):
+        leaf = EnvLeaf(path, template, copy.deepcopy(value) if isinstance(value, (list, dict, set)) else value)
+        for name in dict.fromkeys(var_names):
+            self.leaves.setdefault(name, []).append(leaf)
+            self.envs[name] = os.environ.get(name)
+
+    def changed_vars(self) -> Set[str]:
+        """Variables whose values differ from the ones the config was resolved with."""
+        environ = os.environ
+        return {name for name, value in self.envs.items() if environ.get(name) != value}
+
+    def refresh_leaves(self, changed_vars: Iterable[str]) -> List[EnvLeaf]:
+        """Leaves depending on the changed variables, records the current values of the variables."""
+        leaves = {}
+        for name in changed_vars:
+            for leaf in self.leaves.get(name, ()):
+                leaves[id(leaf)] = leaf
+            if name in self.envs:
+                self.envs[name] = os.environ.get(name)
+        return list(leaves.values())
+
 
 class ParserBase(ABC):
-    def __init__(self, config_file: str):
+    env_resolver = EnvResolver()
+
+    override_modes = ('argparse', 'argv')
+
+    def __init__(self, config_file: str, cache: Union['ConfigCache', bool, None] = None, overrides: str = 'argparse',
+                 track_envs: bool = False):
+        """
+        :param config_file: path to the config file
+        :param cache: ConfigCache (or True for the default one) to store loaded and env-resolved configs in
+        :param overrides: how command line args override config values:
+          'argparse' - argparse parser with an argument per config key,
+          'argv' - single pass over command line args with a key lookup table (see OverrideTable),
+            its cost does not depend on the config size
+        :param track_envs: record ENV variable dependencies of the loaded config (env_index) for refresh_env()
+        """
+        if overrides not in self.override_modes:
+            raise ValueError(f'Invalid overrides mode: "{overrides}". Supported modes are: {list(self.override_modes)}.')
         self._config_file = config_file
-        self.env_resolver = EnvResolver()
+        self.overrides = overrides
+        self.track_envs = track_envs
+        # ENV variable dependencies of the last loaded config, if track_envs
+        self.env_index: Optional[EnvIndex] = None
+        # stats of the last parse(stats=True) call
+        self.last_stats: Optional[ParseStats] = None
+        if cache is True:
+            from argumento.cache import ConfigCache
+            cache = ConfigCache()
+        self._cache = cache or None
+
+    @property
+    def config_file(self) -> str:
+        return self._config_file
+
+    @property
+    def _base_dir(self) -> str:
+        """Directory of the config file, relative file references in the config are resolved against it."""
+        return os.path.dirname(os.path.abspath(self._config_file))
 
     @abstractmethod
     def _read_config(self):
         pass
 
-    def parse(self) -> NamespaceDict:
-        cfg_file_dict = self._read_config()
-        cfg_file_dict = self.env_resolver.resolve_envs(cfg_file_dict)
-        cmd_arg_parser = self._cmd_args_from_cfg_keys(cfg_file_dict)
-        args, _ = cmd_arg_parser.parse_known_args()
-        return NamespaceDict(vars(args))
+    def _read_config_selected(self, selection: dict) -> dict:
+        """Reads selected (see selection_tree) config subtrees only. Parsers may override it to skip the rest early."""
+        return select_subtrees(self._read_config(), selection)
+
+    def _load_config(self, select: List[str] = None) -> dict:
+        """Reads config file (selected subtrees only) and resolves envs in it, going through the cache if there is one."""
+        selection = None if select is None else selection_tree(select)
+        cache_key = None
+        if self._cache is not None:
+            key_parts = [type(self).__qualname__]
+            if selection is not None:
+                key_parts.append(f'select={sorted(select)}')
+            with phase('cache'):
+                try:
+                    cache_key = self._cache.make_key(self._config_file, *key_parts)
+                except OSError:
+                    cache_key = None
+                entry = self._cache.get(cache_key) if cache_key is not None else None
+            if entry is not None and all(os.environ.get(name) == value for name, value in entry['envs'].items()) \
+                    and (not self.track_envs or 'env_index' in entry):
+                if self.track_envs:
+                    self.env_index = entry['env_index']
+                return entry['config']
+
+        used_envs = set()
+        env_index = EnvIndex() if self.track_envs else None
+        cfg_file_dict = self._read_config() if selection is None else self._read_config_selected(selection)
+        with phase('resolve_envs'):
+            cfg_file_dict = self.env_resolver.resolve_envs(cfg_file_dict, used_envs, env_index, self._base_dir)
+        if self.track_envs:
+            self.env_index = env_index
+
+        if cache_key is not None:
+            entry = {'envs': {name: os.environ.get(name) for name in used_envs}, 'config': cfg_file_dict}
+            if env_index is not None:
+                entry['env_index'] = env_index
+            with phase('cache'):
+                try:
+                    self._cache.put(cache_key, entry)
+                except OSError as e:
+                    warnings.warn(f'Could not write config cache entry to {self._cache.cache_dir}: {e}')
+        return cfg_file_dict
+
+    def parse(self, args: List[str] = None, select: List[str] = None,
+              stats: Union[ParseStats, bool] = None) -> NamespaceDict:
+        """
+        Reads config and overrides its values with command line args.
+        :param args: command line args, sys.argv[1:] by default
+        :param select: dotted keys of the config subtrees to read, e.g. ['db', 'model.optimizer'], the whole config
+          by default. Other keys are not env-resolved and have no command line args (their '?:type' params are
+          not required)
+        :param stats: ParseStats to record the phases of the call in, or True to record them in a new ParseStats
+          stored as self.last_stats, see argumento.stats
+        """
+        return record_stats(self, stats, self._parse, args, select)
+
+    async def parse_async(self, args: List[str] = None, select: List[str] = None,
+                          executor: 'Executor' = None) -> NamespaceDict:
+        """
+        parse() for asyncio code: the file is read and parsed in the executor (the event loop default one by default).
+        See argumento.aio.AsyncConfigLoader for cached and deduplicated loading.
+        """
+        from argumento.aio import parse_async
+        return await parse_async(self, args, select, executor)
+
+    def _parse(self, args: List[str] = None, select: List[str] = None) -> NamespaceDict:
+        cfg_file_dict = self._load_config(select)
+        if self.overrides == 'argv':
+            with phase('cmd_args'):
+                table = OverrideTable.from_config(cfg_file_dict)
+            return table.parse_args(args)
+        with phase('cmd_args'):
+            cmd_arg_parser = self._cmd_args_from_cfg_keys(cfg_file_dict)
+        with phase('parse_args'):
+            parsed_args, _ = cmd_arg_parser.parse_known_args(args)
+        with phase('namespace'):
+            return NamespaceDict(vars(parsed_args))
+
+    def sweep(self, args: List[str] = None, mode: str = 'grid', n: int = None, seed: int = None,
+              select: List[str] = None) -> 'Sweep':
+        """
+        Reads config once, returns the configs of a parameter sweep (lazily generated FrozenNamespaceDicts):
+          parser.sweep(['--sweep', 'lr=0.1,0.01', '--sweep', 'model.depth=2,4,8', '--epochs', '10'])
+        Raises OverrideError on invalid args. See argumento.sweep for the sweep options.
+        :param args: command line args, sys.argv[1:] by default
+        :param mode: 'grid' (cartesian product), 'zip' or 'random', --sweep-mode takes precedence
+        :param n: number of 'random' mode samples, --sweep-n takes precedence
+        :param seed: random seed of 'random' mode, --sweep-seed takes precedence
+        :param select: dotted keys of the config subtrees to read, see parse()
+        """
+        import sys
+        from argumento.sweep import Sweep
+        table = OverrideTable.from_config(self._load_config(select))
+        return Sweep(table, sys.argv[1:] if args is None else args, mode, n, seed)
+
+    def refresh_env(self, config: dict, changed_vars: Iterable[str] = None) -> Set[str]:
+        """
+        Re-resolves the ENV dependent values of the config returned by the last parse() in place (track_envs=True),
+          without reading the config file. See EnvResolver.refresh_envs().
+        :param changed_vars: names of the changed ENV variables, by default the ones changed since the config was loaded
+        :return: dotted paths of the changed values
+        """
+        if self.env_index is None:
+            raise ValueError('No ENV dependencies recorded: create the parser with track_envs=True and parse() first')
+        return self.env_resolver.refresh_envs(config, self.env_index, changed_vars)
+
+    def compile(self, select: List[str] = None) -> CompiledConfig:
+        """
+        Reads config once, returns immutable CompiledConfig to apply many command line override vectors to:
+          compiled.apply(['--key', 'value'])
+        :param select: dotted keys of the config subtrees to read, see parse()
+        """
+        return CompiledConfig(OverrideTable.from_config(self._load_config(select)))
+
+    def _parse_document(self, cfg_file_dict: dict, args: List[str], overrides_by_schema: dict) -> NamespaceDict:
+        """
+        parse() of an env-resolved config document, command line args are parsed once per key schema
+          of the documents (overrides_by_schema: key_schema() -> {dest: value} of the overridden keys).
+        """
+        table = OverrideTable.from_config(cfg_file_dict)
+        schema = key_schema(cfg_file_dict)
+        overrides = overrides_by_schema.get(schema)
+        if overrides is None:
+            if self.overrides == 'argv':
+                overrides = table.parse_overrides(args)
+            else:
+                import argparse
+                cmd_arg_parser = self._cmd_args_from_cfg_keys(
+                    cfg_file_dict, cmd_parser=argparse.ArgumentParser(argument_default=argparse.SUPPRESS))
+                overrides = vars(cmd_arg_parser.parse_known_args(args)[0])
+            overrides_by_schema[schema] = overrides
+        ns_dict = NamespaceDict(table.defaults)
+        for dest, value in overrides.items():
+            # override values are shared by the documents, mutable ones (e.g. '?:list[int]', '?:ndarray[float32]')
+            #   are copied
+            ns_dict[dest] = value if type(value) in _IMMUTABLE_TYPES else copy.deepcopy(value)
+        return ns_dict
 
     @classmethod
     def _cmd_args_from_cfg_keys(cls,
                                 cfg_file_dict: dict,
                                 parent_cfg_name: str = None,
-                                cmd_parser: argparse.ArgumentParser = None
-                                ) -> argparse.ArgumentParser:
+                                cmd_parser: 'argparse.ArgumentParser' = None
+                                ) -> 'argparse.ArgumentParser':
+        import argparse
+
         if cmd_parser is None:
             cmd_parser = argparse.ArgumentParser()
         for k, v in cfg_file_dict.items():
@@ -161,92 +509,231 @@ class ParserBase(ABC):
             if isinstance(v, dict):
                 # recursion for nested nodes in config
                 cls._cmd_args_from_cfg_keys(v, full_key_name, cmd_parser)
-            elif isinstance(v, str):
-                v_no_space = v.replace(' ', '')
-                if v_no_space.startswith('?:'):
-                    # required param, not set in the config file, needs top be set in command line
-                    type_name = v_no_space[2:]
-                    # only list[int], list[float] supported
-                    # TODO: list[str]
-                    if type_name.startswith('list[') and type_name.endswith(']'):
-                        item_type_name = type_name[5:-1]
-                        assert item_type_name in ['int', 'float']
-                        item_type = getattr(builtins, item_type_name)
-                        cmd_parser.add_argument(f'--{full_key_name}',
-                                                type=lambda s: [item_type(item) for item in s.split(',')])
-                    else:
-                        type_ = getattr(builtins, type_name)
-                        cmd_parser.add_argument(f'--{full_key_name}', required=True, type=type_)
-                else:
-                    cmd_parser.add_argument(f'--{full_key_name}', type=str, default=v)
-            elif isinstance(v, bool):
-                cmd_parser.add_argument(f'--{full_key_name}', type=str2bool, default=v)
+                continue
+            spec = arg_spec(v)
+            count_stat('argparse_arguments')
+            if spec.required:
+                cmd_parser.add_argument(f'--{full_key_name}', required=True, type=spec.type)
+            elif cmd_parser.argument_default is argparse.SUPPRESS:
+                # only the args set in command line are parsed
+                cmd_parser.add_argument(f'--{full_key_name}', type=spec.type)
             else:
-                cmd_parser.add_argument(f'--{full_key_name}', type=type(v), default=v)
+                cmd_parser.add_argument(f'--{full_key_name}', type=spec.type, default=spec.default)
         return cmd_parser
 
 
-class ParserToml(ParserBase):
-    def __init__(self, config_file: str):
-        super().__init__(config_file)
+# loaders take bytes, large config files may be passed as read-only mmap or binary stream, see ParserFileBase
 
-    def _read_config(self) -> dict:
-        with open(self._config_file, 'r', encoding='utf8') as f:
-            return toml.load(f)
+def _toml_backend_tomllib():
+    import tomllib  # python 3.11+
+    return lambda data: tomllib.loads(str(data, 'utf-8'))
 
 
-class ParserYaml(ParserBase):
-    def __init__(self, config_file: str):
-        super().__init__(config_file)
+def _toml_backend_toml():
+    import toml
+    return lambda data: toml.loads(str(data, 'utf-8'))
 
-    def _read_config(self) -> dict:
-        with open(self._config_file, 'r', encoding='utf8') as f:
-            return yaml.safe_load(f)
 
+def _yaml_backend_libyaml():
+    import yaml
+    loader = yaml.CSafeLoader  # AttributeError if PyYAML is built without libyaml
+    return lambda data: yaml.load(data, Loader=loader)
 
-class ParserJson(ParserBase):
-    def __init__(self, config_file: str):
-        super().__init__(config_file)
 
-    def _read_config(self) -> dict:
-        with open(self._config_file, 'r', encoding='utf8') as f:
-            data = f.read().encode("utf-8")
+def _yaml_backend_pyyaml():
+    import yaml
+    return yaml.safe_load
+
+
+def _json_backend_orjson():
+    import orjson
+
+    def _loads(data):
+        if isinstance(data, bytes):
+            return orjson.loads(data)
+        with memoryview(data) as view:
+            return orjson.loads(view)
+    return _json_fallback(_loads)
+
+
+def _json_backend_ujson():
+    import ujson
+    return _json_fallback(ujson.loads)
+
+
+def _json_backend_json():
+    import json
+
+    def _loads(data):
+        if isinstance(data, bytes):
             return json.loads(data)
+        # json.loads() does not take buffers, decode them the way it decodes bytes
+        return json.loads(str(data, json.detect_encoding(data[:4])))
+    return _loads
 
 
-class ParserFactory:
-    def __init__(self):
-        self._parsers = {}
-
-    def _register_single_format(self, fmt: str, parser: Type[ParserBase]):
-        if fmt in self._parsers:
-            warnings.warn(f'Format {fmt} is already bound to {self._parsers[fmt]}. The value will be overwritten!')
-        self._parsers[fmt] = parser
-
-    def register_format(self, fmt: Union[str, List[str]], parser_type: Type[ParserBase]):
-        if isinstance(fmt, str):
-            self._register_single_format(fmt, parser_type)
-        elif isinstance(fmt, list) and all(isinstance(x, str) for x in fmt):
-            for fmt_item in fmt:
-                self._register_single_format(fmt_item, parser_type)
-        else:
-            raise ValueError(f'Invalid format: {fmt}')
+def _json_fallback(loads):
+    """Third-party json libs are stricter than json (e.g. NaN, huge ints), falls back to json on their errors."""
+    json_loads = _json_backend_json()
 
-    def get_parser(self, filename: str) -> ParserBase:
-        ext = os.path.splitext(filename)[1]
-        if ext.startswith('.'):
-            ext = ext[1:]
-        parser_type = self._parsers.get(ext)
-        if not parser_type:
-            raise ValueError(f'Could not infer parser from file type. Unknown file format: "{ext}". '
-                             f'Supported formats are: {list(self._parsers.keys())}.')
-        return parser_type(filename)
+    def _loads(data):
+        try:
+            return loads(data)
+        except (ValueError, OverflowError):
+            return json_loads(data)
+    return _loads
+
+
+class ParserFileBase(ParserBase):
+    """
+    Base for parsers reading the config file with one of the pluggable loader backends.
+
+    backends: mapping of backend name -> function returning loads(data: bytes) callable,
+      ordered by preference (fastest first). The function raises ImportError if the backend is not available.
+    large_file_modes: how loads() of the backend takes files of large_file_threshold bytes and larger
+      (other files and backends get bytes):
+      'mmap' - read-only mmap of the file, decoded straight from the mapping,
+      'stream' - the binary file object, read by the loader in chunks.
+    """
+    backends = {}
+    large_file_modes = {}
+    large_file_threshold = 1 << 20
+
+    def __init__(self, config_file: str, cache: Union['ConfigCache', bool, None] = None, overrides: str = 'argparse',
+                 track_envs: bool = False, backend: str = None):
+        """
+        :param backend: name of the loader backend to use, by default the fastest available one is chosen
+        """
+        super().__init__(config_file, cache, overrides, track_envs)
+        self.backend, self._loads = self._select_backend(backend)
 
+    @classmethod
+    def available_backends(cls) -> List[str]:
+        available = []
+        for name, make_loads in cls.backends.items():
+            try:
+                make_loads()
+            except (ImportError, AttributeError):
+                continue
+            available.append(name)
+        return available
 
-factory = ParserFactory()
-factory.register_format(['yml', 'yaml'], ParserYaml)
-factory.register_format('toml', ParserToml)
-factory.register_format('json', ParserJson)
+    @classmethod
+    def _select_backend(cls, backend: str = None):
+        if backend is not None:
+            if backend not in cls.backends:
+                raise ValueError(f'Unknown {cls.__name__} backend: "{backend}". '
+                                 f'Supported backends are: {list(cls.backends.keys())}.')
+            try:
+                return backend, cls.backends[backend]()
+            except (ImportError, AttributeError) as e:
+                raise ImportError(f'{cls.__name__} backend "{backend}" is not available: {e}') from e
+        for name, make_loads in cls.backends.items():
+            try:
+                return name, make_loads()
+            except (ImportError, AttributeError):
+                continue
+        raise ImportError(f'None of {cls.__name__} backends is available: {list(cls.backends.keys())}')
 
-create_parser = factory.get_parser
+    def _read_config(self) -> dict:
+        return self._read_with(self._loads)
+
+    def _read_config_selected(self, selection: dict) -> dict:
+        return self._read_with(lambda data: self._loads_selected(data, selection))
+
+    def _loads_selected(self, data, selection: dict) -> dict:
+        return select_subtrees(self._loads(data), selection)
+
+    def _read_with(self, loads):
+        import mmap
+
+        buf = None
+        # a single read phase: opening, and reading or mapping the file (streamed files are read while decoding)
+        with phase('read'):
+            f = open(self._config_file, 'rb')
+            try:
+                mode = self.large_file_modes.get(self.backend)
+                if mode is None or os.fstat(f.fileno()).st_size < max(self.large_file_threshold, 1):
+                    data = f.read()
+                elif mode == 'stream':
+                    data = f
+                else:
+                    try:
+                        data = buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (OSError, ValueError):
+                        # e.g. the file system does not support mmap
+                        data = f.read()
+            except BaseException:
+                f.close()
+                raise
+        with f:
+            try:
+                with phase('decode'):
+                    return loads(data)
+            finally:
+                if buf is not None:
+                    buf.close()
+
+
+class ParserToml(ParserFileBase):
+    backends = {
+        'tomllib': _toml_backend_tomllib,
+        'toml': _toml_backend_toml,
+    }
+    large_file_modes = {'tomllib': 'mmap', 'toml': 'mmap'}
+
+
+class ParserYaml(ParserFileBase):
+    backends = {
+        'libyaml': _yaml_backend_libyaml,
+        'pyyaml': _yaml_backend_pyyaml,
+    }
+    large_file_modes = {'libyaml': 'stream', 'pyyaml': 'stream'}
+    # yaml loader classes of the backends, for selective loading (see argumento.yaml_select) and document streams
+    loader_classes = {'libyaml': 'CSafeLoader', 'pyyaml': 'SafeLoader'}
+
+    def parse_iter(self, args: List[str] = None) -> Iterator[NamespaceDict]:
+        """
+        Parses multi-document yaml stream lazily, yields config of each document (env-resolved and with command line
+          overrides, the same as parse() of the document) as soon as it is read, documents are not kept in memory.
+        Command line args are parsed once per key schema (keys and value types) of the documents.
+        :param args: command line args, sys.argv[1:] by default
+        """
+        import sys
+        import yaml
+
+        if args is None:
+            args = sys.argv[1:]
+        loader = getattr(yaml, self.loader_classes.get(self.backend, 'SafeLoader'))
+        overrides_by_schema = {}
+        with open(self._config_file, 'rb') as f:
+            for document in yaml.load_all(f, Loader=loader):
+                if document is None:
+                    document = {}
+                document = self.env_resolver.resolve_envs(document, base_dir=self._base_dir)
+                yield self._parse_document(document, args, overrides_by_schema)
+
+    def _loads_selected(self, data, selection: dict) -> dict:
+        loader_name = self.loader_classes.get(self.backend)
+        if loader_name is None:
+            return super()._loads_selected(data, selection)
+        import yaml
+        from argumento.yaml_select import SelectError, load_selected
 
+        try:
+            return load_selected(data, getattr(yaml, loader_name), selection)
+        except SelectError:
+            # e.g. selected nodes refer to anchors in skipped ones
+            if hasattr(data, 'seek'):
+                data.seek(0)
+            return super()._loads_selected(data, selection)
+
+
+class ParserJson(ParserFileBase):
+    backends = {
+        'orjson': _json_backend_orjson,
+        'ujson': _json_backend_ujson,
+        'json': _json_backend_json,
+    }
+    # ujson takes str or bytes only
+    large_file_modes = {'orjson': 'mmap', 'json': 'mmap'}
@@ -0,0 +1,45 @@
+from typing import Iterable
+
+
+def selection_tree(select: Iterable[str]) -> dict:
+    """
+    Nested dict of selected dotted paths: selection_tree(['db', 'model.optimizer']) -> {'db': True, 'model': {'optimizer': True}}.
+    True marks a selected subtree, overlapping paths are merged ('model' selects 'model.optimizer' too).
+    """
+    if isinstance(select, str):
+        raise TypeError(f'select must be a list of dotted keys, not a str: {select!r}')
+    tree = {}
+    for path in select:
+        node = tree
+        *parents, last = path.split('.')
+        for key in parents:
+            child = node.get(key)
+            if child is True:
+                break
+            if child is None:
+                child = node[key] = {}
+            node = child
+        else:
+            node[last] = True
+    return tree
+
+
+def select_subtrees(cfg: dict, tree: dict) -> dict:
+    """Returns config with the selected (see selection_tree) subtrees only, missing paths are skipped."""
+    selected = {}
+    if not isinstance(cfg, dict):
+        return selected
+    for key, sub_tree in tree.items():
+        value = cfg.get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        if sub_tree is True:
+            selected[key] = value
+        elif isinstance(value, dict):
+            value = select_subtrees(value, sub_tree)
+            if value:
+                selected[key] = value
+    return selected
+
+
+_MISSING = object()
@@ -0,0 +1,228 @@
+"""
+Config snapshots in shared memory for multiprocessing worker pools (python 3.8+):
+
+    with publish(create_parser('config.yaml').parse()) as shared:
+        with multiprocessing.Pool(64, initializer=init_worker, initargs=(shared.name,)) as pool:
+            ...
+
+    def init_worker(name):
+        global config
+        config = attach(name)  # read-only view: config.model.lr, config['model.lr']
+
+Layout: a header followed by the nodes (nested dicts) of the config, each node is pickled separately with
+  its nested dicts replaced by (offset, size) references. Attaching maps the block and reads the header only,
+  a node is unpickled on first access, so a worker pays for the sections it reads.
+"""
+import multiprocessing
+import os
+import pickle
+import struct
+import sys
+from collections import abc
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Tuple
+
+from argumento.namespace_dict import NamespaceDict
+
+_MAGIC = b'ARGM'
+_VERSION = 1
+# magic, version, offset and size of the root node
+_HEADER = struct.Struct('<4sBQQ')
+# attached blocks are owned by the publisher: they must not be unlinked when an attached process exits
+_ATTACH_KWARGS = {'track': False} if sys.version_info >= (3, 13) else {}
+# before python 3.13 attaching registers the block with the resource tracker, which unlinks it when the attached
+#   process exits, attach() unregisters it unless the tracker is the publisher's one
+_UNTRACK_ATTACHED = sys.version_info < (3, 13) and os.name == 'posix'
+# names of the blocks published by this process
+_published = set()
+# in forked processes: the resource tracker of the parent was running at fork time (the child shares it)
+_forked_tracker: Optional[bool] = None
+_dict_items = dict.items
+
+
+def dumps(config: dict) -> bytes:
+    """Serializes config in the snapshot layout."""
+    out = bytearray(_HEADER.size)
+    offset, size = _dump_node(config, out)
+    _HEADER.pack_into(out, 0, _MAGIC, _VERSION, offset, size)
+    return bytes(out)
+
+
+def _dump_node(node: dict, out: bytearray) -> Tuple[int, int]:
+    items = {}
+    sections = []
+    for key, value in _dict_items(node):
+        if isinstance(value, dict):
+            items[key] = _dump_node(value, out)
+            sections.append(key)
+        else:
+            items[key] = value
+    data = pickle.dumps((items, tuple(sections)), protocol=pickle.HIGHEST_PROTOCOL)
+    offset = len(out)
+    out += data
+    return offset, len(data)
+
+
+class SharedConfig:
+    """Config snapshot published to a shared memory block, owned by the publishing process."""
+    def __init__(self, config: dict, name: Optional[str] = None):
+        """
+        :param config: resolved config (NamespaceDict or dict), it is copied to the block
+        :param name: shared memory block name, a random one by default
+        """
+        data = dumps(config)
+        self._shm = SharedMemory(name=name, create=True, size=len(data))
+        self._shm.buf[:len(data)] = data
+        _published.add(self._shm.name)
+
+    @property
+    def name(self) -> str:
+        """Name to attach() to the snapshot with."""
+        return self._shm.name
+
+    @property
+    def size(self) -> int:
+        return self._shm.size
+
+    def attach(self) -> 'SharedNamespaceDict':
+        return SharedNamespaceDict._from_shm(self._shm)
+
+    def close(self):
+        """Unmaps the block in this process, views attached with self.attach() must not be used after that."""
+        self._shm.close()
+
+    def unlink(self):
+        """Destroys the block once all processes have closed it, call it once workers are done."""
+        self._shm.unlink()
+        _published.discard(self._shm.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        self.unlink()
+
+
+def publish(config: dict, name: Optional[str] = None) -> SharedConfig:
+    """Publishes the config to shared memory, see SharedConfig."""
+    return SharedConfig(config, name)
+
+
+def attach(name: str) -> 'SharedNamespaceDict':
+    """Attaches to a published snapshot, takes the same time for any config size (nothing is decoded yet)."""
+    shm = SharedMemory(name=name, **_ATTACH_KWARGS)
+    if _UNTRACK_ATTACHED and shm.name not in _published and not _inherited_tracker():
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return SharedNamespaceDict._from_shm(shm)
+
+
+def _inherited_tracker() -> bool:
+    """
+    True if the resource tracker of this process is shared with the parent process: it may be the publisher's one,
+      which would forget the publisher's registration of the block if it was unregistered.
+    """
+    if _forked_tracker is not None:
+        return _forked_tracker
+    # spawned processes are passed the tracker of the parent
+    return multiprocessing.parent_process() is not None
+
+
+def _on_fork():
+    global _forked_tracker
+    _forked_tracker = getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+
+
+if _UNTRACK_ATTACHED:
+    os.register_at_fork(after_in_child=_on_fork)
+
+
+class SharedNamespaceDict(abc.Mapping):
+    """
+    Read-only NamespaceDict-like view of a config section in a shared memory snapshot:
+      attribute access, dotted keys, None for missing keys. Nested sections are decoded on first access.
+    Pickled views are attached by name on unpickling (e.g. in pool initializer args).
+    Leaf values are decoded per process, copy() gives a modifiable NamespaceDict.
+    """
+    __slots__ = ('_shm', '_offset', '_size', '_items', '_sections')
+
+    def __init__(self, shm: SharedMemory, offset: int, size: int):
+        _set = object.__setattr__
+        _set(self, '_shm', shm)
+        _set(self, '_offset', offset)
+        _set(self, '_size', size)
+        _set(self, '_items', None)
+        _set(self, '_sections', None)
+
+    @classmethod
+    def _from_shm(cls, shm: SharedMemory) -> 'SharedNamespaceDict':
+        magic, version, offset, size = _HEADER.unpack_from(shm.buf)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f'Shared memory block {shm.name!r} is not an argumento config snapshot')
+        return cls(shm, offset, size)
+
+    def _load(self) -> dict:
+        items = self._items
+        if items is None:
+            with self._shm.buf[self._offset:self._offset + self._size] as data:
+                items, sections = pickle.loads(data)
+            for key in sections:
+                items[key] = SharedNamespaceDict(self._shm, *items[key])
+            object.__setattr__(self, '_items', items)
+        return items
+
+    def __getitem__(self, item):
+        if isinstance(item, str) and '.' in item:
+            node = self
+            for key in item.split('.'):
+                if not isinstance(node, SharedNamespaceDict):
+                    return None
+                node = node._load().get(key)
+            return node
+        return self._load().get(item)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return self._load().get(attr)
+
+    def __setattr__(self, attr, value):
+        raise TypeError(f'{type(self).__name__} is read-only')
+
+    def __setitem__(self, key, value):
+        raise TypeError(f'{type(self).__name__} is read-only')
+
+    def __delitem__(self, key):
+        raise TypeError(f'{type(self).__name__} is read-only')
+
+    def __contains__(self, item):
+        return item in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def get(self, key, default=None):
+        if isinstance(key, str) and '.' in key:
+            value = self[key]
+            return default if value is None else value
+        return self._load().get(key, default)
+
+    def copy(self) -> NamespaceDict:
+        """Fully decoded, modifiable copy."""
+        return NamespaceDict((k, v.copy() if isinstance(v, SharedNamespaceDict) else v)
+                             for k, v in _dict_items(self._load()))
+
+    def __reduce__(self):
+        return _attach_section, (self._shm.name, self._offset, self._size)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.items())!r})'
+
+
+def _attach_section(name: str, offset: int, size: int) -> SharedNamespaceDict:
+    view = attach(name)
+    return SharedNamespaceDict(view._shm, offset, size)
@@ -0,0 +1,210 @@
+"""
+Phase level instrumentation of ParserBase.parse():
+
+    stats = ParseStats(trace_memory=True)
+    args = create_parser('config.yaml').parse(stats=stats)
+    print(stats)
+
+or for all parse() calls (e.g. in a service), with hooks called after each call:
+
+    collector = StatsCollector()
+    add_hook(collector)
+
+Phases: 'cache' (cache lookup and store), 'read' (file I/O; large files are read while decoding, see
+  ParserFileBase.large_file_modes), 'decode', 'resolve_envs', 'cmd_args' (argparse parser or override table),
+  'parse_args', 'namespace' (NamespaceDict construction) and 'total'. Layered configs add 'layers' (reading
+  all layers, see argumento.layered) and 'merge', daemon clients add 'daemon' (see argumento.daemon).
+Counters: 'env_placeholders' (resolved placeholders), 'argparse_arguments' (created arguments),
+  'overrides' (config values set from command line, overrides='argv' mode).
+Nothing is recorded (and the overhead is a context variable lookup per phase) unless stats are requested.
+"""
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argumento.parsers import ParserBase
+
+_current = ContextVar('argumento_parse_stats', default=None)
+_hooks = []
+
+
+class PhaseStats:
+    __slots__ = ('calls', 'seconds', 'peak_memory')
+
+    def __init__(self, calls: int = 0, seconds: float = 0.0, peak_memory: Optional[int] = None):
+        self.calls = calls
+        self.seconds = seconds
+        # peak of memory allocated during the phase (bytes), if memory is traced
+        self.peak_memory = peak_memory
+
+    def merge(self, other: 'PhaseStats'):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        if other.peak_memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, other.peak_memory)
+
+    def as_dict(self) -> dict:
+        return {'calls': self.calls, 'seconds': self.seconds, 'peak_memory': self.peak_memory}
+
+    def __repr__(self):
+        return f'PhaseStats(calls={self.calls}, seconds={self.seconds:.6f}, peak_memory={self.peak_memory})'
+
+
+class ParseStats:
+    """Wall time, call counts (and optionally tracemalloc peaks) per parse() phase, plus counters."""
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: trace peak memory of the phases with tracemalloc (slows parsing down considerably)
+        """
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+
+    def phase(self, name: str) -> '_Phase':
+        """Context manager recording a phase."""
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_phase(self, name: str, seconds: float, peak_memory: Optional[int] = None):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = PhaseStats()
+        phase.calls += 1
+        phase.seconds += seconds
+        if peak_memory is not None:
+            phase.peak_memory = max(phase.peak_memory or 0, peak_memory)
+
+    def merge(self, other: 'ParseStats') -> 'ParseStats':
+        for name, phase in other.phases.items():
+            self.phases.setdefault(name, PhaseStats()).merge(phase)
+        for name, n in other.counters.items():
+            self.count(name, n)
+        return self
+
+    def as_dict(self) -> dict:
+        return {'phases': {name: phase.as_dict() for name, phase in self.phases.items()},
+                'counters': dict(self.counters)}
+
+    def __str__(self):
+        lines = [f'{"phase":>18} {"calls":>8} {"seconds":>12} {"peak memory":>12}']
+        for name, phase in self.phases.items():
+            peak = '' if phase.peak_memory is None else phase.peak_memory
+            lines.append(f'{name:>18} {phase.calls:>8} {phase.seconds:>12.6f} {peak:>12}')
+        lines.extend(f'{name:>18} {n:>8}' for name, n in self.counters.items())
+        return '\n'.join(lines)
+
+
+class _Phase:
+    __slots__ = ('stats', 'name', 'start', 'memory_start')
+
+    def __init__(self, stats: ParseStats, name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.memory_start = None
+        if self.stats.trace_memory:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                if hasattr(tracemalloc, 'reset_peak'):  # python 3.9+
+                    tracemalloc.reset_peak()
+                self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        seconds = time.perf_counter() - self.start
+        peak_memory = None
+        if self.memory_start is not None:
+            import tracemalloc
+            peak_memory = max(tracemalloc.get_traced_memory()[1] - self.memory_start, 0)
+        self.stats.add_phase(self.name, seconds, peak_memory)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Context manager recording the phase in the stats of the current parse() call, if they are requested."""
+    stats = _current.get()
+    return _NO_PHASE if stats is None else stats.phase(name)
+
+
+def count(name: str, n: int = 1):
+    """Increments the counter in the stats of the current parse() call, if they are requested."""
+    stats = _current.get()
+    if stats is not None:
+        stats.count(name, n)
+
+
+def current() -> Optional[ParseStats]:
+    """Stats of the current parse() call, None if they are not requested."""
+    return _current.get()
+
+
+def add_hook(hook: Callable[[ParseStats, 'ParserBase'], None]):
+    """Registers hook(stats, parser) called after each parse() with the stats of the call."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[ParseStats, 'ParserBase'], None]):
+    _hooks.remove(hook)
+
+
+def record(parser: 'ParserBase', stats: Union[ParseStats, bool, None], fn: Callable, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs) recording its stats, if requested (stats passed or hooks registered).
+    stats=True records them in a new ParseStats, stored as parser.last_stats.
+    """
+    if stats is True:
+        stats = parser.last_stats = ParseStats()
+    elif stats is False:
+        stats = None
+    elif stats is not None and not isinstance(stats, ParseStats):
+        raise TypeError(f'stats must be a ParseStats or True, got {type(stats).__name__}')
+    if stats is None and not _hooks:
+        return fn(*args, **kwargs)
+    call_stats = ParseStats(trace_memory=stats is not None and stats.trace_memory)
+    stop_tracing = False
+    if call_stats.trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            stop_tracing = True
+    token = _current.set(call_stats)
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        # memory is not traced for the whole call, the peak is reset by each phase
+        call_stats.add_phase('total', time.perf_counter() - start)
+        _current.reset(token)
+        if stop_tracing:
+            tracemalloc.stop()
+    if stats is not None:
+        stats.merge(call_stats)
+    for hook in list(_hooks):
+        hook(call_stats, parser)
+    return result
+
+
+class StatsCollector:
+    """Hook (see add_hook) aggregating stats of parse() calls per parser class."""
+    def __init__(self):
+        self.by_parser: Dict[str, ParseStats] = {}
+
+    def __call__(self, stats: ParseStats, parser: 'ParserBase'):
+        self.by_parser.setdefault(type(parser).__qualname__, ParseStats()).merge(stats)
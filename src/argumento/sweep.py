@@ -0,0 +1,167 @@
+"""
+Parameter sweeps over a config loaded once, see ParserBase.sweep():
+
+    for cfg in create_parser('config.yaml').sweep(['--sweep', 'lr=0.1,0.01', '--sweep', 'model.depth=2,4,8']):
+        train(cfg)
+
+Sweep options (command line or sweep() arguments):
+  --sweep key=v1,v2,...  values of a config key (';' separated for list and ndarray keys: --sweep ids=1,2;3,4,
+    items are cast to the type of the list items of the config value, or of the '?:list[int]' placeholder)
+  --sweep-mode grid|zip|random  cartesian product (default), values zipped by position, or random product samples
+  --sweep-n N, --sweep-seed S  number of samples and the random seed of 'random' mode
+"""
+import itertools
+import random
+from typing import Iterator, List, Optional, Tuple
+
+from argumento.arrays import NdarrayCaster
+from argumento.namespace_dict import FrozenNamespaceDict
+from argumento.overrides import ListCaster, OverrideError, OverrideTable, str2bool
+
+SWEEP_MODES = ('grid', 'zip', 'random')
+
+
+def split_sweep_args(args: List[str]) -> Tuple[List[str], dict, List[str]]:
+    """Splits command line args into (['key=values', ...], {sweep option: value}, other args)."""
+    sweeps = []
+    options = {}
+    rest = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if arg == '--':
+            rest.extend(args[i - 1:])
+            break
+        option, eq, value = arg.partition('=')
+        if option not in ('--sweep', '--sweep-mode', '--sweep-n', '--sweep-seed'):
+            rest.append(arg)
+            continue
+        if not eq:
+            if i >= len(args):
+                raise OverrideError(f'argument {option}: expected one argument')
+            value = args[i]
+            i += 1
+        if option == '--sweep':
+            sweeps.append(value)
+        else:
+            options[option[len('--sweep-'):]] = value
+    return sweeps, options, rest
+
+
+class Sweep:
+    """
+    Lazily generated configs of a parameter sweep, FrozenNamespaceDicts sharing all unchanged subtrees
+      with the base config (see FrozenNamespaceDict.evolve()): memory does not grow with the number of variants.
+    The sweep may be iterated many times, len() is the number of variants.
+    """
+    def __init__(self, table: OverrideTable, args: List[str], mode: str = 'grid', n: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        :param table: OverrideTable of the loaded config
+        :param args: command line args with --sweep options, see the module docs
+        :param mode: default sweep mode, overridden by --sweep-mode
+        :param n: default number of samples of 'random' mode (all variants in random order by default)
+        :param seed: default random seed
+        """
+        sweeps, options, rest = split_sweep_args(list(args))
+        self.mode = options.get('mode', mode)
+        if self.mode not in SWEEP_MODES:
+            raise OverrideError(f'Invalid sweep mode: "{self.mode}". Supported modes are: {list(SWEEP_MODES)}.')
+        self.n = _int_option(options, 'n', n)
+        self.seed = _int_option(options, 'seed', seed)
+        axes = [self._parse_axis(table, sweep) for sweep in sweeps]
+        # (dest, values) per swept key
+        self.axes: List[Tuple[str, list]] = [(dest, values) for dest, _, _, values in axes]
+        if self.mode == 'zip' and len({len(values) for _, values in self.axes}) > 1:
+            raise OverrideError('--sweep values of zip mode must be of the same length')
+        # swept keys are set to their first values in the base config (required params must be set)
+        first_values = [arg for _, option, raw_values, _ in axes for arg in (option, raw_values[0])]
+        overrides = table.parse_overrides(rest + first_values, exit_on_error=False)
+        base = FrozenNamespaceDict(table.defaults)
+        self.base = base.evolve(overrides) if overrides else base
+
+    @staticmethod
+    def _parse_axis(table: OverrideTable, sweep: str) -> Tuple[str, str, List[str], list]:
+        """'key=v1,v2' -> (dest, option, raw values, cast values)."""
+        key, eq, values = sweep.partition('=')
+        option = f'--{key}'
+        spec = table.spec(option)
+        if not eq or not values:
+            raise OverrideError(f'argument --sweep: expected key=value1,value2,..., got {sweep!r}')
+        if spec is None:
+            raise OverrideError(f'argument --sweep: no such config key: {key}')
+        type_ = spec.type
+        if type_ is list:
+            # list valued keys: items are cast to the type of the items of the config value
+            node = table.defaults
+            for k in spec.dest.split('.'):
+                node = node[k]
+            type_ = ListCaster(_item_type(node))
+        raw_values = values.split(';' if isinstance(type_, (ListCaster, NdarrayCaster)) else ',')
+        return spec.dest, option, raw_values, [OverrideTable._cast(option, type_, value) for value in raw_values]
+
+    def __len__(self):
+        if not self.axes:
+            return 1
+        if self.mode == 'zip':
+            return len(self.axes[0][1])
+        total = 1
+        for _, values in self.axes:
+            total *= len(values)
+        if self.mode == 'random' and self.n is not None:
+            return min(self.n, total)
+        return total
+
+    def __iter__(self) -> Iterator[FrozenNamespaceDict]:
+        dests = [dest for dest, _ in self.axes]
+        for combination in self._combinations():
+            yield self.base.evolve(zip(dests, combination))
+
+    def _combinations(self) -> Iterator[tuple]:
+        axes = [values for _, values in self.axes]
+        if not axes:
+            return iter([()])
+        if self.mode == 'zip':
+            return zip(*axes)
+        if self.mode == 'grid':
+            return itertools.product(*axes)
+        # random samples of the product without replacement, without building the product
+        total = 1
+        for values in axes:
+            total *= len(values)
+        indices = random.Random(self.seed).sample(range(total), len(self))
+        return (_unrank(index, axes) for index in indices)
+
+
+def _unrank(index: int, axes: List[list]) -> tuple:
+    """index-th combination of itertools.product(*axes)."""
+    combination = []
+    for values in reversed(axes):
+        index, i = divmod(index, len(values))
+        combination.append(values[i])
+    return tuple(reversed(combination))
+
+
+def _int_option(options: dict, name: str, default: Optional[int]) -> Optional[int]:
+    value = options.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise OverrideError(f'argument --sweep-{name}: invalid int value: {value!r}') from None
+
+
+def _item_type(items: list):
+    """Type to cast swept items of a list valued key to: the type of its items, str if they differ."""
+    types = set(map(type, items))
+    if types == {int, float}:
+        return float
+    if len(types) == 1:
+        item_type = types.pop()
+        if item_type is bool:
+            return str2bool
+        if item_type in (int, float):
+            return item_type
+    return str
@@ -0,0 +1,263 @@
+"""
+Columnar tables of many configs for analysis, e.g. the configs of sweep runs (numpy is required,
+  pandas and pyarrow are optional):
+
+    table = config_table(glob.glob('runs/*/config.yaml'), workers=8)
+    table['model.lr']          # float64 ndarray, a row per config
+    table.missing['model.lr']  # True in the rows without the key
+    table.decode('model.name') # strings of a dictionary-encoded column
+    df = table.to_pandas()
+
+Configs with the same key structure are flattened without building dotted keys per config: their leaf values
+  are collected in key order and transposed into columns once per structure.
+"""
+import os
+from typing import Dict, Iterable, List, Tuple, Union, TYPE_CHECKING
+
+from argumento.arrays import _numpy
+from argumento.batch import ParseResult, parse_many
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+_dict_values = dict.values
+
+
+class ConfigTable:
+    """
+    Columnar table of configs, a column per dotted key of their leaves:
+      table[key] - values: int64, float64 and bool arrays for int, float and bool columns, int32 codes
+        of dictionary-encoded string columns (see categories), object arrays for other and mixed type columns
+      table.missing[key] - bool array, True in the rows without the key or with a null value
+      table.categories[key] - strings of a string column (object array), code -1 is a missing value
+    Missing values are 0, NaN, False and None in int, float, bool and object columns.
+    """
+    def __init__(self, columns: Dict[str, 'np.ndarray'], missing: Dict[str, 'np.ndarray'],
+                 categories: Dict[str, 'np.ndarray'], sources: list, errors: List[ParseResult]):
+        self.columns = columns
+        self.missing = missing
+        self.categories = categories
+        # per row: path of the config file, or position of the config in the input
+        self.sources = sources
+        # files which failed to parse, they have no rows
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, key: str) -> 'np.ndarray':
+        return self.columns[key]
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def keys(self) -> List[str]:
+        return list(self.columns)
+
+    def decode(self, key: str) -> 'np.ndarray':
+        """Column values as an object array: strings of string columns, None in the missing rows."""
+        np = _numpy()
+        categories = self.categories.get(key)
+        if categories is None:
+            values = self.columns[key].astype(object)
+        else:
+            values = np.append(categories, None)[self.columns[key]]
+        values[self.missing[key]] = None
+        return values
+
+    def to_pandas(self) -> 'pd.DataFrame':
+        """DataFrame: categorical string columns, nullable Int64 and boolean columns if values are missing."""
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError('ConfigTable.to_pandas() needs pandas: pip install pandas') from e
+        data = {}
+        for key, values in self.columns.items():
+            missing = self.missing[key]
+            categories = self.categories.get(key)
+            if categories is not None:
+                data[key] = pd.Categorical.from_codes(values, categories=categories)
+            elif missing.any() and values.dtype.kind == 'i':
+                data[key] = pd.arrays.IntegerArray(values, missing)
+            elif missing.any() and values.dtype.kind == 'b':
+                data[key] = pd.arrays.BooleanArray(values, missing)
+            else:
+                data[key] = values
+        return pd.DataFrame(data, index=pd.RangeIndex(len(self)))
+
+    def to_arrow(self) -> 'pa.Table':
+        """
+        pyarrow Table: dictionary-encoded string columns, nulls in the missing rows.
+        Object columns of values pyarrow can not convert to a single type (e.g. ints and strings) are stored as strings.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError('ConfigTable.to_arrow() needs pyarrow: pip install pyarrow') from e
+        arrays = {}
+        for key, values in self.columns.items():
+            missing = self.missing[key]
+            mask = missing if missing.any() else None
+            categories = self.categories.get(key)
+            if categories is not None:
+                arrays[key] = pa.DictionaryArray.from_arrays(pa.array(values, mask=mask),
+                                                             pa.array(categories, type=pa.string()))
+            elif values.dtype.kind != 'O':
+                arrays[key] = pa.array(values, mask=mask)
+            else:
+                try:
+                    arrays[key] = pa.array(values, mask=mask)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                    arrays[key] = pa.array([None if is_missing else str(value)
+                                            for value, is_missing in zip(values, missing)], type=pa.string())
+        return pa.table(arrays)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} rows, {len(self.columns)} columns)'
+
+
+def config_table(configs: Iterable[Union[str, os.PathLike, dict]], workers: int = None, executor: str = 'thread',
+                 args: List[str] = (), chunksize: int = 1, **parser_kwargs) -> ConfigTable:
+    """
+    Builds a ConfigTable of configs: parsed configs (dicts, NamespaceDicts, FrozenNamespaceDicts) and paths
+      of config files, which are parsed with parse_many() (files failing to parse go to table.errors).
+    Rows are in the order of configs.
+    :param workers, executor, args, chunksize, parser_kwargs: parse_many() arguments for config files
+    """
+    np = _numpy()
+    items = list(configs)
+    paths = [item for item in items if _is_path(item)]
+    results = parse_many(paths, workers, executor, ordered=True, args=args, chunksize=chunksize,
+                         **parser_kwargs) if paths else iter(())
+
+    sources = []
+    errors = []
+    # structure -> (rows, leaf values per row)
+    groups: Dict[tuple, Tuple[List[int], List[list]]] = {}
+    for position, item in enumerate(items):
+        if _is_path(item):
+            result = next(results)
+            if not result.ok:
+                errors.append(result)
+                continue
+            source, config = result.path, result.config
+        else:
+            source, config = position, item
+        values = []
+        structure = _flatten(config, values)
+        group = groups.get(structure)
+        if group is None:
+            group = groups[structure] = ([], [])
+        group[0].append(len(sources))
+        group[1].append(values)
+        sources.append(source)
+
+    # dotted key -> [(rows, values)] per structure with the key
+    parts: Dict[str, List[Tuple['np.ndarray', tuple]]] = {}
+    for structure, (rows, value_rows) in groups.items():
+        rows = np.array(rows, dtype=np.intp)
+        for key, values in zip(_leaf_keys(structure, ''), zip(*value_rows)):
+            parts.setdefault(key, []).append((rows, values))
+    del groups
+
+    n_rows = len(sources)
+    columns = {}
+    missing = {}
+    categories = {}
+    for key, key_parts in parts.items():
+        if len(key_parts) == 1:
+            rows, values = key_parts[0]
+        else:
+            rows = np.concatenate([part_rows for part_rows, _ in key_parts])
+            values = [value for _, part_values in key_parts for value in part_values]
+        columns[key], missing[key], key_categories = _column(np, rows, values, n_rows, len(key_parts) == 1)
+        if key_categories is not None:
+            categories[key] = key_categories
+    return ConfigTable(columns, missing, categories, sources, errors)
+
+
+def _is_path(item) -> bool:
+    # configs are checked first: NamespaceDict attribute lookups make os.PathLike checks slow
+    return not isinstance(item, dict) and isinstance(item, (str, os.PathLike))
+
+
+def _flatten(node: dict, values: list) -> tuple:
+    """
+    Appends the leaf values of the config to values (in key order, nested dicts in place),
+      returns its structure: (keys, ((position of a nested dict key, its structure), ...) or None).
+    """
+    children = None
+    position = 0
+    for value in _dict_values(node):
+        if isinstance(value, dict):
+            if children is None:
+                children = []
+            children.append((position, _flatten(value, values)))
+        else:
+            values.append(value)
+        position += 1
+    return tuple(node), None if children is None else tuple(children)
+
+
+def _leaf_keys(structure: tuple, prefix: str) -> List[str]:
+    """Dotted keys of the leaves of a structure (see _flatten()), in the order of their values."""
+    keys, children = structure
+    children = dict(children or ())
+    leaf_keys = []
+    for position, key in enumerate(keys):
+        child = children.get(position)
+        if child is None:
+            leaf_keys.append(f'{prefix}{key}')
+        else:
+            leaf_keys.extend(_leaf_keys(child, f'{prefix}{key}.'))
+    return leaf_keys
+
+
+_NONE_TYPE = type(None)
+
+
+def _column(np, rows: 'np.ndarray', values, n_rows: int, sorted_rows: bool) -> tuple:
+    """(values array, missing mask, categories or None) of a column, from the values of the rows having the key."""
+    types = set(map(type, values))
+    if _NONE_TYPE in types:
+        # null values are missing
+        rows = rows[np.fromiter((value is not None for value in values), dtype=bool, count=len(values))]
+        values = [value for value in values if value is not None]
+        types.discard(_NONE_TYPE)
+    missing = np.ones(n_rows, dtype=bool)
+    missing[rows] = False
+
+    categories = None
+    dense = None
+    if types == {bool}:
+        dense, fill = np.array(values, dtype=bool), False
+    elif types == {int}:
+        try:
+            dense, fill = np.array(values, dtype=np.int64), 0
+        except OverflowError:
+            pass
+    elif types == {float} or types == {int, float}:
+        dense, fill = np.array(values, dtype=np.float64), np.nan
+    elif types == {str}:
+        codes = {}
+        dense, fill = np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32), -1
+        categories = np.empty(len(codes), dtype=object)
+        categories[:] = list(codes)
+
+    if dense is None:
+        # mixed types, lists and other values, assigned one by one: numpy would broadcast sequences
+        column = np.empty(n_rows, dtype=object)
+        for row, value in zip(rows, values):
+            column[row] = value
+    elif sorted_rows and len(rows) == n_rows:
+        # all rows, in order
+        column = dense
+    else:
+        column = np.full(n_rows, fill, dtype=dense.dtype)
+        column[rows] = dense
+    return column, missing, categories
@@ -0,0 +1,290 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import warnings
+from typing import Callable, List, Optional, Set, Union, TYPE_CHECKING
+
+from argumento.factory import create_parser
+from argumento.namespace_dict import NamespaceDict, _REPR_TYPES, _leaf_repr
+
+if TYPE_CHECKING:
+    from argumento.parsers import ParserBase
+
+_MISSING = object()
+
+
+class ReloadWarning(UserWarning):
+    pass
+
+
+class ConfigWatcher:
+    """
+    Keeps a parsed config up to date with its file.
+
+    The file is watched in a background thread (inotify on Linux, mtime polling otherwise), bursts of writes
+      are debounced. On change the file is parsed again and diffed against the current config: unchanged
+      subtrees of the current config are reused, the new config is published with a single reference swap,
+      so readers of watcher.config see either the old or the new config, never a half-updated one.
+    Published configs are snapshots and should be treated as read-only.
+
+    Callbacks are called in the watcher thread as callback(changed_keys, config),
+      changed_keys is the set of changed dotted keys (leaves only).
+    """
+    def __init__(self, parser: Union['ParserBase', str], args: List[str] = None, debounce: float = 0.1,
+                 poll_interval: float = 1.0, use_inotify: Optional[bool] = None):
+        """
+        :param parser: parser of the config file, or the config file path
+        :param args: command line args, sys.argv[1:] by default, applied on each reload
+        :param debounce: seconds without further changes to wait for before reloading
+        :param poll_interval: seconds between file checks when polling
+        :param use_inotify: True to require inotify, False to poll, None to use inotify where available
+        """
+        if not hasattr(parser, 'parse'):
+            parser = create_parser(parser)
+        self.parser = parser
+        self.args = list(sys.argv[1:] if args is None else args)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self._callbacks = []
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._config = self.parser.parse(self.args)
+
+    @property
+    def config(self) -> NamespaceDict:
+        """The latest successfully parsed config."""
+        return self._config
+
+    def add_callback(self, callback: Callable[[Set[str], NamespaceDict], None]):
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[Set[str], NamespaceDict], None]):
+        self._callbacks.remove(callback)
+
+    def reload(self) -> Set[str]:
+        """Parses the config file again, publishes the config and calls callbacks if it changed. Returns changed keys."""
+        with self._reload_lock:
+            new_config = self.parser.parse(self.args)
+            changed = set()
+            reused = []
+            _diff(self._config, new_config, '', changed, reused)
+            if not changed:
+                # the new config is dropped, the published one is left untouched
+                return changed
+            # unchanged subtrees move to the new config (their parent links and indices follow them),
+            #  the replaced config keeps referencing them and must not be written to
+            for parent, k, old_value in reused:
+                NamespaceDict._set(parent, k, old_value)
+            self._config = new_config
+            for callback in list(self._callbacks):
+                callback(changed, new_config)
+            return changed
+
+    def start(self) -> 'ConfigWatcher':
+        """Starts watching the file in a daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError('ConfigWatcher is already started')
+        file_watch = self._file_watch()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(file_watch,), name='argumento-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> 'ConfigWatcher':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _file_watch(self):
+        path = self.parser.config_file
+        if self.use_inotify is not False:
+            try:
+                return _InotifyWatch(path)
+            except OSError:
+                if self.use_inotify:
+                    raise
+        return _PollWatch(path, self.poll_interval)
+
+    def _run(self, file_watch):
+        # wake up regularly to check the stop event
+        timeout = min(self.poll_interval, 0.5)
+        try:
+            while not self._stop_event.is_set():
+                if not file_watch.wait(timeout):
+                    continue
+                # debounce: wait until the file is quiet
+                while not self._stop_event.is_set() and file_watch.wait(self.debounce):
+                    pass
+                if self._stop_event.is_set():
+                    break
+                try:
+                    self.reload()
+                except (Exception, SystemExit) as e:
+                    # e.g. the file is being rewritten or is invalid: keep the current config
+                    warnings.warn(f'Could not reload config {self.parser.config_file}: {e!r}', ReloadWarning)
+        finally:
+            file_watch.close()
+
+
+def _diff(old: NamespaceDict, new: NamespaceDict, prefix: str, changed: set, reused: list):
+    """
+    Compares the configs without modifying them: adds dotted keys of changed leaves to changed,
+      and (new parent, key, old subtree) of the largest unchanged subtrees to reused.
+    """
+    for k, new_value in dict.items(new):
+        old_value = dict.get(old, k, _MISSING)
+        key = f'{prefix}{k}'
+        if isinstance(old_value, NamespaceDict) and isinstance(new_value, NamespaceDict):
+            n_changed = len(changed)
+            n_reused = len(reused)
+            _diff(old_value, new_value, key + '.', changed, reused)
+            if len(changed) == n_changed:
+                # the whole subtree is reused instead of its parts
+                del reused[n_reused:]
+                reused.append((new, k, old_value))
+        elif old_value is _MISSING or _leaf_changed(old_value, new_value):
+            _add_leaf_keys(old_value, key, changed)
+            _add_leaf_keys(new_value, key, changed)
+    for k, old_value in dict.items(old):
+        if k not in new:
+            _add_leaf_keys(old_value, f'{prefix}{k}', changed)
+
+
+def _leaf_changed(old_value, new_value) -> bool:
+    if type(old_value) is not type(new_value):
+        return True
+    if type(old_value) in _REPR_TYPES:
+        return old_value != new_value
+    # lists, ndarrays (== is elementwise) and other values are compared the way config_hash() does
+    return _leaf_repr(old_value) != _leaf_repr(new_value)
+
+
+def _add_leaf_keys(value, key: str, changed: set):
+    if value is _MISSING:
+        return
+    if isinstance(value, NamespaceDict) and value:
+        changed.update(sub_key for sub_key, _ in _iter_leaves(value, key + '.'))
+        return
+    changed.add(key)
+
+
+def _iter_leaves(ns_dict: NamespaceDict, prefix: str):
+    stack = [(prefix, ns_dict)]
+    while stack:
+        prefix, node = stack.pop()
+        for k, v in dict.items(node):
+            if isinstance(v, NamespaceDict) and v:
+                stack.append((f'{prefix}{k}.', v))
+            else:
+                yield f'{prefix}{k}', v
+
+
+def _stat_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class _PollWatch:
+    """Detects file changes by its stat info."""
+    def __init__(self, path: str, poll_interval: float):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._signature = _stat_signature(path)
+
+    def wait(self, timeout: float) -> bool:
+        """Returns True if the file changed within timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = _stat_signature(self.path)
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        pass
+
+
+class _InotifyWatch:
+    """Detects file changes with inotify (Linux), watching the file directory to survive atomic replaces."""
+    _IN_MODIFY = 0x002
+    _IN_ATTRIB = 0x004
+    _IN_CLOSE_WRITE = 0x008
+    _IN_MOVED_FROM = 0x040
+    _IN_MOVED_TO = 0x080
+    _IN_CREATE = 0x100
+    _IN_DELETE = 0x200
+    _event_header = struct.Struct('iIII')
+
+    def __init__(self, path: str):
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._name = os.path.basename(path).encode()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = self._IN_MODIFY | self._IN_ATTRIB | self._IN_CLOSE_WRITE | self._IN_MOVED_FROM | self._IN_MOVED_TO \
+            | self._IN_CREATE | self._IN_DELETE
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+        self._fd = fd
+
+    def wait(self, timeout: float) -> bool:
+        """Returns True if the file changed within timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._read_events():
+                return True
+
+    def _read_events(self) -> bool:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        changed = False
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = self._event_header.unpack_from(data, offset)
+            offset += self._event_header.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name == self._name:
+                changed = True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,118 @@
+"""Selective yaml loading: only the selected subtrees of a document are composed and constructed."""
+from typing import Optional
+
+from yaml.composer import Composer, ComposerError
+from yaml.events import (AliasEvent, CollectionEndEvent, CollectionStartEvent, MappingEndEvent, MappingStartEvent,
+                         ScalarEvent, StreamEndEvent)
+from yaml.nodes import MappingNode, ScalarNode
+
+_MAP_TAG = 'tag:yaml.org,2002:map'
+_STR_TAG = 'tag:yaml.org,2002:str'
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+
+class SelectError(ComposerError):
+    """The document can not be loaded selectively (e.g. selected nodes refer to skipped anchors)."""
+    def __init__(self, problem: str, event):
+        super().__init__(problem=problem, problem_mark=event.start_mark)
+
+
+class SelectiveComposer(Composer):
+    """
+    Composer mixin for yaml loaders (both python and libyaml based): goes through parser events and composes
+      only selected subtrees of the document, the rest is skipped without building nodes for it.
+    """
+    def get_selected_node(self, tree: dict) -> Optional[MappingNode]:
+        self.anchors = {}
+        self.get_event()  # StreamStartEvent
+        node = None
+        if not self.check_event(StreamEndEvent):
+            self.get_event()  # DocumentStartEvent
+            node = self._compose_selected(tree)
+            self.get_event()  # DocumentEndEvent
+            self.anchors = {}
+        if not self.check_event(StreamEndEvent):
+            event = self.get_event()
+            raise ComposerError('expected a single document in the stream', None,
+                                'but found another document', event.start_mark)
+        self.get_event()
+        return node
+
+    def _compose_selected(self, tree: dict) -> MappingNode:
+        if not self.check_event(MappingStartEvent):
+            # not a mapping, nothing to select
+            event = self.peek_event()
+            self._skip_node()
+            return MappingNode(_MAP_TAG, [], event.start_mark, event.end_mark)
+        start_event = self.get_event()
+        if start_event.tag not in (None, '!', _MAP_TAG):
+            raise SelectError(f'selecting in a {start_event.tag} node is not supported', start_event)
+        node = MappingNode(_MAP_TAG, [], start_event.start_mark, None, flow_style=start_event.flow_style)
+        while not self.check_event(MappingEndEvent):
+            key_node = self.compose_node(node, None)
+            if key_node.tag == _MERGE_TAG:
+                raise SelectError('merge keys are not supported in partially selected nodes', start_event)
+            sub_tree = None
+            if isinstance(key_node, ScalarNode) and key_node.tag == _STR_TAG:
+                sub_tree = tree.get(key_node.value)
+            if sub_tree is True:
+                node.value.append((key_node, self.compose_node(node, key_node)))
+            elif sub_tree is not None and self.check_event(MappingStartEvent):
+                node.value.append((key_node, self._compose_selected(sub_tree)))
+            elif sub_tree is not None and self.check_event(AliasEvent):
+                raise SelectError('selecting in aliased nodes is not supported', self.peek_event())
+            else:
+                self._skip_node()
+        node.end_mark = self.get_event().end_mark
+        return node
+
+    def compose_node(self, parent, index):
+        if self.check_event(AliasEvent):
+            event = self.peek_event()
+            if event.anchor not in self.anchors:
+                # anchors of skipped and partially selected nodes are not registered
+                raise SelectError(f'alias *{event.anchor} refers to a skipped or partially selected node', event)
+        return super().compose_node(parent, index)
+
+    def _skip_node(self):
+        """Skips the next node. Anchored nodes in it are composed, so that selected nodes may refer to them."""
+        depth = 0
+        while True:
+            event = self.peek_event()
+            if isinstance(event, (ScalarEvent, CollectionStartEvent)) and event.anchor is not None:
+                self.compose_node(None, None)
+            else:
+                self.get_event()
+                if isinstance(event, CollectionStartEvent):
+                    depth += 1
+                elif isinstance(event, CollectionEndEvent):
+                    depth -= 1
+            if not depth:
+                return
+
+
+_loaders = {}
+
+
+def selective_loader(base_loader: type) -> type:
+    """Selective loader class for a yaml loader class (e.g. yaml.CSafeLoader)."""
+    loader = _loaders.get(base_loader)
+    if loader is None:
+        # the base loader goes first: its parser (and libyaml get_single_node) are not overridden by Composer
+        loader = _loaders[base_loader] = type(f'Selective{base_loader.__name__}', (base_loader, SelectiveComposer), {})
+    return loader
+
+
+def load_selected(stream, base_loader: type, tree: dict) -> dict:
+    """
+    Loads only the selected subtrees (see argumento.selection.selection_tree) of the yaml document.
+    Raises SelectError if the document can not be loaded selectively.
+    """
+    loader = selective_loader(base_loader)(stream)
+    try:
+        node = loader.get_selected_node(tree)
+        if node is None:
+            return {}
+        return loader.construct_document(node)
+    finally:
+        loader.dispose()
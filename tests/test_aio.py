@@ -0,0 +1,109 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from argumento import create_parser
+from argumento.aio import AsyncConfigLoader
+from argumento.overrides import OverrideError
+from argumento.parsers import ParserBase
+
+CONFIG = """
+tenant: {name: "?:str", limit: 10}
+db: {url: "sqlite://", ports: [1, 2]}
+"""
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    cfg_file = tmp_path / 'tenant.yaml'
+    cfg_file.write_text(CONFIG)
+    return str(cfg_file)
+
+
+def _slow_compile(calls):
+    compile_ = ParserBase.compile
+
+    def slow_compile(self, select=None):
+        calls.append(self.config_file)
+        time.sleep(0.05)
+        return compile_(self, select)
+    return slow_compile
+
+
+def test_parse_async(cfg_file):
+    parser = create_parser(cfg_file)
+    args = ['--tenant.name', 'acme', '--tenant.limit', '5']
+    with ThreadPoolExecutor(2) as executor:
+        result = asyncio.run(parser.parse_async(args, select=['tenant'], executor=executor))
+    assert result == parser.parse(args, select=['tenant']) == {'tenant': {'name': 'acme', 'limit': 5}}
+
+
+def test_loader_dedup_and_ttl(cfg_file):
+    calls = []
+
+    async def main():
+        loader = AsyncConfigLoader(ttl=0.2)
+        configs = await loader.load_many([cfg_file] * 10, args=['--tenant.name', 'acme'])
+        assert len(calls) == 1
+        configs[0].db.ports.append(3)
+        assert configs[1].db.ports == [1, 2]
+        assert (await loader.load(cfg_file, ['--tenant.name', 'other'])).tenant.name == 'other'
+        # other selections are loaded separately
+        assert await loader.load(cfg_file, select=['db']) == {'db': {'url': 'sqlite://', 'ports': [1, 2]}}
+        assert len(calls) == 2
+        await asyncio.sleep(0.25)
+        await loader.load(cfg_file, ['--tenant.name', 'acme'])
+        assert len(calls) == 3
+        loader.invalidate(cfg_file)
+        await loader.load(cfg_file, ['--tenant.name', 'acme'])
+        assert len(calls) == 4
+
+    with mock.patch.object(ParserBase, 'compile', _slow_compile(calls)):
+        asyncio.run(main())
+
+
+def test_loader_errors(cfg_file, tmp_path):
+    async def main():
+        loader = AsyncConfigLoader()
+        results = await loader.load_many([cfg_file, str(tmp_path / 'missing.yaml')], args=['--tenant.name', 'acme'],
+                                         return_exceptions=True)
+        assert results[0].tenant.name == 'acme'
+        assert isinstance(results[1], FileNotFoundError)
+        assert not any(key[0].endswith('missing.yaml') for key in loader._cache)
+        with pytest.raises(OverrideError):
+            await loader.load(cfg_file)
+
+    asyncio.run(main())
+
+
+def test_loader_cancelled_waiter(cfg_file):
+    calls = []
+
+    async def main():
+        loader = AsyncConfigLoader()
+        first = asyncio.ensure_future(loader.load(cfg_file, ['--tenant.name', 'a']))
+        second = asyncio.ensure_future(loader.load(cfg_file, ['--tenant.name', 'b']))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert (await second).tenant.name == 'b'
+        assert first.cancelled()
+        assert len(calls) == 1
+
+    with mock.patch.object(ParserBase, 'compile', _slow_compile(calls)):
+        asyncio.run(main())
+
+
+def test_loader_apply_threshold(cfg_file):
+    async def main(loader):
+        return await loader.load(cfg_file, ['--tenant.name', 'acme'])
+
+    for threshold, in_executor in [(None, False), (4, False), (3, True)]:
+        with ThreadPoolExecutor(1) as executor:
+            loader = AsyncConfigLoader(executor, apply_threshold=threshold)
+            with mock.patch.object(executor, 'submit', wraps=executor.submit) as submit:
+                assert asyncio.run(main(loader)).tenant.name == 'acme'
+        # the config has 4 leaves, compiling it is always submitted
+        assert submit.call_count == 1 + in_executor
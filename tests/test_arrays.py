@@ -0,0 +1,80 @@
+import pickle
+
+import pytest
+
+from argumento import create_parser
+from argumento.overrides import OverrideError
+
+np = pytest.importorskip('numpy')
+
+from argumento.arrays import LazyArray, NdarrayCaster  # noqa: E402
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_ndarray_param(tmp_path, overrides):
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('weights: "?:ndarray[float32]"\nids: "?: ndarray[int64]"\nname: x\n')
+    parser = create_parser(str(cfg_file), overrides=overrides)
+    args = parser.parse(['--weights', '0.5, 1,2e3', '--ids=1,2,3'])
+    assert args.weights.dtype == np.float32 and args.weights.tolist() == [0.5, 1, 2000]
+    assert args.ids.dtype == np.int64 and args.ids.tolist() == [1, 2, 3]
+
+    compiled = parser.compile()
+    with pytest.raises(OverrideError, match=r'invalid ndarray\[float32\] value'):
+        compiled.apply(['--weights', '0.5,a', '--ids', '1'])
+    with pytest.raises(OverrideError, match='required'):
+        compiled.apply(['--weights', '0.5'])
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_ndarray_param_documents(tmp_path, overrides):
+    cfg_file = tmp_path / 'jobs.yaml'
+    cfg_file.write_text('w: "?:ndarray[float32]"\n---\nw: "?:ndarray[float32]"\n')
+    docs = list(create_parser(str(cfg_file), overrides=overrides).parse_iter(['--w', '1,2']))
+    # documents do not share override values
+    docs[0].w[0] = 5
+    assert docs[1].w.tolist() == [1, 2]
+
+
+def test_ndarray_caster():
+    assert NdarrayCaster('bool')('1,no, true').tolist() == [True, False, True]
+    assert pickle.loads(pickle.dumps(NdarrayCaster('float16'))) == NdarrayCaster('float16')
+    with pytest.raises(ValueError, match='numeric'):
+        NdarrayCaster('str')
+    with pytest.raises(TypeError):
+        NdarrayCaster('floaty')
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_npy_reference(tmp_path, monkeypatch, overrides):
+    (tmp_path / 'tables').mkdir()
+    np.save(tmp_path / 'tables' / 'lookup.npy', np.arange(6, dtype=np.float32).reshape(2, 3))
+    np.save(tmp_path / 'other.npy', np.ones(3))
+    monkeypatch.setenv('NPY_TABLES', str(tmp_path / 'tables'))
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('model:\n  lookup: "@npy:tables/lookup.npy"\n  env_lookup: "@npy:${NPY_TABLES}/lookup.npy"\n'
+                        '  other: "@npy:missing.npy"\n')
+    args = create_parser(str(cfg_file), overrides=overrides).parse(['--model.other', str(tmp_path / 'other.npy')])
+
+    lookup = args.model.lookup
+    assert isinstance(lookup, LazyArray) and not lookup.loaded
+    assert lookup == args.model.env_lookup and lookup.path == str(tmp_path / 'tables' / 'lookup.npy')
+    assert lookup.shape == (2, 3) and lookup.loaded
+    assert isinstance(lookup.load(), np.memmap) and not lookup.load().flags.writeable
+    assert lookup[1].tolist() == [3, 4, 5]
+    assert (lookup * 2).sum() == 30 and (1 + lookup).max() == 6 and np.sum(lookup) == 15
+    assert np.array_equal(np.asarray(lookup), np.arange(6).reshape(2, 3))
+    assert (np.ones(3) + lookup)[0].tolist() == [1, 2, 3]
+    assert args.model.other.sum() == 3
+
+    unpickled = pickle.loads(pickle.dumps(lookup))
+    assert unpickled == lookup and not unpickled.loaded
+
+
+def test_ndarray_config_hash():
+    from argumento.namespace_dict import NamespaceDict
+    h = NamespaceDict(w=np.arange(4, dtype=np.float32), ref=LazyArray('/a.npy')).config_hash()
+    assert NamespaceDict(w=np.arange(4, dtype=np.float32), ref=LazyArray('/a.npy')).config_hash() == h
+    assert NamespaceDict(w=np.arange(4, dtype=np.float64), ref=LazyArray('/a.npy')).config_hash() != h
+    assert NamespaceDict(w=np.arange(4, dtype=np.float32).reshape(2, 2), ref=LazyArray('/a.npy')).config_hash() != h
+    assert NamespaceDict(w=np.arange(4, dtype=np.float32), ref=LazyArray('/b.npy')).config_hash() != h
@@ -0,0 +1,69 @@
+import pytest
+
+import argumento
+from argumento.batch import ParseResult
+
+
+def _make_files(tmp_path, n):
+    paths = []
+    for i in range(n):
+        fmt = ('yaml', 'toml', 'json')[i % 3]
+        path = tmp_path / f'config_{i}.{fmt}'
+        if fmt == 'yaml':
+            path.write_text(f'run:\n  id: {i}\n  lr: 0.1\n')
+        elif fmt == 'toml':
+            path.write_text(f'[run]\nid = {i}\nlr = 0.1\n')
+        else:
+            path.write_text(f'{{"run": {{"id": {i}, "lr": 0.1}}}}')
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize('executor, chunksize', [('thread', 1), ('thread', 4), ('process', 3)])
+def test_parse_many(tmp_path, executor, chunksize):
+    paths = _make_files(tmp_path, 20)
+    results = list(argumento.parse_many(paths, workers=2, executor=executor, ordered=True, chunksize=chunksize,
+                                        args=['--run.lr', '0.5']))
+    assert [r.path for r in results] == paths
+    assert all(r.ok for r in results)
+    assert [r.config['run.id'] for r in results] == list(range(20))
+    assert all(r.config.run.lr == 0.5 for r in results)
+
+
+def test_parse_many_unordered(tmp_path):
+    paths = _make_files(tmp_path, 30)
+    results = list(argumento.parse_many(iter(paths), workers=4))
+    assert sorted(r.path for r in results) == sorted(paths)
+    assert all(r.config.run.id == int(r.path.rsplit('_', 1)[1].split('.')[0]) for r in results)
+
+
+def test_parse_many_errors(tmp_path):
+    paths = _make_files(tmp_path, 3)
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text('{"run": ')
+    required = tmp_path / 'required.yaml'
+    required.write_text('login: "?:str"\n')
+    unknown = tmp_path / 'config.ini'
+    unknown.write_text('')
+    batch = paths[:1] + [str(tmp_path / 'missing.yaml'), str(invalid), str(required), str(unknown)] + paths[1:]
+
+    results = list(argumento.parse_many(batch, workers=2, ordered=True, overrides='argv'))
+    assert [r.path for r in results] == batch
+    assert [r.ok for r in results] == [True, False, False, False, False, True, True]
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert isinstance(results[2].error, ValueError)
+    assert isinstance(results[3].error, SystemExit)
+    assert isinstance(results[4].error, ValueError)
+    assert all(r.config is None for r in results if not r.ok)
+
+
+def test_parse_many_early_close(tmp_path):
+    paths = _make_files(tmp_path, 50)
+    results = argumento.parse_many(paths, workers=2, ordered=True)
+    assert isinstance(next(results), ParseResult)
+    results.close()
+
+
+def test_parse_many_invalid_executor():
+    with pytest.raises(ValueError):
+        argumento.parse_many([], executor='fiber')
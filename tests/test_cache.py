@@ -0,0 +1,65 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+from argumento import create_parser
+from argumento.cache import ConfigCache
+from argumento.parsers import ParserYaml
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    p = tmp_path / 'cfg.yaml'
+    p.write_text('login: ${CACHE_TEST_LOGIN|admin}\nmax_retries: 5\n')
+    return p
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConfigCache(str(tmp_path / 'cache'), max_entries=2)
+
+
+def parse(cfg_file, cache):
+    with mock.patch.object(sys, 'argv', ['']):
+        return create_parser(str(cfg_file), cache=cache).parse()
+
+
+def test_cache_hit_skips_read(cfg_file, cache):
+    args = parse(cfg_file, cache)
+    assert args.login == 'admin'
+
+    with mock.patch.object(ParserYaml, '_read_config', side_effect=AssertionError('cache miss')):
+        args = parse(cfg_file, cache)
+    assert args.login == 'admin'
+    assert args.max_retries == 5
+
+
+def test_cache_invalidated_by_file_change(cfg_file, cache):
+    assert parse(cfg_file, cache).max_retries == 5
+    cfg_file.write_text('login: ${CACHE_TEST_LOGIN|admin}\nmax_retries: 10\n')
+    assert parse(cfg_file, cache).max_retries == 10
+
+
+def test_cache_invalidated_by_env_change(cfg_file, cache):
+    assert parse(cfg_file, cache).login == 'admin'
+    with mock.patch.dict(os.environ, {'CACHE_TEST_LOGIN': 'root'}):
+        assert parse(cfg_file, cache).login == 'root'
+    assert parse(cfg_file, cache).login == 'admin'
+
+
+def test_cache_lru_eviction(tmp_path, cache):
+    for i in range(4):
+        p = tmp_path / f'cfg_{i}.json'
+        p.write_text(f'{{"idx": {i}}}')
+        assert parse(p, cache).idx == i
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_cache_corrupted_entry(cfg_file, cache):
+    parse(cfg_file, cache)
+    for name in os.listdir(cache.cache_dir):
+        with open(os.path.join(cache.cache_dir, name), 'wb') as f:
+            f.write(b'garbage')
+    assert parse(cfg_file, cache).login == 'admin'
@@ -0,0 +1,129 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from argumento import create_parser
+from argumento.daemon import ConfigDaemon, DaemonParser, get_client
+from argumento.overrides import CompiledConfig
+
+CONFIG_YAML = """
+model: {lr: 0.1, depth: 4}
+data: {path: "${DAEMON_DATA_PATH|/data}", ids: [1, 2]}
+name: "?:str"
+"""
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 chars, pytest tmp paths may be longer
+    tmp_dir = tempfile.mkdtemp(prefix='argm')
+    yield os.path.join(tmp_dir, 'd.sock')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    with ConfigDaemon(socket_path) as daemon:
+        yield daemon
+    get_client(socket_path).close()
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'config.yaml'
+    path.write_text(CONFIG_YAML)
+    return str(path)
+
+
+def test_daemon_parse(daemon, config_file, monkeypatch):
+    monkeypatch.delenv('DAEMON_DATA_PATH', raising=False)
+    parser = create_parser(config_file, daemon=daemon.socket_path)
+    assert isinstance(parser, DaemonParser)
+    args = ['--name', 'run', '--model.lr', '0.5']
+    assert parser.parse(args) == create_parser(config_file).parse(args)
+    assert isinstance(parser.compile(), CompiledConfig)
+    assert parser._local is None
+    # the connection is reused
+    sock = get_client(daemon.socket_path)._sock
+    assert parser.parse(args).model.lr == 0.5
+    assert get_client(daemon.socket_path)._sock is sock
+    assert parser.parse(['--name', 'x'], select=['model', 'name']) == {'model': {'lr': 0.1, 'depth': 4}, 'name': 'x'}
+
+
+def test_daemon_reloads_changed_file(daemon, config_file):
+    parser = create_parser(config_file, daemon=daemon.socket_path)
+    assert parser.parse(['--name', 'a']).model.depth == 4
+    with open(config_file, 'w') as f:
+        f.write(CONFIG_YAML.replace('depth: 4', 'depth: 16'))
+    assert parser.parse(['--name', 'a']).model.depth == 16
+    assert parser._local is None
+
+
+def test_daemon_env_mismatch(daemon, config_file, monkeypatch):
+    monkeypatch.delenv('DAEMON_DATA_PATH', raising=False)
+    parser = create_parser(config_file, daemon=daemon.socket_path)
+    assert parser.parse(['--name', 'a']).data.path == '/data'
+    monkeypatch.setenv('DAEMON_DATA_PATH', '/mnt/data')
+    assert parser.parse(['--name', 'a']).data.path == '/mnt/data'
+    assert parser._local is not None
+
+
+def test_daemon_fallback(socket_path, config_file):
+    parser = create_parser(config_file, daemon=socket_path, overrides='argv')
+    assert parser.parse(['--name', 'a']) == create_parser(config_file).parse(['--name', 'a'])
+    assert parser._local.overrides == 'argv'
+    # invalid configs fall back to the local parser, which raises
+    bad_file = os.path.join(os.path.dirname(config_file), 'bad.yaml')
+    with open(bad_file, 'w') as f:
+        f.write('a: [1, 2\n')
+    with ConfigDaemon(socket_path):
+        with pytest.raises(Exception):
+            create_parser(bad_file, daemon=socket_path).parse([])
+    get_client(socket_path).close()
+
+
+def test_daemon_restart(socket_path, config_file):
+    parser = create_parser(config_file, daemon=socket_path)
+    with ConfigDaemon(socket_path):
+        assert parser.parse(['--name', 'a']).name == 'a'
+        sock = get_client(socket_path)._sock
+    with ConfigDaemon(socket_path):
+        # the connection closed by the stopped daemon is replaced
+        assert parser.parse(['--name', 'b']).name == 'b'
+        assert get_client(socket_path)._sock is not sock
+    assert parser._local is None
+    get_client(socket_path).close()
+
+
+def test_daemon_already_running(daemon):
+    with pytest.raises(RuntimeError):
+        ConfigDaemon(daemon.socket_path).start()
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_daemon_layers(daemon, config_file, tmp_path):
+    override = tmp_path / 'override.json'
+    override.write_text('{"model": {"lr": 0.01}}')
+    parser = create_parser([config_file, str(override)], daemon=daemon.socket_path)
+    assert parser.parse(['--name', 'a']).model == {'lr': 0.01, 'depth': 4}
+    assert parser._local is None
+
+
+def test_serve_command(socket_path, config_file):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.Popen([sys.executable, '-m', 'argumento', 'serve', '--socket', socket_path,
+                                '--preload', config_file], env=env, stderr=subprocess.PIPE)
+    try:
+        assert b'serving on' in process.stderr.readline()
+        parser = create_parser(config_file, daemon=socket_path)
+        assert parser.parse(['--name', 'a']).name == 'a'
+        assert parser._local is None
+        get_client(socket_path).close()
+    finally:
+        process.terminate()
+        process.wait(10)
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import argumento
+
+LAZY_MODULES = {'argparse', 'ast', 'json', 'yaml', 'toml', 'tomllib', 'orjson', 'ujson', 'pickle', 'argumento.parsers'}
+
+# generous cumulative `import argumento` budget (microseconds), may be tuned on slow machines
+IMPORT_BUDGET_US = int(os.environ.get('ARGUMENTO_IMPORT_BUDGET_US', 100000))
+
+
+def import_times(code):
+    """Runs code in a fresh interpreter with -X importtime, returns {module: cumulative time, us}."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(argumento.__file__)))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_is_lazy():
+    times = import_times('import argumento')
+    assert not LAZY_MODULES & set(times)
+    assert times['argumento'] < IMPORT_BUDGET_US
+
+
+def test_format_libraries_imported_on_demand():
+    times = import_times('import argumento; argumento.create_parser("cfg.json")')
+    assert not {'yaml', 'toml', 'tomllib', 'argparse'} & set(times)
@@ -0,0 +1,81 @@
+import os
+from unittest import mock
+
+import pytest
+
+from argumento import create_parser
+from argumento.cache import ConfigCache
+from argumento.layered import ParserLayered, merge_layers
+from argumento.parsers import ParserFileBase
+
+BASE_YAML = """
+db: {host: localhost, port: 5432, pool: {size: 4, timeout: 30}}
+log: {level: debug, handlers: [console]}
+region: "?:str"
+"""
+PROD_TOML = """
+[db]
+host = "${LAYERED_DB_HOST|prod-db}"
+[db.pool]
+size = 32
+[log]
+level = "info"
+handlers = ["file"]
+"""
+HOST_JSON = '{"db": {"pool": {"size": 8}}, "log": "syslog", "host": {"name": "web-1"}}'
+
+
+@pytest.fixture
+def layer_files(tmp_path):
+    files = []
+    for name, text in (('base.yaml', BASE_YAML), ('prod.toml', PROD_TOML), ('host.json', HOST_JSON)):
+        path = tmp_path / name
+        path.write_text(text)
+        files.append(str(path))
+    return files
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+@pytest.mark.parametrize('workers', [None, 1])
+def test_layered(layer_files, monkeypatch, overrides, workers):
+    monkeypatch.setenv('LAYERED_DB_HOST', 'db.prod')
+    parser = create_parser(layer_files, overrides=overrides, workers=workers)
+    assert isinstance(parser, ParserLayered) and parser.config_files == layer_files
+    args = parser.parse(['--region', 'eu', '--db.port', '6432'])
+    assert args == {'db': {'host': 'db.prod', 'port': 6432, 'pool': {'size': 8, 'timeout': 30}},
+                    'log': 'syslog', 'region': 'eu', 'host': {'name': 'web-1'}}
+    base, prod, host = layer_files
+    assert parser.provenance == {'db.host': prod, 'db.port': base, 'db.pool.size': host, 'db.pool.timeout': base,
+                                 'log': host, 'region': base, 'host.name': host}
+
+
+def test_layered_cache(layer_files, tmp_path):
+    cache = ConfigCache(str(tmp_path / 'cache'))
+    read_files = []
+    read_config = ParserFileBase._read_config
+
+    def counting_read_config(self):
+        read_files.append(os.path.basename(self.config_file))
+        return read_config(self)
+
+    with mock.patch.object(ParserFileBase, '_read_config', counting_read_config):
+        args = create_parser(layer_files, cache=cache).parse(['--region', 'eu'])
+        assert sorted(read_files) == ['base.yaml', 'host.json', 'prod.toml']
+        read_files.clear()
+        assert create_parser(layer_files, cache=cache).parse(['--region', 'eu']) == args
+        assert read_files == []
+
+        with open(layer_files[2], 'w') as f:
+            f.write('{"db": {"pool": {"size": 16}}}')
+        args = create_parser(layer_files, cache=cache).parse(['--region', 'eu'])
+        assert read_files == ['host.json']
+        assert args.db.pool.size == 16 and args.log == {'level': 'info', 'handlers': ['file']}
+
+
+def test_merge_layers():
+    merged, provenance = merge_layers([('a', {'x': {'y': 1, 'z': [1]}, 'n': None}), ('b', {'x': {'z': [2]}}),
+                                       ('c', {'n': {'m': 1}, 'x': {'y': {'k': 2}}}), ('d', {})])
+    assert merged == {'x': {'y': {'k': 2}, 'z': [2]}, 'n': {'m': 1}}
+    assert provenance == {'x.y.k': 'c', 'x.z': 'b', 'n.m': 'c'}
+    with pytest.raises(ValueError):
+        ParserLayered([])
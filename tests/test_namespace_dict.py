@@ -1,6 +1,9 @@
+import copy
+import pickle
+
 import pytest
 
-from argumento.namespace_dict import NamespaceDict
+from argumento.namespace_dict import FrozenNamespaceDict, NamespaceDict, config_diff
 
 
 def test_set_get_simple():
@@ -80,4 +83,206 @@ def test_set_recursive():
     assert ns_dict.item3.subitem31.subitem311 == 311
     assert ns_dict.item3.subitem31.subitem312 == 312
     assert ns_dict.item3.subitem32.subitem321 == 321
-    assert ns_dict.item3.subitem32.subitem322 == 322
\ No newline at end of file
+    assert ns_dict.item3.subitem32.subitem322 == 322
+
+def test_single_storage():
+    ns_dict = NamespaceDict({'item1': {'subitem1': 11}})
+    ns_dict.item2 = 2
+    assert ns_dict == {'item1': {'subitem1': 11}, 'item2': 2}
+    assert vars(ns_dict) is ns_dict
+    # the instance __dict__ is the dict itself, values are not mirrored
+    assert vars(ns_dict.item1) is ns_dict.item1
+    assert vars(FrozenNamespaceDict(ns_dict).item1) == {'subitem1': 11}
+
+
+def test_internal_names_do_not_shadow_keys():
+    keys = {'_parent': 1, '_key': 2, '_index': 3, '_digest': 4, '_hash': 5}
+    ns_dict = NamespaceDict({'a': keys})
+    frozen = FrozenNamespaceDict(ns_dict)
+    for key, value in keys.items():
+        assert getattr(ns_dict.a, key) == getattr(frozen.a, key) == value
+    assert ns_dict['a._index'] == 3 and hash(frozen) == hash(FrozenNamespaceDict(ns_dict))
+
+
+def test_delete():
+    ns_dict = NamespaceDict({'item1': 1, 'item2': {'subitem2': 22}})
+    del ns_dict['item1']
+    del ns_dict.item2
+    assert ns_dict == {}
+    assert ns_dict.item1 is None
+    with pytest.raises(KeyError):
+        del ns_dict['item1']
+
+
+def test_setdefault_pop_dotted():
+    ns_dict = NamespaceDict({'a': {'b': {'c': 1}}})
+    assert ns_dict.setdefault('a.b.c', 5) == 1
+    assert ns_dict.setdefault('a.b.d', {'e': 2}) == {'e': 2} and ns_dict['a.b.d.e'] == 2
+    assert isinstance(ns_dict.a.b.d, NamespaceDict)
+    assert ns_dict.pop('a.b.c', 'dflt') == 1 and 'c' not in ns_dict.a.b and ns_dict['a.b.c'] is None
+    assert ns_dict.pop('a.b.c', 'dflt') == 'dflt'
+    with pytest.raises(KeyError):
+        ns_dict.pop('a.x')
+    ns_dict.a.b.n = None
+    assert ns_dict.setdefault('a.b.n', 3) is None
+
+
+def test_items_shadow_dict_attributes():
+    ns_dict = NamespaceDict({'items': [1, 2], 'copy': True})
+    assert ns_dict.items == [1, 2]
+    assert ns_dict.copy is True
+    assert dict.items(ns_dict) == {'items': [1, 2], 'copy': True}.items()
+
+
+def test_update_non_str_keys():
+    ns_dict = NamespaceDict()
+    ns_dict.update({1: {'a': 1}}, item2={'subitem2': 22})
+    assert isinstance(ns_dict[1], NamespaceDict)
+    assert ns_dict['item2.subitem2'] == 22
+
+
+def test_copy_pickle():
+    ns_dict = NamespaceDict({'item1': {'subitem1': [1, 2]}, 'item2': 2})
+    for other in (copy.copy(ns_dict), copy.deepcopy(ns_dict), pickle.loads(pickle.dumps(ns_dict))):
+        assert other == ns_dict
+        assert type(other.item1) is NamespaceDict
+        assert other.item1 is not ns_dict.item1
+        assert other['item1.subitem1'] == [1, 2]
+
+
+def test_get_dotted_deep():
+    ns_dict = NamespaceDict({'a': {'b': {'c': {'d': 1}}, 'list': [{'x': 1}]}})
+    assert ns_dict['a.b.c.d'] == 1
+    assert ns_dict['a.b.c'] == {'d': 1}
+    assert ns_dict.a['b.c.d'] == 1
+    assert ns_dict['a.b.missing'] is None
+    assert ns_dict['missing.b'] is None
+    assert ns_dict['a.list.x'] is None
+
+
+def test_dotted_index_consistency():
+    ns_dict = NamespaceDict({'a': {'b': {'c': 1}}})
+    assert ns_dict['a.b.c'] == 1  # index is built
+
+    ns_dict['a.b.c'] = 2
+    assert ns_dict['a.b.c'] == 2
+    ns_dict.a.b['d'] = 3  # write through nested item
+    assert ns_dict['a.b.d'] == 3
+    ns_dict.a['b'] = {'e': {'f': 4}}
+    assert ns_dict['a.b.e.f'] == 4
+    assert ns_dict['a.b.c'] is None
+
+    del ns_dict['a.b.e.f']
+    assert ns_dict['a.b.e'] == {}
+    assert ns_dict['a.b.e.f'] is None
+    with pytest.raises(KeyError):
+        del ns_dict['a.b.e.f']
+
+    detached = ns_dict.pop('a')
+    assert ns_dict['a.b'] is None
+    detached['b.g'] = 5
+    assert ns_dict['a.b.g'] is None
+    assert detached['b.g'] == 5
+
+    ns_dict['x.y'] = 6
+    ns_dict.x.clear()
+    assert ns_dict['x.y'] is None
+    ns_dict.setdefault('x', {}).update({'z': {'w': 7}})
+    assert ns_dict['x.z.w'] == 7
+
+
+def test_frozen():
+    base = FrozenNamespaceDict({'model': {'lr': 0.1, 'layers': [1, {'kind': 'conv'}]}, 'data': {'path': '/data'}})
+    assert base.model.lr == 0.1 and base['model.lr'] == 0.1 and base['model.lr.x'] is None and base.missing is None
+    assert base.model.layers == (1, {'kind': 'conv'}) and isinstance(base.model.layers[1], FrozenNamespaceDict)
+    assert base == {'model': {'lr': 0.1, 'layers': (1, {'kind': 'conv'})}, 'data': {'path': '/data'}}
+    for mutate in (lambda: setattr(base, 'x', 1), lambda: base.__setitem__('model.lr', 1),
+                   lambda: base.model.update(lr=1), lambda: base.pop('data'), lambda: delattr(base, 'model')):
+        with pytest.raises(TypeError):
+            mutate()
+    assert copy.deepcopy(base) is base
+    assert pickle.loads(pickle.dumps(base)) == base
+
+    thawed = base.thaw()
+    assert type(thawed) is NamespaceDict and thawed.model.layers == [1, {'kind': 'conv'}]
+    thawed['model.lr'] = 1
+    assert base.model.lr == 0.1
+    assert FrozenNamespaceDict(thawed).model.lr == 1
+    # dotted keys are nested, e.g. of vars(argparse namespace)
+    flat = FrozenNamespaceDict({'a.b': 1, 'a.c': {'d.e': 2}}, **{'x.y': 3})
+    assert flat == {'a': {'b': 1, 'c': {'d': {'e': 2}}}, 'x': {'y': 3}}
+    assert flat['a.b'] == 1 and flat.a.c.d.e == 2 and flat == FrozenNamespaceDict(NamespaceDict(flat.thaw()))
+
+
+def test_frozen_evolve():
+    base = FrozenNamespaceDict({'model': {'lr': 0.1, 'optimizer': {'name': 'adam'}}, 'data': {'path': '/data'}})
+    derived = base.evolve({'model.lr': 0.01, 'run.seed': 1}, data={'path': '/other'})
+    assert derived == {'model': {'lr': 0.01, 'optimizer': {'name': 'adam'}}, 'data': {'path': '/other'},
+                       'run': {'seed': 1}}
+    assert base.model.lr == 0.1 and base.run is None
+    # unchanged subtrees are shared
+    assert derived.model.optimizer is base.model.optimizer
+    assert derived.model is not base.model
+
+    # later changes apply on top of earlier ones
+    assert base.evolve([('model', {'lr': 1}), ('model.wd', 2)]).model == {'lr': 1, 'wd': 2}
+    assert base.evolve([('model.wd', 2), ('model', {'lr': 1})]).model == {'lr': 1}
+    assert base.evolve({'data.path.x': 1}).data == {'path': {'x': 1}}
+
+
+def test_frozen_hash():
+    base = FrozenNamespaceDict({'model': {'lr': 0.1, 'layers': [1, 2]}, 'seed': 1})
+    same = FrozenNamespaceDict({'seed': 1, 'model': {'layers': (1, 2), 'lr': 0.1}})
+    cache = {base: 'base'}
+    assert cache[same] == 'base'
+    assert base.evolve({'seed': 2}) not in cache
+    assert base.evolve({'seed': 2}).evolve({'seed': 1}) in cache
+    assert len({base.evolve({'model.lr': i % 3}) for i in range(10)}) == 3
+
+
+CONFIG = {'model': {'lr': 0.1, 'layers': [1, 2], 'opt': {'name': 'adam', 'betas': [0.9, 0.99]}},
+          'data': {'path': '/data', 'ids': [{'a': 1}]}, 'seed': 1}
+
+
+def test_config_hash():
+    cfg = NamespaceDict(CONFIG)
+    h = cfg.config_hash()
+    assert h == NamespaceDict(reversed(list(CONFIG.items()))).config_hash()
+    assert h == FrozenNamespaceDict(CONFIG).config_hash() == pickle.loads(pickle.dumps(cfg)).config_hash()
+    # types matter
+    for value in (1.0, True, '1', None, [1]):
+        assert NamespaceDict(CONFIG, seed=value).config_hash() != h
+    model_hash = cfg.model.config_hash()
+    data_hash = cfg.data.config_hash()
+
+    # writes reset the hashes on the path to the changed key only
+    cfg['model.opt.name'] = 'sgd'
+    assert cfg._NamespaceDict__digest is None and cfg.model.opt._NamespaceDict__digest is None
+    assert cfg.data._NamespaceDict__digest is not None
+    assert cfg.config_hash() != h and cfg.model.config_hash() != model_hash
+    assert cfg.data.config_hash() == data_hash
+    cfg.model.opt.name = 'adam'
+    assert cfg.config_hash() == h
+    del cfg['data.path']
+    assert cfg.config_hash() != h
+    cfg.data.update(path='/data')
+    assert cfg.config_hash() == h
+    cfg.update({'extra': 1})
+    assert cfg.config_hash() != h
+    cfg.pop('extra')
+    assert cfg.config_hash() == h
+    cfg.model.clear()
+    assert cfg.config_hash() != h
+
+
+def test_config_diff():
+    old = NamespaceDict(CONFIG)
+    new = NamespaceDict(CONFIG)
+    assert config_diff(old, new) == set()
+    new.model.opt.name = 'sgd'
+    new.data = 'other'
+    new['extra.key'] = 1
+    del new['seed']
+    assert config_diff(old, new) == {'model.opt.name', 'data', 'data.path', 'data.ids', 'extra.key', 'seed'}
+    frozen = FrozenNamespaceDict(CONFIG)
+    assert config_diff(frozen, frozen.evolve({'model.lr': 1, 'seed': True})) == {'model.lr', 'seed'}
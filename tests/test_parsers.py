@@ -1,8 +1,16 @@
+import argparse
+import pickle
 import sys
 import os
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 from argumento import create_parser
+from argumento.overrides import OverrideError, OverrideTable
+from argumento.cache import ConfigCache
+from argumento.parsers import ParserBase, ParserFactory, ParserJson, ParserToml, ParserYaml
+from argumento.selection import select_subtrees, selection_tree
+from argumento.namespace_dict import NamespaceDict
 
 
 EXTENSIONS = ['toml', 'yaml', 'yml', 'json']
@@ -191,3 +199,380 @@ def test_env_casting(ext):
     assert args.casting.unexpected_type_cast_default == 123  # Not 125! Had to compromise.
 
 
+
+
+BACKEND_MATRIX = [(parser_type, ext, backend)
+                  for parser_type, exts in [(ParserToml, ['toml']), (ParserYaml, ['yaml', 'yml']), (ParserJson, ['json'])]
+                  for ext in exts
+                  for backend in parser_type.backends]
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize('parser_type, ext, backend', BACKEND_MATRIX)
+@pytest.mark.parametrize('name', ['flat', 'flat_cmd_only', 'hierarch', 'env'])
+@pytest.mark.parametrize('large_file', [False, True])
+def test_backends_identical(parser_type, ext, backend, name, large_file):
+    if backend not in parser_type.available_backends():
+        pytest.skip(f'{backend} is not installed')
+    setup_env()
+    cfg_filename = locate_data_file(f'{name}.{ext}')
+    reference_backend = list(parser_type.backends)[-1]
+    with mock.patch.object(sys, 'argv', ['', '--login', 'login', '--max_retries', '3', '--ratio', '0.2',
+                                         '--ports', '5000,5001', '--fractions', '0.1,0.2']):
+        reference = parser_type(cfg_filename, backend=reference_backend).parse()
+        parser = parser_type(cfg_filename, backend=backend)
+        assert parser.backend == backend
+        with mock.patch.object(parser_type, 'large_file_threshold', 0 if large_file else 1 << 30):
+            assert parser.parse() == reference
+
+
+@pytest.mark.parametrize('parser_type, ext, backend', BACKEND_MATRIX)
+def test_large_file_read_non_ascii(tmp_path, parser_type, ext, backend):
+    if backend not in parser_type.available_backends():
+        pytest.skip(f'{backend} is not installed')
+    cfg_path = tmp_path / f'cfg.{ext}'
+    text = {
+        'toml': 'name = "héllo wörld ✓"\n',
+        'yaml': 'name: "héllo wörld ✓"\n',
+        'yml': 'name: "héllo wörld ✓"\n',
+        'json': '{"name": "héllo wörld ✓"}',
+    }[ext]
+    cfg_path.write_text(text, encoding='utf-8')
+    with mock.patch.object(parser_type, 'large_file_threshold', 0):
+        assert parser_type(str(cfg_path), backend=backend).parse([]).name == 'héllo wörld ✓'
+
+
+def test_backend_forced():
+    factory = ParserFactory()
+    factory.register_format('yaml', ParserYaml, backend='pyyaml')
+    assert factory.get_parser('cfg.yaml').backend == 'pyyaml'
+    fastest = ParserYaml.available_backends()[0]
+    assert factory.get_parser('cfg.yaml', backend=fastest).backend == fastest
+
+    with pytest.raises(ValueError):
+        ParserJson('cfg.json', backend='simplejson')
+
+
+def test_backend_unavailable():
+    with mock.patch.dict(sys.modules, {'orjson': None, 'ujson': None}):
+        assert ParserJson('cfg.json').backend == 'json'
+        with pytest.raises(ImportError):
+            ParserJson('cfg.json', backend='orjson')
+
+
+def test_env_resolver_nested_lists():
+    setup_env()
+    cfg = {'matrix': [['${PORT_1}', '${PORT_2}'], [{'port': '${PORT_3}'}]], 'plain': 'no env here'}
+    used_envs = set()
+    ParserBase.env_resolver.resolve_envs(cfg, used_envs)
+    assert cfg == {'matrix': [[8000, 8001], [{'port': 8002}]], 'plain': 'no env here'}
+    assert used_envs == {'PORT_1', 'PORT_2', 'PORT_3'}
+
+
+def test_env_resolver_memoized_values_not_shared():
+    setup_env()
+    cfg = {'a': '${LIST_VAR}', 'b': '${LIST_VAR}', 'c': {'d': ' ${LIST_VAR} '}}
+    ParserBase.env_resolver.resolve_envs(cfg)
+    assert cfg['a'] == cfg['b'] == cfg['c']['d'] == [1, 2, 3]
+    assert cfg['a'] is not cfg['b'] and cfg['b'] is not cfg['c']['d']
+
+
+ENV_INDEX_YAML = """
+db: {host: "${IDX_DB_HOST}", port: "${IDX_DB_PORT:int}", url: "pg://${IDX_DB_HOST}:${IDX_DB_PORT}/app"}
+replicas: ["${IDX_DB_HOST}", static]
+secret: "${IDX_SECRET}"
+plain: 1
+"""
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+@pytest.mark.parametrize('cached', [False, True])
+def test_refresh_env(tmp_path, monkeypatch, overrides, cached):
+    monkeypatch.setenv('IDX_DB_HOST', 'db1')
+    monkeypatch.setenv('IDX_DB_PORT', '5432')
+    monkeypatch.setenv('IDX_SECRET', 'old')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(ENV_INDEX_YAML)
+    cache = ConfigCache(str(tmp_path / 'cache')) if cached else None
+    if cached:
+        create_parser(str(cfg_file), cache=cache, track_envs=True).parse([])
+    parser = create_parser(str(cfg_file), cache=cache, overrides=overrides, track_envs=True)
+    cfg = parser.parse(['--secret', 'from_cmd'])
+    assert sorted(parser.env_index.leaves['IDX_DB_HOST'][i].path for i in range(3)) == \
+        [('db', 'host'), ('db', 'url'), ('replicas', 0)]
+    assert parser.refresh_env(cfg) == set()
+
+    monkeypatch.setenv('IDX_DB_HOST', 'db2')
+    monkeypatch.setenv('IDX_DB_PORT', '6432')
+    monkeypatch.setenv('IDX_SECRET', 'new')
+    assert parser.refresh_env(cfg, ['IDX_DB_PORT']) == {'db.port', 'db.url'}
+    # templates are resolved with the current values of all their variables
+    assert cfg.db == {'host': 'db1', 'port': 6432, 'url': 'pg://db2:6432/app'}
+    # values set from command line are kept
+    assert parser.refresh_env(cfg) == {'db.host', 'replicas.0'}
+    assert cfg == {'db': {'host': 'db2', 'port': 6432, 'url': 'pg://db2:6432/app'}, 'replicas': ['db2', 'static'],
+                   'secret': 'from_cmd', 'plain': 1}
+    assert cfg['db.url'] == 'pg://db2:6432/app'
+    assert parser.refresh_env(cfg) == set()
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_refresh_env_dest_keys(tmp_path, monkeypatch, overrides):
+    monkeypatch.setenv('IDX_PW', 'old')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('db:\n  pass-word: ${IDX_PW}\n  hosts: [{cert-file: "${IDX_PW}.pem"}]\n'
+                        'top-key: ${IDX_PW}\n"a.b-c": ${IDX_PW}\n')
+    parser = create_parser(str(cfg_file), overrides=overrides, track_envs=True)
+    cfg = parser.parse([])
+    assert cfg == {'db': {'pass_word': 'old', 'hosts': [{'cert-file': 'old.pem'}]}, 'top_key': 'old',
+                   'a': {'b_c': 'old'}}
+    monkeypatch.setenv('IDX_PW', 'new')
+    assert parser.refresh_env(cfg) == {'db.pass_word', 'db.hosts.0.cert-file', 'top_key', 'a.b_c'}
+    assert cfg == {'db': {'pass_word': 'new', 'hosts': [{'cert-file': 'new.pem'}]}, 'top_key': 'new',
+                   'a': {'b_c': 'new'}}
+    assert cfg['db.pass_word'] == 'new'
+
+
+def test_refresh_env_config_hash(tmp_path, monkeypatch):
+    monkeypatch.setenv('IDX_HOST', 'db1')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('db: {replicas: [static, [{host: "${IDX_HOST}"}]]}\nseed: 1\n')
+    parser = create_parser(str(cfg_file), track_envs=True)
+    cfg = parser.parse([])
+    old_hash = cfg.config_hash()
+    monkeypatch.setenv('IDX_HOST', 'db2')
+    assert parser.refresh_env(cfg) == {'db.replicas.1.0.host'}
+    # cached hashes of the nodes enclosing the changed list are reset
+    assert cfg.config_hash() != old_hash
+    expected = NamespaceDict({'db': {'replicas': ['static', [{'host': 'db2'}]]}, 'seed': 1})
+    assert cfg == expected and cfg.config_hash() == expected.config_hash()
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_refresh_env_yaml_aliases(tmp_path, monkeypatch, overrides):
+    monkeypatch.setenv('IDX_V', 'old')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('base: &b {y: "${IDX_V|d}", hosts: ["${IDX_V}"]}\na: {ref: *b}\n')
+    parser = create_parser(str(cfg_file), overrides=overrides, track_envs=True)
+    cfg = parser.parse([])
+    monkeypatch.setenv('IDX_V', 'new')
+    assert parser.refresh_env(cfg) == {'base.y', 'base.hosts.0', 'a.ref.y', 'a.ref.hosts.0'}
+    expected = {'y': 'new', 'hosts': ['new']}
+    assert cfg == parser.parse([]) == {'base': expected, 'a': {'ref': expected}}
+
+
+def test_parser_positional_args():
+    # track_envs is in the same position for all parsers
+    parser = ParserYaml(locate_data_file('env.yaml'), None, 'argv', True)
+    assert parser.overrides == 'argv' and parser.track_envs and parser.backend in ParserYaml.available_backends()
+
+
+def test_refresh_env_not_tracked():
+    parser = create_parser(locate_data_file('env.yaml'))
+    with pytest.raises(ValueError, match='track_envs'):
+        parser.refresh_env(NamespaceDict())
+
+def test_env_resolver_shared():
+    assert create_parser(locate_data_file('env.yaml')).env_resolver is \
+           create_parser(locate_data_file('env.json')).env_resolver
+
+
+OVERRIDE_CASES = [
+    ('flat', ['--login', 'login_from_cmd', '--max_retries=3', '--nice_bool_false', 'False', '--redundant-arg', '123']),
+    ('flat_cmd_only', ['--login', 'login_from_cmd', '--max_retries', '3', '--ratio', '-0.2', '--ports', '5000,5001',
+                       '--fractions', '0.1, 0.2']),
+    ('hierarch', ['--database.connection_max', '10', '--database.enabled', 'no', '--servers.alpha.ip', '10.0.0.9',
+                  '--unknown', '--servers.beta.dc', 'xyz', '--', '--database.connection_max', '20']),
+    ('env', []),
+]
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize('ext', EXTENSIONS)
+@pytest.mark.parametrize('name, cmd_args', OVERRIDE_CASES)
+def test_argv_overrides_same_as_argparse(ext, name, cmd_args):
+    setup_env()
+    cfg_filename = locate_data_file(f'{name}.{ext}')
+    expected = create_parser(cfg_filename).parse(cmd_args)
+    assert create_parser(cfg_filename, overrides='argv').parse(cmd_args) == expected
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+@pytest.mark.parametrize('cmd_args', [
+    ['--login', 'login_from_cmd'],  # required args are missing
+    ['--login', 'login', '--max_retries', 'three', '--ratio', '0.2'],  # not an int
+    ['--login', '--max_retries', '3', '--ratio', '0.2'],  # no value
+])
+def test_overrides_errors(overrides, cmd_args, capsys):
+    cfg_filename = locate_data_file('flat_cmd_only.yaml')
+    with pytest.raises(SystemExit) as exc_info:
+        create_parser(cfg_filename, overrides=overrides).parse(cmd_args)
+    assert exc_info.value.code == 2
+    assert 'error: ' in capsys.readouterr().err
+
+
+def test_invalid_overrides_mode():
+    with pytest.raises(ValueError):
+        create_parser(locate_data_file('flat.yaml'), overrides='click')
+
+
+def test_argv_overrides_special_keys(tmp_path):
+    cfg_file = tmp_path / 'cfg.json'
+    cfg_file.write_text('{"my-key": 1, "empty": {}, "a": {"b.c": 2, "b": {"d": 3}}, "none": null}')
+    cmd_args = ['--my-key', '5', '--a.b.c=6']
+    expected = create_parser(str(cfg_file)).parse(cmd_args)
+    assert expected == {'my_key': 5, 'a': {'b': {'c': 6, 'd': 3}}, 'none': None}
+    assert create_parser(str(cfg_file), overrides='argv').parse(cmd_args) == expected
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_compiled_apply(ext):
+    compiled = create_parser(locate_data_file(f'hierarch.{ext}')).compile()
+    for cmd_args in (['--database.connection_max', '10'], ['--servers.alpha.ip=10.0.0.9', '--unknown', '1'], []):
+        assert compiled.apply(cmd_args) == create_parser(locate_data_file(f'hierarch.{ext}')).parse(cmd_args)
+
+    args = compiled.apply([])
+    args.database.ports.append(8003)
+    assert compiled.apply([]).database.ports == [8000, 8001, 8002]
+
+    with pytest.raises(AttributeError):
+        compiled._table = None
+
+
+def test_compiled_errors():
+    compiled = create_parser(locate_data_file('flat_cmd_only.yaml')).compile()
+    assert sorted(compiled.required) == ['--login', '--max_retries', '--ratio']
+    with pytest.raises(OverrideError):
+        compiled.apply(['--login', 'login'])
+    with pytest.raises(OverrideError):
+        compiled.apply(['--help'])
+
+
+def test_compiled_threads_pickle():
+    compiled = create_parser(locate_data_file('flat_cmd_only.yaml')).compile()
+    compiled = pickle.loads(pickle.dumps(compiled))
+
+    def apply(i):
+        return compiled.apply(['--login', f'user_{i}', '--max_retries', str(i), '--ratio', '0.5', '--ports', f'{i},1'])
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(apply, range(100)))
+    for i, args in enumerate(results):
+        assert args.login == f'user_{i}'
+        assert args.max_retries == i
+        assert args.ports == [i, 1]
+        assert args.fractions is None
+
+
+SELECT_YAML = """
+base: &base
+  lr: 0.1
+  betas: [0.9, 0.99]
+model:
+  name: resnet
+  optimizer:
+    <<: *base
+    kind: adam
+db:
+  url: ${UNSET_DB_URL}
+  login: "?:str"
+  pool: {size: 4}
+partial: &partial
+  a: 1
+  b: 2
+ref: *partial
+"""
+
+
+def test_selection_tree():
+    assert selection_tree(['db', 'model.optimizer', 'model.optimizer.lr']) == {'db': True, 'model': {'optimizer': True}}
+    assert selection_tree(['model.optimizer.lr', 'model']) == {'model': True}
+    with pytest.raises(TypeError):
+        selection_tree('db')
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_select(ext):
+    parser = create_parser(locate_data_file(f'hierarch.{ext}'))
+    args = parser.parse(['--servers.beta.ip', '10.0.0.9', '--database.enabled', 'false'],
+                        select=['servers.beta', 'database.ports', 'missing.key'])
+    assert args == {'servers': {'beta': {'ip': '10.0.0.9', 'dc': 'efgh'}}, 'database': {'ports': [8000, 8001, 8002]}}
+    assert parser.compile(select=['servers']).apply([]) == {'servers': parser.parse([]).servers}
+
+
+@pytest.mark.parametrize('backend', ['libyaml', 'pyyaml'])
+@pytest.mark.parametrize('select', [['model.optimizer'], ['model.name', 'ref'], ['partial.a', 'ref'], ['db.pool']])
+def test_select_yaml(tmp_path, backend, select):
+    if backend not in ParserYaml.available_backends():
+        pytest.skip(f'{backend} is not installed')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(SELECT_YAML)
+    full = ParserYaml(str(cfg_file), backend=backend)._read_config()
+    parser = ParserYaml(str(cfg_file), backend=backend, overrides='argv')
+    expected = select_subtrees(full, selection_tree(select))
+    with mock.patch('warnings.warn') as warn:
+        assert parser.parse([], select=select) == expected
+    # unselected env placeholders are not resolved, unselected '?:type' params are not required
+    warn.assert_not_called()
+
+
+def test_select_yaml_skips_unselected(tmp_path):
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(SELECT_YAML)
+    parser = ParserYaml(str(cfg_file), overrides='argv')
+    with mock.patch('argumento.parsers.select_subtrees', side_effect=AssertionError('full load')):
+        assert parser.parse([], select=['model.optimizer']).model.optimizer.kind == 'adam'
+
+
+def test_select_cache(tmp_path):
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(SELECT_YAML)
+    parser = create_parser(str(cfg_file), cache=ConfigCache(str(tmp_path / 'cache')), overrides='argv')
+    assert parser.parse([], select=['model.name']) == {'model': {'name': 'resnet'}}
+    assert parser.parse([], select=['db.pool']) == {'db': {'pool': {'size': 4}}}
+    assert parser.parse([], select=['model.name']) == {'model': {'name': 'resnet'}}
+
+
+MULTI_DOC_YAML = """
+job: {name: first, retries: 1, ports: "?:list[int]"}
+env: ${JOB_ENV|dev}
+---
+job: {name: second, retries: 2, ports: "?:list[int]"}
+env: prod
+---
+job: {name: third, retries: "?:int"}
+tags: [a, b]
+---
+"""
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+@pytest.mark.parametrize('backend', ['libyaml', 'pyyaml'])
+def test_parse_iter(tmp_path, overrides, backend):
+    if backend not in ParserYaml.available_backends():
+        pytest.skip(f'{backend} is not installed')
+    cfg_file = tmp_path / 'jobs.yaml'
+    cfg_file.write_text(MULTI_DOC_YAML)
+    cmd_args = ['--job.retries', '5', '--job.ports', '80,81']
+    expected = []
+    for i, document in enumerate(MULTI_DOC_YAML.split('---\n')[:-1]):
+        doc_file = tmp_path / f'doc_{i}.yaml'
+        doc_file.write_text(document)
+        expected.append(ParserYaml(str(doc_file), backend=backend, overrides=overrides).parse(cmd_args))
+
+    parser = ParserYaml(str(cfg_file), backend=backend, overrides=overrides)
+    with mock.patch('argumento.parsers.OverrideTable.parse_overrides', autospec=True,
+                    side_effect=OverrideTable.parse_overrides) as parse_overrides, \
+            mock.patch('argparse.ArgumentParser.parse_known_args', autospec=True,
+                       side_effect=argparse.ArgumentParser.parse_known_args) as parse_known_args:
+        configs = parser.parse_iter(cmd_args)
+        # documents are parsed lazily
+        first = next(configs)
+        assert first == expected[0]
+        results = [first] + list(configs)
+    # the last document is empty
+    assert results == expected + [{}]
+    assert results[0].job.ports == [80, 81] and results[0].job.ports is not results[1].job.ports
+    # args are parsed once per key schema: first and second documents share it
+    n_parsed = parse_overrides.call_count if overrides == 'argv' else parse_known_args.call_count
+    assert n_parsed == 3
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from argumento.namespace_dict import NamespaceDict
+from argumento.shared import SharedNamespaceDict, attach, publish
+
+CONFIG = NamespaceDict({
+    'model': {'name': 'resnet', 'layers': [1, 2, {'kind': 'conv'}], 'optimizer': {'lr': 0.1, 'beta': None}},
+    'data': {},
+    'seed': 42,
+})
+
+
+def _worker_read(config, key):
+    return config[key]
+
+
+def _worker_attach(name):
+    config = attach(name)
+    return config.model.optimizer.lr, config['model.name'], config.copy()
+
+
+def test_view():
+    with publish(CONFIG) as shared:
+        view = attach(shared.name)
+        assert view._items is None
+        assert view.seed == 42
+        assert view.model._items is None
+        assert view['model.optimizer.lr'] == 0.1
+        assert view.model.optimizer.beta is None and 'beta' in view.model.optimizer
+        assert view.missing is None and view['model.missing.key'] is None and view['seed.x'] is None
+        assert view.get('missing', 1) == 1 and view.get('model.missing', 2) == 2
+        assert list(view) == ['model', 'data', 'seed'] and len(view.data) == 0
+        assert view == CONFIG
+        copy = view.copy()
+        assert type(copy) is NamespaceDict and copy == CONFIG and copy['model.optimizer.lr'] == 0.1
+        with pytest.raises(TypeError):
+            view.seed = 1
+        with pytest.raises(TypeError):
+            view['model'] = {}
+        del view, copy
+
+
+def test_not_a_snapshot():
+    from multiprocessing.shared_memory import SharedMemory
+    shm = SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError, match='not an argumento config snapshot'):
+            attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_workers():
+    with publish(CONFIG) as shared:
+        view = shared.attach()
+        assert len(pickle.dumps(view.model)) < 200
+        with multiprocessing.Pool(2) as pool:
+            assert pool.starmap(_worker_read, [(view, 'seed'), (view.model, 'optimizer.lr')]) == [42, 0.1]
+            lr, name, copy = pool.apply(_worker_attach, (shared.name,))
+        assert (lr, name) == (0.1, 'resnet') and copy == CONFIG
+        assert isinstance(view.model, SharedNamespaceDict)
+
+
+def test_attach_from_other_process():
+    # a process which is not a child of the publisher has its own resource tracker
+    import argumento
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(argumento.__file__)))
+    code = 'import sys; from argumento.shared import attach; print(attach(sys.argv[1]).model.optimizer.lr)'
+    with publish(CONFIG) as shared:
+        for _ in range(2):
+            result = subprocess.run([sys.executable, '-c', code, shared.name], env=env, capture_output=True, text=True)
+            assert result.stdout.strip() == '0.1'
+            assert 'leaked' not in result.stderr and 'Traceback' not in result.stderr
+        # the block outlives the attached processes
+        assert attach(shared.name).seed == 42
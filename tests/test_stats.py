@@ -0,0 +1,86 @@
+import pytest
+
+from argumento import create_parser
+from argumento.stats import ParseStats, StatsCollector, add_hook, current, remove_hook
+
+CONFIG = """
+login: "?:str"
+db:
+  url: ${STATS_DB_URL|sqlite://}
+  urls: ['${STATS_DB_URL|a}', '${STATS_DB_URL|b}:${STATS_DB_PORT|1}']
+  pool: {size: 4}
+"""
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(CONFIG)
+    return str(cfg_file)
+
+
+@pytest.mark.parametrize('overrides', ['argparse', 'argv'])
+def test_parse_stats(cfg_file, overrides):
+    stats = ParseStats()
+    parser = create_parser(cfg_file, overrides=overrides)
+    for _ in range(2):
+        args = parser.parse(['--login', 'me', '--db.pool.size', '8'], stats=stats)
+    assert args.db.pool.size == 8
+
+    assert set(stats.phases) == {'read', 'decode', 'resolve_envs', 'cmd_args', 'parse_args', 'namespace', 'total'}
+    assert stats.phases['total'].calls == stats.phases['read'].calls == stats.phases['decode'].calls == 2
+    assert all(phase.seconds >= 0 and phase.peak_memory is None for phase in stats.phases.values())
+    assert stats.phases['total'].seconds >= stats.phases['decode'].seconds
+    assert stats.counters['env_placeholders'] == 2 * 4
+    if overrides == 'argparse':
+        assert stats.counters['argparse_arguments'] == 2 * 4
+    else:
+        assert stats.counters['overrides'] == 2 * 2
+    assert 'resolve_envs' in str(stats)
+    assert current() is None
+
+
+def test_parse_stats_memory(cfg_file):
+    stats = ParseStats(trace_memory=True)
+    create_parser(cfg_file).parse(['--login', 'me'], stats=stats)
+    assert stats.phases['decode'].peak_memory > 0
+    assert stats.as_dict()['phases']['decode']['peak_memory'] == stats.phases['decode'].peak_memory
+
+
+def test_parse_stats_true(cfg_file):
+    parser = create_parser(cfg_file)
+    assert parser.last_stats is None
+    parser.parse(['--login', 'me'], stats=True)
+    first = parser.last_stats
+    assert first.phases['total'].calls == 1
+    parser.parse(['--login', 'me'], stats=True)
+    assert parser.last_stats is not first and parser.last_stats.phases['total'].calls == 1
+    with pytest.raises(TypeError):
+        parser.parse(['--login', 'me'], stats={})
+
+
+def test_stats_hooks(cfg_file, tmp_path):
+    json_file = tmp_path / 'cfg.json'
+    json_file.write_text('{"a": 1}')
+    collector = StatsCollector()
+    calls = []
+
+    def hook(stats, parser):
+        calls.append(stats)
+
+    add_hook(collector)
+    add_hook(hook)
+    try:
+        create_parser(cfg_file).parse(['--login', 'me'])
+        create_parser(cfg_file).parse(['--login', 'me'])
+        create_parser(str(json_file)).parse([])
+    finally:
+        remove_hook(collector)
+        remove_hook(hook)
+    # stats of each call are passed to the hooks
+    assert [stats.phases['total'].calls for stats in calls] == [1, 1, 1]
+    assert sorted(collector.by_parser) == ['ParserJson', 'ParserYaml']
+    assert collector.by_parser['ParserYaml'].phases['total'].calls == 2
+
+    create_parser(cfg_file).parse(['--login', 'me'])
+    assert len(calls) == 3
@@ -0,0 +1,81 @@
+import pytest
+
+from argumento import create_parser
+from argumento.namespace_dict import FrozenNamespaceDict
+from argumento.overrides import OverrideError
+
+CONFIG = """
+lr: 0.1
+epochs: "?:int"
+model: {depth: 2, name: resnet, head: {dropout: 0.5}}
+ids: "?:list[int]"
+layers: [64, 32]
+"""
+
+
+@pytest.fixture
+def parser(tmp_path):
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text(CONFIG)
+    return create_parser(str(cfg_file))
+
+
+def test_grid(parser):
+    sweep = parser.sweep(['--sweep', 'lr=0.1,0.01', '--epochs', '3', '--sweep=model.depth=2,4,8', '--model.name', 'vit'])
+    assert len(sweep) == 6
+    configs = list(sweep)
+    assert [(c.lr, c.model.depth) for c in configs] == [(lr, d) for lr in (0.1, 0.01) for d in (2, 4, 8)]
+    assert all(isinstance(c, FrozenNamespaceDict) and c.epochs == 3 and c.model.name == 'vit' for c in configs)
+    # unchanged subtrees are shared with the base config
+    assert all(c.model.head is sweep.base.model.head for c in configs)
+    assert list(sweep) == configs
+
+
+def test_zip_random(parser):
+    args = ['--sweep', 'lr=1,2,3', '--sweep', 'epochs=10,20,30', '--sweep', 'ids=1,2;3']
+    with pytest.raises(OverrideError, match='same length'):
+        parser.sweep(args, mode='zip')
+    zipped = list(parser.sweep(args[:4], mode='zip'))
+    assert [(c.lr, c.epochs) for c in zipped] == [(1, 10), (2, 20), (3, 30)]
+
+    args += ['--sweep-mode', 'random', '--sweep-n', '5', '--sweep-seed=1']
+    sampled = list(parser.sweep(args))
+    assert len(sampled) == 5 and len(set(sampled)) == 5
+    assert sampled == list(parser.sweep(args))
+    assert {c.ids for c in sampled} <= {(1, 2), (3,)}
+    assert len(set(parser.sweep(args[:6], mode='random'))) == 18
+
+
+def test_list_key_sweep(parser):
+    configs = list(parser.sweep(['--sweep', 'layers=1,2;3', '--epochs', '1']))
+    assert [c.layers for c in configs] == [(1, 2), (3,)]
+    with pytest.raises(OverrideError, match=r'invalid list\[int\] value'):
+        parser.sweep(['--sweep', 'layers=1,x', '--epochs', '1'])
+
+
+def test_sweep_errors(parser):
+    assert list(parser.sweep(['--epochs', '1'])) == [parser.sweep(['--epochs', '1']).base]
+    for args, match in ((['--sweep', 'missing=1,2', '--epochs', '1'], 'no such config key'),
+                        (['--sweep', 'lr', '--epochs', '1'], 'expected key=value'),
+                        (['--sweep', 'epochs=1,x'], 'invalid int value'),
+                        (['--sweep', 'lr=1,2'], 'required'),
+                        (['--sweep-mode', 'all', '--epochs', '1'], 'Invalid sweep mode')):
+        with pytest.raises(OverrideError, match=match):
+            parser.sweep(args)
+
+
+def test_ndarray_sweep(tmp_path):
+    np = pytest.importorskip('numpy')
+    cfg_file = tmp_path / 'cfg.yaml'
+    cfg_file.write_text('w: "?:ndarray[float32]"\nlr: 0.1\n')
+    configs = list(create_parser(str(cfg_file)).sweep(['--sweep', 'w=1,2;3', '--sweep', 'lr=0.1,0.2']))
+    assert [c.w.tolist() for c in configs] == [[1, 2], [1, 2], [3], [3]]
+    # ndarray leaves are frozen as read-only arrays, variants are hashable and compared by content
+    assert not configs[0].w.flags.writeable
+    results = {c: i for i, c in enumerate(configs)}
+    assert len(results) == 4 and results[configs[0].evolve(lr=0.2)] == 1
+    assert configs[0] == configs[0].evolve(w=np.array([1, 2], dtype=np.float32)) != configs[1]
+    assert configs[0] != configs[0].evolve(w=np.array([1, 2], dtype=np.float64))
+    thawed = configs[0].thaw()
+    thawed.w[0] = 5
+    assert configs[0].w[0] == 1
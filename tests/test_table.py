@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from argumento.namespace_dict import FrozenNamespaceDict, NamespaceDict
+
+np = pytest.importorskip('numpy')
+
+from argumento.table import config_table  # noqa: E402
+
+CONFIGS = [
+    {'model': {'lr': 0.1, 'depth': 4, 'name': 'resnet', 'bn': True}, 'seed': 1, 'tags': ['a']},
+    {'model': {'lr': 1, 'depth': 8, 'name': 'vit', 'bn': False}, 'seed': 2, 'tags': ['b', 'c']},
+    {'model': {'lr': 0.01, 'name': 'resnet', 'bn': None}, 'seed': 'x', 'extra': {'key': 2**70}},
+]
+
+
+def test_config_table():
+    configs = [NamespaceDict(CONFIGS[0]), FrozenNamespaceDict(CONFIGS[1]), CONFIGS[2]]
+    table = config_table(configs)
+    assert len(table) == 3 and table.sources == [0, 1, 2] and table.errors == []
+    assert table.keys() == ['model.lr', 'model.depth', 'model.name', 'model.bn', 'seed', 'tags', 'extra.key']
+
+    assert table['model.lr'].dtype == np.float64 and table['model.lr'].tolist() == [0.1, 1.0, 0.01]
+    assert table['model.depth'].dtype == np.int64 and table['model.depth'].tolist() == [4, 8, 0]
+    assert table.missing['model.depth'].tolist() == [False, False, True]
+    assert table['model.bn'].dtype == bool and table.missing['model.bn'].tolist() == [False, False, True]
+    assert table['model.bn'].tolist() == [True, False, False]
+
+    # dictionary-encoded strings
+    assert table['model.name'].dtype == np.int32 and table['model.name'].tolist() == [0, 1, 0]
+    assert table.categories['model.name'].tolist() == ['resnet', 'vit']
+    assert table.decode('model.name').tolist() == ['resnet', 'vit', 'resnet']
+    assert table.decode('model.depth').tolist() == [4, 8, None]
+
+    # mixed types, lists and ints out of int64 range are kept as objects
+    assert table['seed'].dtype == object and table['seed'].tolist() == [1, 2, 'x']
+    assert table['tags'].tolist() == [['a'], ('b', 'c'), None] and table.missing['tags'].tolist() == [False, False, True]
+    assert table['extra.key'].tolist() == [None, None, 2**70]
+
+
+def test_config_table_files(tmp_path):
+    paths = []
+    for i, config in enumerate(CONFIGS[:2]):
+        path = tmp_path / f'{i}.yaml'
+        path.write_text(f'model: {{lr: {config["model"]["lr"]}, name: {config["model"]["name"]}}}\n')
+        paths.append(str(path))
+    table = config_table([paths[0], str(tmp_path / 'missing.yaml'), {'model': {'lr': 0.5}}, paths[1]], workers=2)
+    assert table.sources == [paths[0], 2, paths[1]]
+    assert [error.path for error in table.errors] == [str(tmp_path / 'missing.yaml')]
+    assert table['model.lr'].tolist() == [0.1, 0.5, 1.0]
+    assert table.decode('model.name').tolist() == ['resnet', None, 'vit']
+
+
+def test_config_table_empty():
+    table = config_table([])
+    assert len(table) == 0 and table.keys() == []
+    table = config_table([{'a': None}, {'a': math.nan}])
+    assert table.missing['a'].tolist() == [True, False] and np.isnan(table['a']).all()
+
+
+def test_config_table_pandas():
+    pd = pytest.importorskip('pandas')
+    df = config_table(CONFIGS).to_pandas()
+    assert list(df['model.name']) == ['resnet', 'vit', 'resnet']
+    assert isinstance(df['model.name'].dtype, pd.CategoricalDtype)
+    assert str(df['model.depth'].dtype) == 'Int64' and df['model.depth'].isna().tolist() == [False, False, True]
+
+
+def test_config_table_arrow():
+    pa = pytest.importorskip('pyarrow')
+    arrow_table = config_table(CONFIGS).to_arrow()
+    assert pa.types.is_dictionary(arrow_table.schema.field('model.name').type)
+    assert arrow_table.column('model.depth').to_pylist() == [4, 8, None]
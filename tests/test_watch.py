@@ -0,0 +1,139 @@
+import threading
+import warnings
+
+import pytest
+
+from argumento import create_parser
+from argumento.watch import ConfigWatcher, ReloadWarning, _InotifyWatch
+
+CONFIG = """
+server:
+  host: localhost
+  port: 8000
+db:
+  url: sqlite://
+  pool:
+    size: 4
+    timeout: 1.5
+"""
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def _inotify_available(tmp_path):
+    try:
+        _InotifyWatch(str(tmp_path / 'probe.yaml')).close()
+    except OSError:
+        return False
+    return True
+
+
+def test_reload_changed_keys(tmp_path):
+    cfg_path = tmp_path / 'config.yaml'
+    _write(cfg_path, CONFIG)
+    watcher = ConfigWatcher(str(cfg_path), args=['--server.port', '9000'])
+    old = watcher.config
+    assert old.server.port == 9000
+
+    assert watcher.reload() == set()
+    assert watcher.config is old
+
+    _write(cfg_path, CONFIG.replace('size: 4', 'size: 8').replace('host: localhost', 'host: example.com')
+           + 'extra:\n  key: 1\n')
+    assert watcher.reload() == {'db.pool.size', 'server.host', 'extra.key'}
+    new = watcher.config
+    assert new is not old
+    assert new['db.pool.size'] == 8 and new.server.host == 'example.com' and new['extra.key'] == 1
+    # command line overrides are applied on reload
+    assert new.server.port == 9000
+    # unchanged subtrees are reused, the old snapshot is intact
+    assert new.db is not old.db and new.db.url == old.db.url
+    assert old['db.pool.size'] == 4 and old.server.host == 'localhost'
+
+    _write(cfg_path, CONFIG.replace('size: 4', 'size: 8'))
+    assert watcher.reload() == {'server.host', 'extra.key'}
+    assert 'extra' not in watcher.config
+
+
+def test_reload_keeps_published_config_consistent(tmp_path):
+    cfg_path = tmp_path / 'config.yaml'
+    _write(cfg_path, CONFIG)
+    watcher = ConfigWatcher(str(cfg_path))
+    cfg = watcher.config
+    assert cfg['db.pool.size'] == 4
+    h = cfg.config_hash()
+    # nothing changed: the published config is left untouched
+    assert watcher.reload() == set()
+    cfg.db.pool.size = 5
+    assert cfg['db.pool.size'] == 5
+    assert cfg.config_hash() != h
+
+    # changed: writes to the reused subtrees are seen by dotted lookups of the new config
+    _write(cfg_path, CONFIG.replace('port: 8000', 'port: 8001'))
+    assert watcher.reload() == {'server.port', 'db.pool.size'}
+    new = watcher.config
+    assert new['db.pool.size'] == 4
+    h = new.config_hash()
+    new.db.pool.timeout = 3.0
+    assert new['db.pool.timeout'] == 3.0 and new.config_hash() != h
+
+
+@pytest.mark.parametrize('use_inotify', [False, True])
+def test_watch_callbacks(tmp_path, use_inotify):
+    if use_inotify and not _inotify_available(tmp_path):
+        pytest.skip('inotify is not available')
+    cfg_path = tmp_path / 'config.yaml'
+    _write(cfg_path, CONFIG)
+    parser = create_parser(str(cfg_path), overrides='argv')
+    calls = []
+    called = threading.Event()
+
+    def callback(changed, config):
+        calls.append((changed, config))
+        called.set()
+
+    watcher = ConfigWatcher(parser, args=[], debounce=0.05, poll_interval=0.01, use_inotify=use_inotify)
+    watcher.add_callback(callback)
+    with watcher:
+        # a burst of writes results in a single reload
+        for size in range(5, 10):
+            _write(cfg_path, CONFIG.replace('size: 4', f'size: {size}'))
+        assert called.wait(5)
+    assert len(calls) == 1
+    changed, config = calls[0]
+    assert changed == {'db.pool.size'}
+    assert config is watcher.config and config['db.pool.size'] == 9
+
+
+def test_watch_keeps_config_on_invalid_file(tmp_path):
+    cfg_path = tmp_path / 'config.json'
+    _write(cfg_path, '{"a": {"b": 1}}')
+    watcher = ConfigWatcher(str(cfg_path), args=[], debounce=0.01, poll_interval=0.01, use_inotify=False)
+    reloaded = threading.Event()
+    watcher.add_callback(lambda changed, config: reloaded.set())
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        with watcher:
+            _write(cfg_path, '{"a": {"b": ')
+            assert not reloaded.wait(0.3)
+            _write(cfg_path, '{"a": {"b": 2}}')
+            assert reloaded.wait(5)
+    assert any(issubclass(w.category, ReloadWarning) for w in caught)
+    assert watcher.config['a.b'] == 2
+
+
+def test_reload_ndarray(tmp_path):
+    pytest.importorskip('numpy')
+    cfg_path = tmp_path / 'config.yaml'
+    _write(cfg_path, 'w: "?:ndarray[float32]"\nids: [1, 2]\nseed: 1\n')
+    watcher = ConfigWatcher(str(cfg_path), args=['--w', '1,2,3'])
+    old = watcher.config
+    assert watcher.reload() == set()
+    assert watcher.config is old
+
+    _write(cfg_path, 'w: "?:ndarray[float32]"\nids: [1, 3]\nseed: 1\n')
+    assert watcher.reload() == {'ids'}
+    assert watcher.config.w.tolist() == [1, 2, 3]